@@ -0,0 +1,120 @@
+"""Real-time factor and audio equivalence of the TTS inference backends.
+
+Synthesizes the same seeded corpus paragraphs with each backend in
+src/tts_backends.py on the CPU and reports:
+
+  real_time_factor      synthesis time / audio duration (below 1 is faster
+                        than real time)
+  spectral_distance_db  mean log-spectral distance to the torch backend's
+                        audio for the same text (see spectral_distance)
+
+    python benchmarks/backends.py --backends torch int8 onnx --output backends.json
+
+A backend whose mean distance exceeds --max-distance is reported as
+failed and the script exits 1. Backends that cannot be built (missing
+onnxruntime or exported model) are reported as skipped. Needs torch and
+kokoro; the onnx backend also needs TTS_CONFIG['onnx_model'].
+"""
+
+import argparse
+import contextlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from corpus import CorpusSpec, generate_chapter  # noqa: E402
+
+SAMPLE_RATE = 24000
+
+
+def synthesize(generator, text: str, seed: int):
+    """All audio the generator streams for text, as one float32 array"""
+    import torch
+    from src.main import AudioBuffer
+
+    torch.manual_seed(seed)  # The vocoder's noise source; keeps torch and int8 runs comparable
+    buffer = AudioBuffer.for_text(text, SAMPLE_RATE)
+    for audio, _ in generator.stream(text):
+        buffer.write(audio)
+    return buffer.audio().copy()
+
+
+def run_backend(name: str, args, texts):
+    from src.main import AudioBookGenerator
+
+    started = time.perf_counter()
+    generator = AudioBookGenerator(voice=args.voice, use_gpu=False, backend=name)
+    load_seconds = time.perf_counter() - started
+    synthesize(generator, texts[0], args.seed)  # Warmup, not timed
+
+    outputs, seconds = [], 0.0
+    for index, text in enumerate(texts):
+        call_started = time.perf_counter()
+        outputs.append(synthesize(generator, text, args.seed + index))
+        seconds += time.perf_counter() - call_started
+    audio_seconds = sum(len(audio) for audio in outputs) / SAMPLE_RATE
+    return outputs, {
+        "load_seconds": round(load_seconds, 3),
+        "seconds": round(seconds, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "real_time_factor": round(seconds / audio_seconds, 4) if audio_seconds else None
+    }
+
+
+def main():
+    from src.tts_backends import BACKENDS, spectral_distance
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--voice", default="af_heart")
+    parser.add_argument("--texts", type=int, default=8, help="Corpus paragraphs to synthesize")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-distance", type=float, default=3.0, help="Allowed mean distance to torch in dB")
+    parser.add_argument("--output", help="Write results here instead of stdout")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(chapters=1, paragraphs=args.texts, seed=args.seed)
+    texts = generate_chapter(spec, 0, 1)[1]
+    # The torch backend is the reference, so it always runs first
+    backends = ["torch"] + [name for name in args.backends if name != "torch"]
+
+    results = {"voice": args.voice, "texts": len(texts), "backends": {}, "failed": []}
+    reference = None
+    for name in backends:
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                outputs, metrics = run_backend(name, args, texts)
+        except (ImportError, FileNotFoundError) as e:
+            results["backends"][name] = {"skipped": str(e)}
+            continue
+        if reference is None and name == "torch":
+            reference = outputs
+        elif reference is not None:
+            distances = [spectral_distance(ref, out, SAMPLE_RATE) for ref, out in zip(reference, outputs)]
+            metrics["spectral_distance_db"] = round(statistics.mean(distances), 3)
+            metrics["spectral_distance_max_db"] = round(max(distances), 3)
+            metrics["length_ratio"] = round(sum(map(len, outputs)) / max(sum(map(len, reference)), 1), 4)
+            if metrics["spectral_distance_db"] > args.max_distance:
+                results["failed"].append(name)
+        if name in args.backends:
+            results["backends"][name] = metrics
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    for name in results["failed"]:
+        print(f"[NOT EQUIVALENT] {name}: {results['backends'][name]['spectral_distance_db']} dB from torch",
+              file=sys.stderr)
+    if results["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Chapter list serialization: full SELECT * listing vs. slim keyset pages.
+
+Fills a temporary database with one large novel and times building and
+serializing the chapter list response the old way (every column of every
+chapter as ChapterResponse) and the new way (slim ChapterListItem rows, one
+page at a time), reporting JSON size and latency.
+
+    python benchmarks/bench_chapter_list.py --chapters 10000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pydantic import BaseModel  # noqa: E402
+
+from src.api import database  # noqa: E402
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'json_kb': round(len(body) / 1024, 1),
+        'p50_ms': round(statistics.median(samples), 3),
+        'max_ms': round(samples[-1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapters", type=int, default=10_000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+
+        from src.api.models.schemas import ChapterResponse
+        from src.api.routes.chapters import load_chapter_list
+
+        class FullChapterList(BaseModel):
+            chapters: List[ChapterResponse]
+            total: int
+
+        folder = Path(tmp) / "output" / "Bench-Novel"
+        with database.get_db() as conn:
+            conn.execute(
+                "INSERT INTO novels (slug, title, data_path, chapter_count) VALUES ('bench', 'Bench', ?, ?)",
+                (str(folder), args.chapters)
+            )
+            conn.executemany('''
+                INSERT INTO chapters (novel_id, chapter_number, title, content_path, audio_path, word_count)
+                VALUES (1, ?, ?, ?, ?, 2500)
+            ''', [
+                (n, f"Chapter {n}: The Long Road Through The Mountains",
+                 str(folder / f"Chapter_{n:04d}.txt"), str(Path(tmp) / "audio" / f"Chapter_{n:04d}.wav"))
+                for n in range(1, args.chapters + 1)
+            ])
+
+        novel = {'id': 1, 'chapter_count': args.chapters}
+
+        def full_listing():
+            with database.get_db() as conn:
+                rows = database.list_from_rows(
+                    conn.execute('SELECT * FROM chapters WHERE novel_id = 1 ORDER BY chapter_number').fetchall()
+                )
+            return FullChapterList(chapters=rows, total=len(rows)).model_dump_json()
+
+        results = {
+            'chapters': args.chapters,
+            'select_all_full': timed(full_listing, args.repeat),
+            'slim_full': timed(
+                lambda: load_chapter_list(novel, 'asc', None, None, args.chapters).model_dump_json(), args.repeat
+            ),
+            'slim_first_page': timed(
+                lambda: load_chapter_list(novel, 'asc', None, None, args.page_size).model_dump_json(), args.repeat
+            ),
+            'slim_last_page': timed(
+                lambda: load_chapter_list(
+                    novel, 'asc', None, args.chapters - args.page_size, args.page_size
+                ).model_dump_json(),
+                args.repeat
+            )
+        }
+        database.close_connections()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Bytes on the wire and serialization CPU for the heavy JSON endpoints.
+
+Builds a temporary library and, for chapter content, a chapter list page
+and the novel list, reports:
+  - serialization CPU per response: Pydantic response_model validation plus
+    the default JSON encoder (the old path) vs. FastJSONResponse (orjson
+    when installed)
+  - response size and compression CPU for identity, gzip levels and brotli
+    (when the brotli package is installed)
+
+    python benchmarks/bench_compression.py --chapter-kb 40 --list-limit 1000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from src.api import database  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WORDS = ("the", "cultivator", "spring", "gu", "heaven", "refined", "mountain", "blood", "sect", "ancient",
+         "master", "silently", "however", "immortal", "formation", "essence", "primeval", "stone")
+
+
+def cpu_ms(fn, repeat: int) -> float:
+    """Mean process CPU time of fn in milliseconds"""
+    started = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return round((time.process_time() - started) * 1000 / repeat, 3)
+
+
+def write_library(root: Path, novels: int, chapters: int, chapter_kb: int):
+    rng = random.Random(7)
+    for n in range(novels):
+        folder = root / f"Bench-Novel-{n:03d}"
+        folder.mkdir(parents=True)
+        count = chapters if n == 0 else 3
+        for number in range(1, count + 1):
+            words = []
+            size = 0
+            while size < chapter_kb * 1024:
+                word = rng.choice(WORDS)
+                words.append(word)
+                size += len(word) + 1
+            lines = [" ".join(words[i:i + 14]).capitalize() + "." for i in range(0, len(words), 14)]
+            (folder / f"Chapter_{number:04d}.txt").write_text(
+                f"Chapter {number}: {rng.choice(WORDS).title()}\n{'=' * 60}\n\n" + "\n\n".join(lines)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chapter-kb", type=int, default=40)
+    parser.add_argument("--chapters", type=int, default=1000)
+    parser.add_argument("--novels", type=int, default=100)
+    parser.add_argument("--list-limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "output"
+        write_library(root, args.novels, args.chapters, args.chapter_kb)
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+
+        from src.api.indexer import LibraryIndexer
+        from src.api.models.schemas import ChapterContentResponse, ChapterListResponse, NovelListResponse
+        from src.api.responses import FastJSONResponse, orjson
+        from src.api.routes import chapters, novels
+
+        LibraryIndexer(root).refresh(force=True)
+        novel = chapters.fetch_novel_for_chapter_list("bench-novel-000")
+
+        bodies = {
+            'chapter_content': (
+                ChapterContentResponse,
+                chapters.chapter_content_response(chapters.fetch_chapter_by_number("bench-novel-000", 1))
+            ),
+            'chapter_list': (
+                ChapterListResponse,
+                chapters.load_chapter_list(novel, 'asc', None, None, args.list_limit)
+            ),
+            'novel_list': (NovelListResponse, novels.query_novels(None, None, 100, 0))
+        }
+
+        results = {'orjson': orjson is not None, 'brotli': brotli is not None, 'endpoints': {}}
+        for name, (model, body) in bodies.items():
+            def default_path():
+                validated = model.model_validate(body)
+                return JSONResponse(jsonable_encoder(validated)).body
+
+            payload = FastJSONResponse(body).body
+            encodings = {'identity': {'bytes': len(payload)}}
+            for level in (1, 6, 9):
+                compress = lambda: zlib.compress(payload, level)  # noqa: E731
+                encodings[f'gzip_{level}'] = {'bytes': len(compress()), 'cpu_ms': cpu_ms(compress, args.repeat)}
+            if brotli is not None:
+                for quality in (4, 11):
+                    compress = lambda: brotli.compress(payload, quality=quality)  # noqa: E731
+                    encodings[f'br_{quality}'] = {'bytes': len(compress()), 'cpu_ms': cpu_ms(compress, args.repeat)}
+
+            results['endpoints'][name] = {
+                'serialize_cpu_ms': {
+                    'pydantic_default': cpu_ms(default_path, args.repeat),
+                    'fast_json': cpu_ms(lambda: FastJSONResponse(body).body, args.repeat)
+                },
+                'encodings': encodings
+            }
+        database.close_connections()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
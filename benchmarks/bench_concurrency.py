@@ -0,0 +1,139 @@
+"""Latency under parallel readers with blocking work inline vs. on the I/O pool.
+
+Serves the API with uvicorn against a temporary library whose chapter reads
+are slowed down to imitate a busy disk. For each number of parallel readers
+it reports chapter latency and the latency of a health-check probe that
+runs alongside. With the work inline every request waits behind the slow
+reads; on the I/O pool the probe p99 should stay flat.
+
+    python benchmarks/bench_concurrency.py --readers 1 4 16 64 --read-delay-ms 20
+"""
+
+import argparse
+import json
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from src.api import database  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentiles(samples) -> dict:
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+    pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)  # noqa: E731
+    return {'count': len(samples), 'p50_ms': pick(0.5), 'p99_ms': pick(0.99), 'max_ms': round(samples[-1], 2)}
+
+
+def measure(base_url: str, readers: int, chapters: int, seconds: float) -> dict:
+    deadline = time.perf_counter() + seconds
+    chapter_ms, probe_ms = [], []
+    lock = threading.Lock()
+
+    def reader(index: int):
+        local = []
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            number = index
+            while time.perf_counter() < deadline:
+                number = number % chapters + 1
+                started = time.perf_counter()
+                client.get(f"/api/chapters/novel/bench-novel/{number}").raise_for_status()
+                local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            chapter_ms.extend(local)
+
+    def probe():
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                client.get("/").raise_for_status()
+                probe_ms.append((time.perf_counter() - started) * 1000)
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=probe))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {'chapter': percentiles(chapter_ms), 'probe': percentiles(probe_ms)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--chapters", type=int, default=200)
+    parser.add_argument("--read-delay-ms", type=float, default=20)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "output"
+        folder = root / "Bench-Novel"
+        folder.mkdir(parents=True)
+        for number in range(1, args.chapters + 1):
+            (folder / f"Chapter_{number:04d}.txt").write_text(f"Chapter {number}\n{'=' * 60}\n\n" + "word " * 3000)
+
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+
+        from src.api.indexer import LibraryIndexer
+        from src.api.main import app
+        from src.api.routes import chapters
+
+        LibraryIndexer(root).refresh(force=True)
+
+        read_content = chapters.read_chapter_content
+
+        def slow_read(content_path):
+            time.sleep(args.read_delay_ms / 1000)
+            return read_content(content_path)
+
+        chapters.read_chapter_content = slow_read
+        offload = chapters.run_blocking
+
+        async def inline(fn, *fn_args, **fn_kwargs):
+            return fn(*fn_args, **fn_kwargs)
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, port=port, lifespan="off", log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        results = {'read_delay_ms': args.read_delay_ms, 'seconds': args.seconds}
+        try:
+            for mode, runner in (('inline', inline), ('io_pool', offload)):
+                chapters.run_blocking = runner
+                results[mode] = {
+                    str(readers): measure(f"http://127.0.0.1:{port}", readers, args.chapters, args.seconds)
+                    for readers in args.readers
+                }
+        finally:
+            chapters.run_blocking = offload
+            server.should_exit = True
+            thread.join(timeout=10)
+            database.close_connections()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
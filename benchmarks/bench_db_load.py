@@ -0,0 +1,137 @@
+"""Requests/sec on the novel and chapter endpoints with and without the tuned database layer.
+
+Serves the API with uvicorn on a local port against a temporary library and
+database, then drives it from concurrent HTTP clients twice:
+
+- baseline: a new connection per get_db(), rollback journal, synchronous=FULL
+- tuned:    pooled per-thread connections, WAL and the DATABASE_CONFIG pragmas
+
+    python benchmarks/bench_db_load.py --clients 16 --seconds 10
+"""
+
+import argparse
+import json
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from src.api import database  # noqa: E402
+from src.config import DATABASE_CONFIG  # noqa: E402
+
+BASELINE = {
+    'pool_connections': False,
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'cache_size_kb': 2000,
+    'mmap_size_mb': 0
+}
+
+
+def build_library(root: Path, novels: int, chapters: int):
+    body = "word " * 1500
+    for n in range(novels):
+        folder = root / f"Load-Novel-{n:02d}"
+        folder.mkdir(parents=True)
+        for c in range(1, chapters + 1):
+            (folder / f"Chapter_{c:04d}.txt").write_text(f"Chapter {c}\n{'=' * 60}\n\n{body}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_load(base_url: str, slugs, chapters: int, clients: int, seconds: float) -> dict:
+    deadline = time.perf_counter() + seconds
+    counts = {'novel': 0, 'chapter': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def client_loop(seed: int):
+        rng = random.Random(seed)
+        local = {'novel': 0, 'chapter': 0, 'errors': 0}
+        with httpx.Client(base_url=base_url, timeout=30) as client:
+            while time.perf_counter() < deadline:
+                slug = rng.choice(slugs)
+                if rng.random() < 0.3:
+                    kind, url = 'novel', f"/api/novels/{slug}"
+                else:
+                    kind, url = 'chapter', f"/api/chapters/novel/{slug}/{rng.randint(1, chapters)}"
+                response = client.get(url)
+                local[kind if response.status_code == 200 else 'errors'] += 1
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client_loop, range(clients)))
+
+    total = counts['novel'] + counts['chapter']
+    return {**counts, 'requests_per_sec': round(total / seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--novels", type=int, default=10)
+    parser.add_argument("--chapters", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "output"
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+        build_library(root, args.novels, args.chapters)
+
+        from src.api.indexer import LibraryIndexer
+        from src.api.main import app
+        from src.api.routes.chapters import sync_chapters_for_path
+
+        LibraryIndexer(root).refresh(force=True)
+        slugs = []
+        for folder in sorted(root.iterdir()):
+            sync_chapters_for_path(str(folder))
+            slugs.append(folder.name.lower())
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, port=port, lifespan="off", log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        tuned = dict(DATABASE_CONFIG)
+        results = {'clients': args.clients, 'seconds': args.seconds}
+        try:
+            for name, settings in (('baseline', {**tuned, **BASELINE}), ('tuned', tuned)):
+                DATABASE_CONFIG.update(settings)
+                database.close_connections()
+                # Journal mode is stored in the file, so switch it explicitly
+                with database.get_db() as conn:
+                    conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+                results[name] = run_load(f"http://127.0.0.1:{port}", slugs, args.chapters,
+                                         args.clients, args.seconds)
+        finally:
+            DATABASE_CONFIG.update(tuned)
+            server.should_exit = True
+            thread.join(timeout=10)
+            database.close_connections()
+
+    results['speedup'] = round(results['tuned']['requests_per_sec'] /
+                               max(results['baseline']['requests_per_sec'], 0.1), 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Library listing latency: full filesystem rescan vs. indexed queries.
+
+Builds a synthetic library (default 100 novels x 2,000 chapters) in a
+temporary directory and database, then times:
+
+- legacy_rescan: the old per-request glob + stat scan of every chapter
+- index_full:    one forced LibraryIndexer pass (startup / POST /sync)
+- index_diff:    a LibraryIndexer pass when nothing changed
+- list_novels:   GET /api/novels, now a pure database query
+
+    python benchmarks/bench_library.py --novels 100 --chapters 2000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api import database  # noqa: E402
+
+
+def build_library(root: Path, novels: int, chapters: int):
+    body = "word " * 400
+    for n in range(novels):
+        folder = root / f"Bench-Novel-{n:03d}"
+        folder.mkdir(parents=True)
+        for c in range(1, chapters + 1):
+            (folder / f"Chapter_{c:04d}.txt").write_text(f"Chapter {c}\n{'=' * 60}\n\n{body}")
+
+
+def legacy_rescan(root: Path):
+    """The scan list_novels used to run on every request"""
+    for folder in root.iterdir():
+        chapter_files = list(folder.glob("Chapter_*.txt"))
+        if chapter_files:
+            latest_file = max(chapter_files, key=lambda f: f.stat().st_mtime)
+            latest_file.stat()
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'runs': repeat,
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 3),
+        'max_ms': round(samples[-1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--novels", type=int, default=100)
+    parser.add_argument("--chapters", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "output"
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+
+        print(f"[INFO] Building {args.novels} novels x {args.chapters} chapters...")
+        build_library(root, args.novels, args.chapters)
+
+        from fastapi.testclient import TestClient
+        from src.api.indexer import LibraryIndexer
+        from src.api.main import app
+
+        indexer = LibraryIndexer(root, sync_chapters=False)
+        client = TestClient(app)  # No lifespan: background services stay off
+
+        results = {
+            'novels': args.novels,
+            'chapters_per_novel': args.chapters,
+            'legacy_rescan': timed(lambda: legacy_rescan(root), 3),
+            'index_full': timed(lambda: indexer.refresh(force=True), 3),
+            'index_diff': timed(indexer.refresh, 20),
+            'list_novels': timed(lambda: client.get("/api/novels").raise_for_status(), args.requests),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
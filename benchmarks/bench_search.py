@@ -0,0 +1,132 @@
+"""Full-text search: index build throughput and query latency.
+
+Generates a synthetic corpus (Zipf-distributed words, ~20 KB chapters) in a
+temporary directory, indexes it through the normal library/chapter sync and
+times search_chapters for common, rare, phrase, prefix and filtered queries.
+
+    python benchmarks/bench_search.py --size-mb 2048
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api import database  # noqa: E402
+
+CHAPTER_BYTES = 20_000
+SYLLABLES = ["ka", "lo", "mi", "ren", "shu", "tai", "vel", "yan", "zor", "qi", "fen", "dra", "mor", "sil", "ul"]
+
+
+def make_vocabulary(size: int, rng) -> list:
+    """size distinct pseudo-words in random order; earlier words are drawn more often"""
+    words = []
+    for length in range(1, 6):
+        words.extend("".join(parts) for parts in itertools.product(SYLLABLES, repeat=length))
+        if len(words) >= size:
+            break
+    rng.shuffle(words)
+    return words[:size]
+
+
+def build_corpus(root: Path, size_mb: int, novels: int, rng, vocab) -> int:
+    """Write the corpus and return the number of chapters"""
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+    mean_word_bytes = float(np.dot(weights, [len(word) + 1 for word in vocab]))
+    words_per_chapter = int(CHAPTER_BYTES / mean_word_bytes)
+    chapters = max(novels, size_mb * 1024 * 1024 // CHAPTER_BYTES)
+    vocab = np.array(vocab)
+
+    for number in range(chapters):
+        folder = root / f"Search-Novel-{number % novels:03d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        words = vocab[rng.choice(len(vocab), size=words_per_chapter, p=weights)]
+        lines = [" ".join(words[i:i + 15]) + "." for i in range(0, len(words), 15)]
+        title = " ".join(words[:3]).title()
+        (folder / f"Chapter_{number // novels + 1:04d}.txt").write_text(
+            f"{title}\n{'=' * 60}\n\n" + "\n\n".join(lines)
+        )
+    return chapters
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 3),
+        'max_ms': round(samples[-1], 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=2048, help="Corpus size in MB")
+    parser.add_argument("--novels", type=int, default=50)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    vocab = make_vocabulary(args.vocabulary, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "output"
+        database.DB_PATH = Path(tmp) / "novels.db"
+        database.init_db()
+
+        print(f"[INFO] Generating {args.size_mb} MB corpus...")
+        chapters = build_corpus(root, args.size_mb, args.novels, rng, vocab)
+        corpus_bytes = sum(f.stat().st_size for f in root.rglob("Chapter_*.txt"))
+
+        from src.api.indexer import LibraryIndexer
+        from src.api.search import search_chapters
+
+        print("[INFO] Building index...")
+        started = time.perf_counter()
+        LibraryIndexer(root).refresh(force=True)
+        build_seconds = time.perf_counter() - started
+
+        queries = {
+            'common_word': (vocab[0],),
+            'mid_word': (vocab[500],),
+            'rare_word': (vocab[-1],),
+            'two_words': (f"{vocab[3]} {vocab[800]}",),
+            'phrase': (f'"{vocab[0]} {vocab[1]}"',),
+            'prefix': (vocab[10][:3] + "*",),
+            'novel_filter': (vocab[200], "search-novel-007"),
+            'deep_page': (vocab[0], None, None, None, 20, 1000),
+        }
+
+        results = {
+            'corpus_mb': round(corpus_bytes / 1024 / 1024, 1),
+            'chapters': chapters,
+            'build_seconds': round(build_seconds, 2),
+            'build_mb_per_sec': round(corpus_bytes / 1024 / 1024 / build_seconds, 2),
+            'build_chapters_per_sec': round(chapters / build_seconds, 1),
+            'db_mb': round(database.DB_PATH.stat().st_size / 1024 / 1024, 1),
+            'queries': {
+                name: {'matches': search_chapters(*query)[1], **timed(lambda: search_chapters(*query), args.repeat)}
+                for name, query in queries.items()
+            }
+        }
+        database.close_connections()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Deterministic synthetic novel corpus for the benchmark suite.
+
+Chapters are built from a fixed vocabulary with a seeded RNG, so the same
+arguments always give the same text on every machine. Paragraph length and
+the share of dialogue paragraphs are tunable because both change how much
+work the segmenter and the TTS chunking do.
+"""
+
+import json
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Tuple
+
+WORDS = (
+    "the", "cultivator", "spring", "gu", "heaven", "refined", "mountain", "blood", "sect", "ancient",
+    "master", "silently", "however", "immortal", "formation", "essence", "primeval", "stone", "clan",
+    "elder", "disciple", "river", "sword", "demonic", "path", "heart", "moon", "thunder", "jade", "fate",
+    "of", "and", "a", "in", "to", "was", "his", "her", "with", "through", "beneath", "against", "while"
+)
+SPEAKERS = ("Fang Yuan", "Elder Bai", "the old man", "Hei Tu", "she", "he")
+VERBS = ("said", "asked", "replied", "muttered", "shouted")
+MAX_CHUNK_CHARS = 250  # Same limit as the segmenter
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus"""
+    novels: int = 1
+    chapters: int = 20
+    paragraphs: int = 30             # Paragraphs per chapter
+    paragraph_words: Tuple[int, int] = (20, 90)
+    dialogue_ratio: float = 0.35     # Share of paragraphs that are quoted speech
+    seed: int = 7
+
+    def novel_name(self, index: int) -> str:
+        return f"Bench-Novel-{index:03d}"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    # Occasional clauses exercise the segmenter's long-sentence fallback
+    if words > 12 and rng.random() < 0.5:
+        cut = rng.randrange(4, words - 4)
+        parts = text.split(" ")
+        text = " ".join(parts[:cut]) + ", " + " ".join(parts[cut:])
+    return text.capitalize() + rng.choice(".....!?")
+
+
+def _paragraph(rng: random.Random, words: int, dialogue: bool) -> str:
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(6, 24))
+        sentences.append(_sentence(rng, length))
+        words -= length
+    text = " ".join(sentences)
+    if dialogue:
+        return f'"{text}" {rng.choice(SPEAKERS)} {rng.choice(VERBS)}.'
+    return text
+
+
+def generate_chapter(spec: CorpusSpec, novel: int, number: int) -> Tuple[str, List[str]]:
+    """Title and paragraphs of one chapter; depends only on spec, novel and number"""
+    rng = random.Random(f"{spec.seed}:{novel}:{number}")
+    title = f"Chapter {number}: {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+    low, high = spec.paragraph_words
+    paragraphs = [
+        _paragraph(rng, rng.randint(low, high), rng.random() < spec.dialogue_ratio)
+        for _ in range(spec.paragraphs)
+    ]
+    return title, paragraphs
+
+
+def write_corpus(root: Path, spec: CorpusSpec) -> List[Path]:
+    """Write chapters in the scraper's Chapter_XXXX.txt layout; returns the novel folders"""
+    folders = []
+    for novel in range(spec.novels):
+        folder = Path(root) / spec.novel_name(novel)
+        folder.mkdir(parents=True, exist_ok=True)
+        for number in range(1, spec.chapters + 1):
+            title, paragraphs = generate_chapter(spec, novel, number)
+            (folder / f"Chapter_{number:04d}.txt").write_text(
+                f"{title}\n{'=' * 60}\n\n" + "\n\n".join(paragraphs), encoding="utf-8"
+            )
+        folders.append(folder)
+    return folders
+
+
+def simple_chunks(paragraph: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Sentence-packing chunker close to the segmenter's output, without spaCy"""
+    chunks, current = [], ""
+    for sentence in re.split(r'(?<=[.!?"])\s+', paragraph):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+        while len(current) > max_chars:
+            chunks.append(current[:max_chars])
+            current = current[max_chars:].strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def write_segments(root: Path, spec: CorpusSpec) -> List[Path]:
+    """Write segmenter-style chapter JSON (the TTS input) for every novel"""
+    folders = []
+    for novel in range(spec.novels):
+        folder = Path(root) / spec.novel_name(novel)
+        folder.mkdir(parents=True, exist_ok=True)
+        for number in range(1, spec.chapters + 1):
+            title, paragraphs = generate_chapter(spec, novel, number)
+            chunks = [chunk for paragraph in paragraphs for chunk in simple_chunks(paragraph)]
+            chapter_id = f"Chapter_{number:04d}"
+            (folder / f"{chapter_id}.json").write_text(json.dumps({
+                "title": title,
+                "chapter_id": chapter_id,
+                "chunks": chunks,
+                "chunk_count": len(chunks)
+            }), encoding="utf-8")
+        folders.append(folder)
+    return folders
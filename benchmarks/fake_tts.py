@@ -0,0 +1,126 @@
+"""Deterministic stand-in for kokoro's KPipeline.
+
+FakeKPipeline takes the same constructor and call arguments as KPipeline
+and yields (graphemes, phonemes, audio) results the same way: one per
+split_pattern piece, with long pieces split again the way the model splits
+input that exceeds its token window. Each result sleeps for a tunable
+per-call plus per-character latency and returns a tone whose length
+follows the text, so orchestration overhead can be measured without
+downloading or running the model.
+
+    from fake_tts import install_fake_kokoro
+    install_fake_kokoro(seconds_per_char=0.0005)
+    from src.main import AudioBookGenerator   # now builds a FakeKPipeline
+"""
+
+import re
+import sys
+import threading
+import time
+import types
+import zlib
+
+import numpy as np
+
+SAMPLE_RATE = 24000
+
+
+class FakeKModel:
+    """KModel look-alike; counts instances so tests can check the model is shared"""
+
+    instances = 0
+
+    def __init__(self, repo_id: str = None, **kwargs):
+        FakeKModel.instances += 1
+        self.repo_id = repo_id
+        self.device = "cpu"
+
+    def to(self, device):
+        self.device = device
+        return self
+
+    def eval(self):
+        return self
+
+
+class FakeKPipeline:
+    """KPipeline look-alike with deterministic latency and output"""
+
+    # Tunables shared by every instance; install_fake_kokoro sets them
+    call_latency = 0.002           # Seconds per yielded segment
+    seconds_per_char = 0.0002      # Model time per input character
+    audio_seconds_per_char = 0.06  # Speech length per character (~15 chars/s)
+    max_segment_chars = 200        # Longer pieces are yielded in several parts
+    first_call_latency = 0.0       # Extra time of an instance's first call (lazy model setup)
+    voice_load_latency = 0.0       # Time to load a voice pack the first time it is used
+
+    def __init__(self, lang_code: str = "a", repo_id: str = None, model=True, device: str = None, **kwargs):
+        self.lang_code = lang_code
+        self.repo_id = repo_id
+        self.device = device or "cpu"
+        # Like KPipeline: reuse a passed model, build one for model=True
+        self.model = model if isinstance(model, FakeKModel) else FakeKModel(repo_id) if model else None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.segments = 0
+        self.busy_seconds = 0.0  # Simulated model time, for computing orchestration overhead
+        self.voices = {}         # Loaded packs by name, like KPipeline.voices
+
+    def _segments(self, text: str, split_pattern):
+        pieces = re.split(split_pattern, text) if split_pattern else [text]
+        for piece in pieces:
+            piece = piece.strip()
+            while len(piece) > self.max_segment_chars:
+                cut = piece.rfind(" ", 0, self.max_segment_chars)
+                cut = cut if cut > 0 else self.max_segment_chars
+                yield piece[:cut]
+                piece = piece[cut:].strip()
+            if piece:
+                yield piece
+
+    @staticmethod
+    def render(text: str) -> np.ndarray:
+        """The audio a segment always produces"""
+        samples = max(1, int(len(text) * FakeKPipeline.audio_seconds_per_char * SAMPLE_RATE))
+        frequency = 110 + zlib.crc32(text.encode("utf-8")) % 330
+        t = np.arange(samples, dtype=np.float32) / SAMPLE_RATE
+        return (0.1 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+    def load_voice(self, voice: str) -> np.ndarray:
+        """Pack for voice, loaded once per instance like KPipeline.load_voice"""
+        if not isinstance(voice, str):
+            return voice
+        if voice not in self.voices:
+            time.sleep(self.voice_load_latency)
+            self.voices[voice] = np.full((510, 1, 256), zlib.crc32(voice.encode("utf-8")) % 7, dtype=np.float32)
+        return self.voices[voice]
+
+    def __call__(self, text: str, voice: str = None, speed: float = 1, split_pattern=r'\n+', **kwargs):
+        with self._lock:
+            self.calls += 1
+            first = self.calls == 1
+        if voice is not None:
+            self.load_voice(voice)
+        if first and self.first_call_latency:
+            time.sleep(self.first_call_latency)
+        for segment in self._segments(text, split_pattern):
+            latency = self.call_latency + self.seconds_per_char * len(segment)
+            time.sleep(latency)
+            with self._lock:
+                self.segments += 1
+                self.busy_seconds += latency
+            yield segment, segment, self.render(segment)
+
+
+def install_fake_kokoro(**tunables) -> types.ModuleType:
+    """Register a fake kokoro module so code importing KPipeline/KModel gets the fakes"""
+    for name, value in tunables.items():
+        if not hasattr(FakeKPipeline, name):
+            raise TypeError(f"Unknown FakeKPipeline setting: {name}")
+        setattr(FakeKPipeline, name, value)
+
+    module = types.ModuleType("kokoro")
+    module.KPipeline = FakeKPipeline
+    module.KModel = FakeKModel
+    sys.modules["kokoro"] = module
+    return module
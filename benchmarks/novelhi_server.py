@@ -0,0 +1,187 @@
+"""Local HTTP server imitating novelhi.com for scraper benchmarks.
+
+Serves the URL layout the scraper expects from a CorpusSpec:
+
+    /s/index/<Novel-Name>    table of contents with "Content (N)"
+    /s/<Novel-Name>/<n>      chapter page: <h1> title, #showReading body
+
+Chapter pages carry the navigation, script and ad markup of the real site
+so extraction does realistic work. Pages are rendered on request from the
+seeded corpus, can be delayed to imitate network latency, and a share of
+them can fail so retry paths are exercised.
+
+HttpDriver is a minimal WebDriver look-alike over plain HTTP that the
+scraper and DriverManager can drive instead of Chrome.
+"""
+
+import html
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from corpus import CorpusSpec, generate_chapter
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{title} - NovelHi</title>
+<script>window.__ads = {{slots: ["top", "bottom"], lazy: true}};</script>
+<link rel="stylesheet" href="/static/read.css"></head>
+<body>
+<div class="header"><a href="/">NovelHi</a> <a href="/s/index/{novel}">{novel}</a></div>
+<div class="ad-slot" id="ad-top">Advertisement</div>
+<h1>{title}</h1>
+<div class="read-nav"><a href="/s/{novel}/{prev}">Prev</a> <a href="/s/index/{novel}">Index</a> <a href="/s/{novel}/{next}">Next</a></div>
+<div id="showReading">
+{paragraphs}
+</div>
+<div class="ad-slot" id="ad-bottom">Advertisement</div>
+<script>document.querySelectorAll('.ad-slot').forEach(function (el) {{ el.dataset.ready = 1; }});</script>
+</body></html>
+"""
+
+TOC_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{novel} - NovelHi</title></head>
+<body><h1>{novel}</h1><h2>Content ({count})</h2>
+<ul class="chapter-list">
+{links}
+</ul></body></html>
+"""
+
+
+class NovelhiServer:
+    """Threaded local server for a generated corpus; use as a context manager"""
+
+    def __init__(self, spec: CorpusSpec, latency_ms: float = 0.0, failure_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.spec = spec
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._failures = random.Random(spec.seed)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def toc_url(self, novel: int = 0) -> str:
+        return f"{self.base_url}/s/index/{self.spec.novel_name(novel)}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _novel_index(self, name: str):
+        for index in range(self.spec.novels):
+            if self.spec.novel_name(index) == name:
+                return index
+        return None
+
+    def render(self, path: str):
+        """(status, body) for a request path"""
+        match = re.fullmatch(r"/s/index/([^/]+)/?", path)
+        if match:
+            novel = self._novel_index(match.group(1))
+            if novel is None:
+                return 404, "Not found"
+            name = self.spec.novel_name(novel)
+            links = "\n".join(
+                f'<li><a href="/s/{name}/{n}">Chapter {n}</a></li>' for n in range(1, self.spec.chapters + 1)
+            )
+            return 200, TOC_TEMPLATE.format(novel=name, count=self.spec.chapters, links=links)
+
+        match = re.fullmatch(r"/s/([^/]+)/(\d+)/?", path)
+        if match:
+            novel = self._novel_index(match.group(1))
+            number = int(match.group(2))
+            if novel is None or not 1 <= number <= self.spec.chapters:
+                return 404, "Not found"
+            with self._lock:
+                failed = self.failure_rate and self._failures.random() < self.failure_rate
+            if failed:
+                # Real failures are pages that render without the reading container
+                return 200, "<html><body><h1>Please wait...</h1></body></html>"
+            title, paragraphs = generate_chapter(self.spec, novel, number)
+            body = "\n".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+            return 200, PAGE_TEMPLATE.format(
+                title=html.escape(title), novel=match.group(1), paragraphs=body,
+                prev=max(1, number - 1), next=number + 1
+            )
+        return 404, "Not found"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, body = server.render(self.path.split("?", 1)[0])
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class HttpDriver:
+    """Just enough of the WebDriver API for NovelScraper and DriverManager"""
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self.page_source = ""
+        self.current_url = None
+        self._cookies = []
+
+    def get(self, url: str):
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                self.page_source = response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            self.page_source = e.read().decode("utf-8", "replace")
+        self.current_url = url
+
+    def find_element(self, by: str, value: str):
+        from selenium.common.exceptions import NoSuchElementException
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    def find_elements(self, by: str, value: str):
+        if by == "id":
+            return [value] if f'id="{value}"' in self.page_source else []
+        if by == "tag name":
+            return re.findall(rf"<{re.escape(value)}[\s>]", self.page_source)
+        return []
+
+    def get_cookies(self):
+        return list(self._cookies)
+
+    def execute_cdp_cmd(self, cmd: str, params: dict):
+        if cmd == "Network.setCookie":
+            self._cookies.append(dict(params))
+        return {}
+
+    def quit(self):
+        self.page_source = ""
@@ -0,0 +1,300 @@
+"""End-to-end benchmark suite with JSON results for comparing commits.
+
+Runs on a seeded synthetic corpus (benchmarks/corpus.py), so results from
+different machines or commits measure the same work:
+
+  segmentation  SmartSegmenter.process_novel over the corpus (needs spaCy)
+  synthesis     AudioBookGenerator.process_novel with FakeKPipeline in place
+                of the model after a warmup: wall time vs. simulated model
+                time is the orchestration overhead (needs torch and soundfile)
+  scraping      NovelScraper.scrape_range against a local novelhi look-alike
+                through HttpDriver instead of Chrome; the fixed politeness
+                delays are removed unless --keep-delays is given
+  api           latency of the main read endpoints in-process on a
+                temporary library
+
+Benchmarks whose dependencies are missing are reported as skipped. Every
+metric records its unit and whether lower or higher is better, so
+
+    python benchmarks/suite.py --output base.json
+    git checkout feature && python benchmarks/suite.py --compare base.json
+
+prints the metrics that got worse by more than --tolerance and exits 1.
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from corpus import CorpusSpec, write_corpus, write_segments  # noqa: E402
+from fake_tts import FakeKPipeline, install_fake_kokoro  # noqa: E402
+from novelhi_server import HttpDriver, NovelhiServer  # noqa: E402
+
+BENCHMARKS = ("segmentation", "synthesis", "scraping", "api")
+
+
+def metric(value: float, unit: str, better: str = "lower") -> dict:
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def info(value, unit: str) -> dict:
+    """A metric reported for context and never compared"""
+    return {"value": value, "unit": unit, "better": None}
+
+
+def skipped(error: ImportError) -> dict:
+    return {"skipped": f"{getattr(error, 'name', None) or error} not installed"}
+
+
+def percentile(samples, fraction: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+# --------------------------------------------------
+
+
+def bench_segmentation(args, spec: CorpusSpec, tmp: Path) -> dict:
+    try:
+        from src.segmenter import SmartSegmenter
+        segmenter = SmartSegmenter()  # Imports spaCy
+    except ImportError as e:
+        return skipped(e)
+
+    folders = write_corpus(tmp / "chapters", spec)
+    started = time.perf_counter()
+    chapters = chunks = 0
+    for folder in folders:
+        stats = segmenter.process_novel(str(folder), str(tmp / "segments"))
+        chapters += stats["processed"]
+        chunks += stats["total_chunks"]
+    seconds = time.perf_counter() - started
+
+    return {"metrics": {
+        "seconds": metric(seconds, "s"),
+        "chapters_per_second": metric(chapters / seconds, "chapters/s", "higher"),
+        "chunks_per_second": metric(chunks / seconds, "chunks/s", "higher"),
+        "chunks": info(chunks, "chunks")
+    }}
+
+
+def bench_synthesis(args, spec: CorpusSpec, tmp: Path) -> dict:
+    install_fake_kokoro(seconds_per_char=args.tts_seconds_per_char, call_latency=args.tts_call_latency,
+                        first_call_latency=args.tts_first_call_latency)
+    try:
+        import soundfile as sf
+        from src.main import AudioBookGenerator
+        # torch is imported when the generator is built
+        generator = AudioBookGenerator(output_dir=str(tmp / "audio"), use_gpu=False)
+    except ImportError as e:
+        return skipped(e)
+
+    folders = write_segments(tmp / "segments", spec)
+    warmup = generator.warmup()
+    busy_before = generator.pipeline.busy_seconds
+    started = time.perf_counter()
+    chunks = 0
+    for folder in folders:
+        stats = generator.process_novel(str(folder))
+        chunks += stats.get("success", 0)
+    seconds = time.perf_counter() - started
+
+    audio_seconds = sum(sf.info(str(path)).duration for path in (tmp / "audio").rglob("*.wav"))
+    model_seconds = generator.pipeline.busy_seconds - busy_before
+    overhead = seconds - model_seconds
+    return {"metrics": {
+        "seconds": metric(seconds, "s"),
+        "model_seconds": info(round(model_seconds, 6), "s"),
+        "overhead_seconds": metric(overhead, "s"),
+        "overhead_per_chunk_ms": metric(overhead * 1000 / max(chunks, 1), "ms"),
+        "chunks_per_second": metric(chunks / seconds, "chunks/s", "higher"),
+        "real_time_factor": metric(seconds / audio_seconds if audio_seconds else 0.0, "x"),
+        "audio_seconds": info(round(audio_seconds, 3), "s"),
+        "model_segments": info(generator.pipeline.segments, "segments"),
+        "warmup_cold_ms": info(warmup["cold_ms"], "ms"),
+        "warmup_warm_ms": metric(warmup["warm_ms"] or 0.0, "ms")
+    }}
+
+
+def bench_scraping(args, spec: CorpusSpec, tmp: Path) -> dict:
+    try:
+        from src import browser, metrics, scraper
+    except ImportError as e:
+        return skipped(e)
+
+    class LocalScraper(scraper.NovelScraper):
+        def start_driver(self):
+            return HttpDriver()
+
+    delays = contextlib.ExitStack()
+    if not args.keep_delays:
+        delays.enter_context(patch.object(browser, "SETTLE_DELAY", 0))
+        delays.enter_context(patch.object(scraper, "time", types.SimpleNamespace(sleep=lambda seconds: None)))
+
+    metrics.REGISTRY.clear()
+    with NovelhiServer(spec, latency_ms=args.page_latency_ms) as server, delays:
+        started = time.perf_counter()
+        for novel in range(spec.novels):
+            LocalScraper().scrape_range(server.toc_url(novel), 1, spec.chapters, output_dir=str(tmp / "scraped"))
+        seconds = time.perf_counter() - started
+
+    saved = len(list((tmp / "scraped").rglob("Chapter_*.txt")))
+    loads = metrics.SCRAPER_PAGE_LOAD_SECONDS.summary()
+    extracts = metrics.SCRAPER_EXTRACT_SECONDS.summary()
+    return {"metrics": {
+        "seconds": metric(seconds, "s"),
+        "chapters_per_second": metric(saved / seconds, "chapters/s", "higher"),
+        "page_load_mean_ms": metric(loads["sum"] * 1000 / max(loads["count"], 1), "ms"),
+        "extract_mean_ms": metric(extracts["sum"] * 1000 / max(extracts["count"], 1), "ms"),
+        "chapters_saved": info(saved, "chapters")
+    }}
+
+
+def bench_api(args, spec: CorpusSpec, tmp: Path) -> dict:
+    try:
+        from fastapi.testclient import TestClient
+
+        from src.api import database
+        from src.api.indexer import LibraryIndexer
+        from src.api.routes import chapters
+    except ImportError as e:
+        return skipped(e)
+
+    write_corpus(tmp / "output", spec)
+    with patch.object(database, "DB_PATH", tmp / "novels.db"), patch.object(chapters, "AUDIO_DIR", tmp / "audio"):
+        database.init_db()
+        LibraryIndexer(tmp / "output", audio_dir=tmp / "audio").refresh(force=True)
+        from src.api.main import app
+
+        client = TestClient(app)
+        slug = spec.novel_name(0).lower()
+        endpoints = {
+            "novel_list": lambda i: "/api/novels",
+            "chapter_list": lambda i: f"/api/chapters/novel/{slug}",
+            "chapter_content": lambda i: f"/api/chapters/novel/{slug}/{i % spec.chapters + 1}",
+        }
+        results = {}
+        for name, url in endpoints.items():
+            samples = []
+            for i in range(args.api_requests):
+                started = time.perf_counter()
+                response = client.get(url(i))
+                samples.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url(i)} returned {response.status_code}")
+            results[f"{name}_p50_ms"] = metric(statistics.median(samples), "ms")
+            results[f"{name}_p95_ms"] = metric(percentile(samples, 0.95), "ms")
+        database.close_connections()
+    return {"metrics": results}
+
+
+RUNNERS = {
+    "segmentation": bench_segmentation,
+    "synthesis": bench_synthesis,
+    "scraping": bench_scraping,
+    "api": bench_api,
+}
+
+
+# --------------------------------------------------
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than tolerance (a fraction)"""
+    regressions = []
+    for bench, result in results["benchmarks"].items():
+        before = baseline.get("benchmarks", {}).get(bench, {}).get("metrics", {})
+        for name, current in result.get("metrics", {}).items():
+            previous = before.get(name)
+            if not previous or current["better"] is None or not previous["value"]:
+                continue
+            change = (current["value"] - previous["value"]) / previous["value"]
+            worse = change > tolerance if current["better"] == "lower" else change < -tolerance
+            if worse:
+                regressions.append({
+                    "metric": f"{bench}.{name}", "baseline": previous["value"],
+                    "current": current["value"], "change": round(change, 4)
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--novels", type=int, default=1)
+    parser.add_argument("--chapters", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=30, help="Paragraphs per chapter")
+    parser.add_argument("--paragraph-words", type=int, nargs=2, default=[20, 90], metavar=("MIN", "MAX"))
+    parser.add_argument("--dialogue-ratio", type=float, default=0.35)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--tts-seconds-per-char", type=float, default=FakeKPipeline.seconds_per_char)
+    parser.add_argument("--tts-call-latency", type=float, default=FakeKPipeline.call_latency)
+    parser.add_argument("--tts-first-call-latency", type=float, default=0.2,
+                        help="Simulated lazy model setup paid by the first call")
+    parser.add_argument("--page-latency-ms", type=float, default=5)
+    parser.add_argument("--keep-delays", action="store_true", help="Keep the scraper's fixed sleeps")
+    parser.add_argument("--api-requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--output", help="Write results here instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before a regression")
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        novels=args.novels, chapters=args.chapters, paragraphs=args.paragraphs,
+        paragraph_words=tuple(args.paragraph_words), dialogue_ratio=args.dialogue_ratio, seed=args.seed
+    )
+    results = {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "only")},
+        "benchmarks": {}
+    }
+
+    for name in args.only:
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sys.stderr):
+            # Component progress output goes to stderr so stdout stays valid JSON
+            results["benchmarks"][name] = RUNNERS[name](args, spec, Path(tmp))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        results["baseline_commit"] = baseline.get("commit")
+        results["regressions"] = compare(results, baseline, args.tolerance)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    for regression in results.get("regressions", []):
+        print(f"[REGRESSION] {regression['metric']}: {regression['baseline']} -> {regression['current']} "
+              f"({regression['change']:+.0%})", file=sys.stderr)
+    if results.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
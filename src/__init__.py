@@ -1,6 +1,12 @@
 """Package initialization for the novel scraper."""
 
-from .scraper import NovelScraper
-
 __version__ = "1.0.0"
 __all__ = ["NovelScraper"]
+
+
+def __getattr__(name):
+    # Loaded on first use so importing src.config or the API does not pull in selenium
+    if name == "NovelScraper":
+        from .scraper import NovelScraper
+        return NovelScraper
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,267 @@
+"""
+Audio streaming for NovelLabs
+Byte-range responses for chapter audio, sent with zero-copy sendfile when the
+ASGI server supports it, and time-based seeking that maps seconds to a byte
+offset using a seek index built once per audio file.
+"""
+
+import bisect
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException
+from starlette.responses import Response
+
+from ..config import API_CONFIG
+
+MEDIA_TYPES = {
+    '.wav': 'audio/wav',
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg'
+}
+
+_RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+# Seek indexes kept in memory, keyed by path, mtime and size
+SEEK_INDEX_ENTRIES = 256
+
+
+def media_type_for(path: Path) -> str:
+    return MEDIA_TYPES.get(path.suffix.lower(), 'application/octet-stream')
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range into inclusive (start, end) offsets.
+
+    Returns None for a header that is not a single byte range, which is
+    then ignored and the whole file sent; RFC 9110 lets a server ignore
+    multiple ranges. Ranges outside the file, and any range of an empty
+    file, raise 416.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not spec or ',' in spec:
+        return None
+
+    match = _RANGE_RE.match(spec)
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise range_not_satisfiable(size)
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise range_not_satisfiable(size)
+    return start, end
+
+
+def range_not_satisfiable(size: int, detail: str = "Range not satisfiable") -> HTTPException:
+    return HTTPException(status_code=416, detail=detail, headers={'Content-Range': f'bytes */{size}'})
+
+
+class FileRangeResponse(Response):
+    """
+    Sends bytes start..end (inclusive) of a file, optionally preceded by a
+    synthesized header. Uses the ASGI zero-copy send extension when the
+    server offers it and positioned reads in a worker thread otherwise.
+    """
+
+    def __init__(self, path: Path, start: int, end: int, status_code: int = 200,
+                 prefix: bytes = b'', headers: Optional[dict] = None, media_type: Optional[str] = None):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.prefix = prefix
+        self.headers['content-length'] = str(len(prefix) + max(0, end - start + 1))
+        self.headers.setdefault('accept-ranges', 'bytes')
+
+    async def __call__(self, scope, receive, send):
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+        if scope.get('method') == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            return
+
+        count = self.end - self.start + 1
+        await send({'type': 'http.response.body', 'body': self.prefix, 'more_body': count > 0})
+        if count <= 0:
+            return
+
+        fd = await anyio.to_thread.run_sync(os.open, str(self.path), os.O_RDONLY)
+        try:
+            if 'http.response.zerocopysend' in scope.get('extensions', {}):
+                await send({'type': 'http.response.zerocopysend', 'file': fd,
+                            'offset': self.start, 'count': count, 'more_body': False})
+                return
+
+            chunk_size = API_CONFIG['audio_chunk_kb'] * 1024
+            position = self.start
+            while count > 0:
+                data = await anyio.to_thread.run_sync(os.pread, fd, min(chunk_size, count), position)
+                if not data:
+                    break
+                position += len(data)
+                count -= len(data)
+                await send({'type': 'http.response.body', 'body': data, 'more_body': count > 0})
+            if count > 0:
+                # The file shrank while streaming; end the body instead of hanging
+                await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            os.close(fd)
+
+
+# Seek indexes -------------------------------------------------
+
+class SeekIndex:
+    """Maps a time in seconds to (header bytes, first byte, last byte) of a playable stream"""
+
+    duration: float = 0.0
+
+    def locate(self, seconds: float) -> Tuple[bytes, int, int]:
+        raise NotImplementedError
+
+
+class WavSeekIndex(SeekIndex):
+    """PCM WAV: offsets follow from the byte rate; a new header describes the remaining data"""
+
+    def __init__(self, path: Path, size: int):
+        with open(path, 'rb') as f:
+            riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave != b'WAVE':
+                raise ValueError(f"{path.name} is not a WAV file")
+
+            self.fmt_chunk = None
+            while True:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    raise ValueError(f"{path.name} has no data chunk")
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+                if chunk_id == b'data':
+                    self.data_offset = f.tell()
+                    break
+                body = f.read(chunk_size + (chunk_size & 1))
+                if chunk_id == b'fmt ':
+                    self.fmt_chunk = chunk_header + body
+
+        if self.fmt_chunk is None:
+            raise ValueError(f"{path.name} has no fmt chunk")
+
+        self.byte_rate, self.block_align = struct.unpack_from('<IH', self.fmt_chunk, 16)
+        # Streaming writers may leave the size unset; trust the file length
+        self.data_size = min(chunk_size, size - self.data_offset)
+        self.data_size -= self.data_size % self.block_align
+        self.duration = self.data_size / self.byte_rate
+
+    def locate(self, seconds: float) -> Tuple[bytes, int, int]:
+        skip = int(seconds * self.byte_rate) // self.block_align * self.block_align
+        remaining = self.data_size - skip
+        header = (
+            struct.pack('<4sI4s', b'RIFF', 4 + len(self.fmt_chunk) + 8 + remaining, b'WAVE')
+            + self.fmt_chunk
+            + struct.pack('<4sI', b'data', remaining)
+        )
+        return header, self.data_offset + skip, self.data_offset + self.data_size - 1
+
+
+class OggOpusSeekIndex(SeekIndex):
+    """Ogg Opus: page start offsets by granule position, found with one pass over the pages"""
+
+    SAMPLE_RATE = 48000
+    PREROLL = 3840  # 80 ms decoder pre-roll recommended by RFC 7845
+
+    def __init__(self, path: Path, size: int):
+        self.header = b''
+        self.granules: List[int] = []
+        self.offsets: List[int] = []
+        self.pre_skip = 0
+
+        with open(path, 'rb') as f:
+            offset = 0
+            while offset < size:
+                f.seek(offset)
+                page = f.read(27)
+                if len(page) < 27 or page[:4] != b'OggS':
+                    break
+                granule = struct.unpack_from('<q', page, 6)[0]
+                segments = f.read(page[26])
+                page_size = 27 + len(segments) + sum(segments)
+
+                if not self.offsets and granule in (0, -1):
+                    # Identification and comment headers
+                    if offset == 0:
+                        head = f.read(12)
+                        if head[:8] != b'OpusHead':
+                            raise ValueError(f"{path.name} is not an Ogg Opus file")
+                        self.pre_skip = struct.unpack_from('<H', head, 10)[0]
+                    f.seek(offset)
+                    self.header += f.read(page_size)
+                elif granule >= 0:
+                    self.granules.append(granule)
+                    self.offsets.append(offset)
+                offset += page_size
+
+        if not self.offsets:
+            raise ValueError(f"{path.name} has no audio pages")
+        self.end = offset - 1
+        self.duration = max(0, self.granules[-1] - self.pre_skip) / self.SAMPLE_RATE
+
+    def locate(self, seconds: float) -> Tuple[bytes, int, int]:
+        target = self.pre_skip + int(seconds * self.SAMPLE_RATE) - self.PREROLL
+        # First page that ends after the pre-roll point
+        page = min(bisect.bisect_right(self.granules, target), len(self.offsets) - 1)
+        return self.header, self.offsets[page], self.end
+
+
+SEEK_INDEX_TYPES = {
+    '.wav': WavSeekIndex,
+    '.opus': OggOpusSeekIndex,
+    '.ogg': OggOpusSeekIndex
+}
+
+_seek_indexes: "OrderedDict[Tuple[str, int, int], SeekIndex]" = OrderedDict()
+_seek_lock = threading.Lock()
+
+
+def get_seek_index(path: Path, stat: os.stat_result) -> SeekIndex:
+    """The seek index of an audio file, built on first use"""
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _seek_lock:
+        index = _seek_indexes.get(key)
+        if index is not None:
+            _seek_indexes.move_to_end(key)
+            return index
+
+    index_type = SEEK_INDEX_TYPES.get(path.suffix.lower())
+    if index_type is None:
+        raise HTTPException(status_code=400, detail=f"Seeking is not supported for {path.suffix} files")
+    try:
+        index = index_type(path, stat.st_size)
+    except (ValueError, struct.error) as e:
+        raise HTTPException(status_code=400, detail=f"Cannot seek in audio file: {e}")
+
+    with _seek_lock:
+        _seek_indexes[key] = index
+        while len(_seek_indexes) > SEEK_INDEX_ENTRIES:
+            _seek_indexes.popitem(last=False)
+    return index
+
+
+def seek(path: Path, stat: os.stat_result, seconds: float) -> Tuple[bytes, int, int]:
+    """Header bytes and inclusive byte range that play the file from the given time"""
+    index = get_seek_index(path, stat)
+    if seconds >= index.duration:
+        raise range_not_satisfiable(stat.st_size, "Seek time is past the end of the audio")
+    return index.locate(seconds)
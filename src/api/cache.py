@@ -0,0 +1,152 @@
+"""
+Chapter content cache for NovelLabs
+A bounded, size-aware LRU of parsed chapter bodies keyed by file path, mtime
+and size, so a changed file is never served stale. The chapter routes
+prefetch the next chapter into it while the reader is busy with the current.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import API_CONFIG
+from ..metrics import CONTENT_CACHE_HIT_RATIO, CONTENT_CACHE_BYTES
+
+
+def read_chapter_body(content_path: str) -> str:
+    """Read a chapter file without its title and separator lines"""
+    with open(content_path, 'r', encoding='utf-8') as f:
+        title = f.readline()
+        separator = f.readline()
+        # Files shorter than three lines are returned whole
+        if not (title.endswith('\n') and separator.endswith('\n')):
+            return title + separator
+        return f.read().strip()
+
+
+class ContentCache:
+    """Thread-safe LRU of chapter bodies bounded by their memory size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, int, int], Tuple[str, int]]" = OrderedDict()
+        self._keys_by_path: Dict[str, Tuple[str, int, int]] = {}
+        self._prefetched = set()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetches = 0
+        self.prefetch_hits = 0
+
+    def get(self, content_path: Optional[str]) -> str:
+        """Chapter body for a content path; empty when the file is missing"""
+        key = self._key(content_path)
+        if key is None:
+            return ""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if key in self._prefetched:
+                    self._prefetched.discard(key)
+                    self.prefetch_hits += 1
+                return entry[0]
+            self.misses += 1
+
+        try:
+            content = read_chapter_body(content_path)
+        except OSError:
+            # Deleted or replaced since _key() stat'ed it
+            return ""
+        self._store(key, content)
+        return content
+
+    def prefetch(self, content_path: Optional[str]):
+        """Load a chapter body ahead of time unless it is already cached"""
+        key = self._key(content_path)
+        if key is None:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+
+        try:
+            content = read_chapter_body(content_path)
+        except OSError:
+            return
+        with self._lock:
+            self.prefetches += 1
+            self._prefetched.add(key)
+        self._store(key, content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_path.clear()
+            self._prefetched.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'prefetches': self.prefetches,
+                'prefetch_hits': self.prefetch_hits
+            }
+
+    # --------------------------------------------------
+
+    @staticmethod
+    def _key(content_path: Optional[str]) -> Optional[Tuple[str, int, int]]:
+        if not content_path:
+            return None
+        try:
+            stat = os.stat(content_path)
+        except OSError:
+            return None
+        return content_path, stat.st_mtime_ns, stat.st_size
+
+    def _store(self, key: Tuple[str, int, int], content: str):
+        size = sys.getsizeof(content)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            # An older version of the same file can never be hit again
+            stale = self._keys_by_path.get(key[0])
+            if stale is not None:
+                self._drop(stale)
+            self._entries[key] = (content, size)
+            self._keys_by_path[key[0]] = key
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Tuple[str, int, int]):
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+        self._prefetched.discard(key)
+        if self._keys_by_path.get(key[0]) == key:
+            del self._keys_by_path[key[0]]
+
+
+content_cache = ContentCache(max_bytes=API_CONFIG['content_cache_mb'] * 1024 * 1024)
+CONTENT_CACHE_HIT_RATIO.set_function(lambda: content_cache.stats()['hit_rate'])
+CONTENT_CACHE_BYTES.set_function(lambda: content_cache.stats()['bytes'])
@@ -0,0 +1,102 @@
+"""
+View counters for NovelLabs
+Novel page views are counted in memory and written to the novels table in
+batches, so reading a novel never waits on a database write.
+"""
+
+import itertools
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from ..config import API_CONFIG
+from .database import get_db
+
+
+class ViewCounter:
+    """Sharded in-memory view counts with periodic batch flushes"""
+
+    def __init__(self, shards: int = 16, flush_seconds: float = 10.0):
+        self.flush_seconds = flush_seconds
+        # Threads are spread over the shards so increments rarely share a lock
+        self._locks = [threading.Lock() for _ in range(max(1, shards))]
+        self._counts: List[Dict[str, int]] = [defaultdict(int) for _ in self._locks]
+        self._next_shard = itertools.count()
+        self._thread_shard = threading.local()
+        self._flush_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def increment(self, slug: str, count: int = 1):
+        shard = getattr(self._thread_shard, 'index', None)
+        if shard is None:
+            shard = self._thread_shard.index = next(self._next_shard) % len(self._locks)
+        with self._locks[shard]:
+            self._counts[shard][slug] += count
+
+    def pending(self, slug: str) -> int:
+        """Views counted for a novel but not yet written"""
+        total = 0
+        for shard, lock in enumerate(self._locks):
+            with lock:
+                total += self._counts[shard].get(slug, 0)
+        return total
+
+    def flush(self) -> int:
+        """
+        Write buffered counts to the database in one batch.
+
+        Returns:
+            Number of novels updated. Counts are put back if the write fails.
+        """
+        with self._flush_lock:
+            totals: Dict[str, int] = defaultdict(int)
+            for shard, lock in enumerate(self._locks):
+                with lock:
+                    counts, self._counts[shard] = self._counts[shard], defaultdict(int)
+                for slug, count in counts.items():
+                    totals[slug] += count
+
+            if not totals:
+                return 0
+
+            try:
+                with get_db() as conn:
+                    conn.executemany(
+                        'UPDATE novels SET views = views + ? WHERE slug = ?',
+                        [(count, slug) for slug, count in totals.items()]
+                    )
+            except Exception:
+                for slug, count in totals.items():
+                    self.increment(slug, count)
+                raise
+
+            return len(totals)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="view-counter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush loop and write whatever is still buffered"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+    def _loop(self):
+        while not self._stop_event.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[WARN] Failed to flush view counts: {e}")
+
+
+view_counter = ViewCounter(
+    shards=API_CONFIG['view_counter_shards'],
+    flush_seconds=API_CONFIG['view_flush_seconds']
+)
@@ -5,34 +5,148 @@ Uses SQLite for storing novel metadata and user preferences
 
 import sqlite3
 import os
+import threading
+import time
 from pathlib import Path
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 
+from ..config import DATABASE_CONFIG, METRICS_CONFIG
+from ..metrics import DB_QUERY_SECONDS
+
 # Database path
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DB_PATH = BASE_DIR / "data" / "novels.db"
 
+# One pooled connection per thread; the event loop thread serves every async route
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool: List[sqlite3.Connection] = []
+_generation = 0  # Bumped by close_connections so every thread reconnects
+
+
+def _statement_type(sql: str) -> str:
+    return sql.lstrip().split(None, 1)[0].upper() if sql.strip() else 'EMPTY'
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that records statement execution time in DB_QUERY_SECONDS"""
+    
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation=_statement_type(sql))
+    
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - started, operation=_statement_type(sql))
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors (including those of conn.execute) are timed"""
+    
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
 
 def get_connection() -> sqlite3.Connection:
-    """Get a database connection"""
-    conn = sqlite3.connect(str(DB_PATH))
+    """Open a new tuned database connection"""
+    conn = sqlite3.connect(
+        str(DB_PATH),
+        timeout=DATABASE_CONFIG['busy_timeout_ms'] / 1000,
+        cached_statements=DATABASE_CONFIG['cached_statements'],
+        check_same_thread=False,  # Only the owning thread uses it; close_connections may close it
+        factory=TimedConnection if METRICS_CONFIG['enabled'] else sqlite3.Connection
+    )
     conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+    conn.execute(f"PRAGMA journal_mode = {DATABASE_CONFIG['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {DATABASE_CONFIG['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = -{DATABASE_CONFIG['cache_size_kb']}")
+    conn.execute(f"PRAGMA mmap_size = {DATABASE_CONFIG['mmap_size_mb'] * 1024 * 1024}")
     return conn
 
 
+def _thread_connection() -> sqlite3.Connection:
+    """The calling thread's pooled connection, reopened if DB_PATH changed"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None and (_local.path, _local.generation) == (DB_PATH, _generation):
+        return conn
+    
+    if conn is not None:
+        _discard(conn)
+    
+    conn = get_connection()
+    _local.conn, _local.path, _local.generation, _local.depth = conn, DB_PATH, _generation, 0
+    with _pool_lock:
+        _pool.append(conn)
+    return conn
+
+
+def _discard(conn: sqlite3.Connection):
+    with _pool_lock:
+        if conn in _pool:
+            _pool.remove(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def close_connections():
+    """Close every pooled connection (called at shutdown)"""
+    global _generation
+    with _pool_lock:
+        connections, _pool[:] = list(_pool), []
+        _generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections"""
-    conn = get_connection()
+    """Context manager for database connections
+    
+    Commits when the outermost block exits and rolls back on an error.
+    Nested blocks on the same thread share the transaction.
+    """
+    if not DATABASE_CONFIG['pool_connections']:
+        conn = get_connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise e
+        finally:
+            conn.close()
+        return
+    
+    conn = _thread_connection()
+    _local.depth += 1
     try:
         yield conn
-        conn.commit()
+        if _local.depth == 1:
+            conn.commit()
     except Exception as e:
-        conn.rollback()
+        if _local.depth == 1:
+            conn.rollback()
         raise e
     finally:
-        conn.close()
+        _local.depth -= 1
 
 
 def init_db():
@@ -106,9 +220,163 @@ def init_db():
                 INSERT INTO user_preferences DEFAULT VALUES
             ''')
         
+        conn.commit()
+        migrate(conn)
+        
         print("[INFO] Database initialized successfully")
 
 
+# Schema migrations --------------------------------------------
+#
+# The tables created by init_db are schema version 0. Each migration moves
+# the database one version forward and the applied version is kept in
+# PRAGMA user_version. Append new migrations; never edit applied ones.
+
+def _add_chapter_file_stats(cursor: sqlite3.Cursor):
+    add_missing_columns(cursor, 'chapters', {
+        'file_size': 'INTEGER',
+        'file_mtime_ns': 'INTEGER'
+    })
+
+
+def _add_query_indexes(cursor: sqlite3.Cursor):
+    # list_novels sorts by last_updated; the scraper looks novels up by folder
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_novels_last_updated ON novels(last_updated DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_novels_data_path ON novels(data_path)')
+
+
+def _add_genres_tables(cursor: sqlite3.Cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS genres (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL COLLATE NOCASE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS novel_genres (
+            genre_id INTEGER NOT NULL REFERENCES genres(id) ON DELETE CASCADE,
+            novel_id INTEGER NOT NULL REFERENCES novels(id) ON DELETE CASCADE,
+            PRIMARY KEY (genre_id, novel_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_novel_genres_novel ON novel_genres(novel_id)')
+    sync_novel_genres(cursor)
+
+
+def _add_chapter_search(cursor: sqlite3.Cursor):
+    # rowid is chapters.id; the title column is weighted higher when ranking
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS chapter_search USING fts5(
+            title, body, tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+    # Forget the recorded file stats so the next sync reads and indexes every chapter
+    cursor.execute('UPDATE chapters SET file_size = NULL, file_mtime_ns = NULL')
+
+
+def _add_chapters_version(cursor: sqlite3.Cursor):
+    # Bumped whenever a sync changes a novel's chapter rows; used as an HTTP validator
+    add_missing_columns(cursor, 'novels', {'chapters_version': 'INTEGER NOT NULL DEFAULT 0'})
+
+
+def _add_chapters_changed_ns(cursor: sqlite3.Cursor):
+    # When chapters_version last moved; chapter Last-Modified can't be older
+    add_missing_columns(cursor, 'novels', {'chapters_changed_ns': 'INTEGER'})
+
+
+def _add_novel_search(cursor: sqlite3.Cursor):
+    # rowid is novels.id; lets the library title search avoid a LIKE '%x%' scan
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS novel_search USING fts5(
+            title, tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+    sync_novel_search(cursor)
+
+
+MIGRATIONS = [
+    (1, "chapter file size and mtime", _add_chapter_file_stats),
+    (2, "library query indexes", _add_query_indexes),
+    (3, "normalized genres", _add_genres_tables),
+    (4, "chapter full-text search", _add_chapter_search),
+    (5, "novel chapter list version", _add_chapters_version),
+    (6, "novel chapter change time", _add_chapters_changed_ns),
+    (7, "novel title search", _add_novel_search),
+]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction; returns the schema version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    for number, description, apply in MIGRATIONS:
+        if number <= version:
+            continue
+        conn.execute('BEGIN')
+        try:
+            apply(conn.cursor())
+            conn.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = number
+        print(f"[INFO] Applied migration {number}: {description}")
+    
+    return version
+
+
+def sync_novel_genres(cursor: sqlite3.Cursor, slugs: Optional[List[str]] = None):
+    """Rebuild the genre links of novels (all when slugs is None) from novels.genres"""
+    query = 'SELECT id, genres FROM novels'
+    params: List[str] = []
+    if slugs is not None:
+        if not slugs:
+            return
+        query += f" WHERE slug IN ({', '.join('?' * len(slugs))})"
+        params = list(slugs)
+    
+    cursor.execute(query, params)
+    novels = cursor.fetchall()
+    links = [
+        (novel_id, name.strip())
+        for novel_id, genres in novels
+        for name in (genres or '').split(',') if name.strip()
+    ]
+    
+    cursor.executemany('INSERT OR IGNORE INTO genres (name) VALUES (?)', {(name,) for _, name in links})
+    cursor.executemany('DELETE FROM novel_genres WHERE novel_id = ?', [(novel_id,) for novel_id, _ in novels])
+    cursor.executemany('''
+        INSERT OR IGNORE INTO novel_genres (genre_id, novel_id)
+        SELECT id, ? FROM genres WHERE name = ?
+    ''', links)
+
+
+def sync_novel_search(cursor: sqlite3.Cursor, slugs: Optional[List[str]] = None):
+    """Rebuild the title search entries of novels (all when slugs is None)"""
+    query = 'SELECT id, title FROM novels'
+    params: List[str] = []
+    if slugs is not None:
+        if not slugs:
+            return
+        query += f" WHERE slug IN ({', '.join('?' * len(slugs))})"
+        params = list(slugs)
+    
+    cursor.execute(query, params)
+    novels = cursor.fetchall()
+    cursor.executemany('DELETE FROM novel_search WHERE rowid = ?', [(novel_id,) for novel_id, _ in novels])
+    cursor.executemany('INSERT INTO novel_search (rowid, title) VALUES (?, ?)', [tuple(novel) for novel in novels])
+
+
+def add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: Dict[str, str]):
+    """Add columns that an existing database created by an older version lacks"""
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, definition in columns.items():
+        if name not in existing:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+
+
 def dict_from_row(row) -> Optional[Dict[str, Any]]:
     """Convert sqlite3.Row to dictionary"""
     if row is None:
@@ -0,0 +1,63 @@
+"""
+Blocking work offload for NovelLabs API routes
+SQLite queries, chapter file reads and filesystem syncs run on a bounded
+thread pool so a slow disk or a long query never stalls the event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from ..config import API_CONFIG
+from ..metrics import IO_QUEUE_DEPTH
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_queued_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """The shared I/O pool, created on first use"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            # Each worker thread keeps its own pooled database connection
+            _executor = ThreadPoolExecutor(max_workers=API_CONFIG['io_threads'], thread_name_prefix="api-io")
+        return _executor
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run fn(*args, **kwargs) on the I/O pool and await its result
+
+    IO_QUEUE_DEPTH counts the call until a pool thread picks it up, or until
+    it is cancelled before it started.
+    """
+    loop = asyncio.get_running_loop()
+    queued = [True]
+
+    def dequeue():
+        # Called from the worker and from the awaiting side; only the first counts
+        with _queued_lock:
+            if queued[0]:
+                queued[0] = False
+                IO_QUEUE_DEPTH.dec()
+
+    def call():
+        dequeue()
+        return fn(*args, **kwargs)
+
+    IO_QUEUE_DEPTH.inc()
+    try:
+        return await loop.run_in_executor(get_executor(), call)
+    finally:
+        dequeue()
+
+
+def shutdown_executor():
+    """Let running calls finish and stop the pool (called at shutdown)"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
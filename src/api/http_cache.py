@@ -0,0 +1,72 @@
+"""
+HTTP caching helpers for NovelLabs
+Validators (ETag / Last-Modified) are derived from database row versions and
+recorded file mtimes, so a conditional request can be answered with 304
+before any chapter file is opened.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from ..config import HTTP_CACHE_CONFIG
+
+
+def make_etag(*parts, weak: bool = True) -> str:
+    """
+    ETag over the values that determine a response.
+    Strong tags are only for byte-identical bodies (If-Range requires them).
+    """
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def mtime_to_datetime(mtime_ns: Optional[int]) -> Optional[datetime]:
+    if not mtime_ns:
+        return None
+    return datetime.fromtimestamp(mtime_ns // 1_000_000_000, tz=timezone.utc)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header"""
+    if header.strip() == '*':
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(candidate.strip().removeprefix('W/') == opaque for candidate in header.split(','))
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """True when the client's cached copy is still current (RFC 9110 precedence)"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def cache_headers(policy: str, etag: Optional[str], last_modified: Optional[datetime]) -> dict:
+    """Cache-Control for a named policy in HTTP_CACHE_CONFIG plus the validators"""
+    headers = {'Cache-Control': HTTP_CACHE_CONFIG[policy]}
+    if etag:
+        headers['ETag'] = etag
+    if last_modified:
+        headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(policy: str, etag: Optional[str], last_modified: Optional[datetime]) -> Response:
+    return Response(status_code=304, headers=cache_headers(policy, etag, last_modified))
+
@@ -0,0 +1,222 @@
+"""
+Library indexer for NovelLabs
+Keeps the novels table in step with data/output without rescanning it on
+every request. A manifest of novel folder mtimes is diffed on an interval
+(or when watchdog reports a change) and only changed folders are rescanned.
+A novel's audio folder counts too, so newly generated audio is picked up.
+
+Rewriting a chapter file in place (a rescrape or re-extraction) leaves the
+folder mtime alone. With watchdog the changed file's folder is queued for a
+resync directly; without it the manifest also records the newest chapter
+file mtime of every folder.
+"""
+
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Set
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:  # Fall back to polling only
+    Observer = None
+
+from ..config import API_CONFIG
+from .database import get_db, sync_novel_genres, sync_novel_search
+
+# Base directory for scraped data
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = BASE_DIR / "data" / "output"
+AUDIO_DIR = BASE_DIR / "audio"
+
+
+def make_slug(folder_name: str) -> str:
+    """Create the library slug for a novel folder name"""
+    slug = folder_name.lower().replace(' ', '-')
+    return re.sub(r'[^a-z0-9-]', '', slug)
+
+
+def scan_novel_folder(folder: Path) -> Optional[Dict[str, Any]]:
+    """Read a novel folder with a single directory listing; None if it has no chapters"""
+    chapter_count = 0
+    latest_mtime = 0.0
+
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.startswith("Chapter_") and entry.name.endswith(".txt"):
+                chapter_count += 1
+                latest_mtime = max(latest_mtime, entry.stat().st_mtime)
+
+    if chapter_count == 0:
+        return None
+
+    return {
+        'slug': make_slug(folder.name),
+        'title': folder.name.replace('-', ' ').title(),
+        'description': f'Novel with {chapter_count} chapters',
+        'genres': 'Fantasy,Action',  # Default genres
+        'chapter_count': chapter_count,
+        'data_path': str(folder),
+        'last_updated': datetime.fromtimestamp(latest_mtime)
+    }
+
+
+def latest_chapter_mtime(folder: str) -> Optional[int]:
+    """Newest Chapter_XXXX.txt mtime (ns) in a novel folder"""
+    latest = None
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("Chapter_") and entry.name.endswith(".txt"):
+                    latest = max(latest or 0, entry.stat().st_mtime_ns)
+    except OSError:
+        return None
+    return latest
+
+
+def upsert_novels(novels: List[Dict[str, Any]]):
+    """Insert new novels and refresh counts of known ones in one batch"""
+    with get_db() as conn:
+        conn.executemany('''
+            INSERT INTO novels (slug, title, description, genres, chapter_count, data_path, last_updated)
+            VALUES (:slug, :title, :description, :genres, :chapter_count, :data_path, :last_updated)
+            ON CONFLICT(slug) DO UPDATE SET
+                chapter_count = excluded.chapter_count,
+                last_updated = excluded.last_updated,
+                data_path = excluded.data_path
+        ''', novels)
+        slugs = [novel['slug'] for novel in novels]
+        sync_novel_genres(conn.cursor(), slugs)
+        sync_novel_search(conn.cursor(), slugs)
+
+
+class LibraryIndexer:
+    """Syncs changed novel folders into the database in the background"""
+
+    def __init__(self, data_dir: Path, poll_seconds: float = 5.0, sync_chapters: bool = True,
+                 audio_dir: Path = AUDIO_DIR):
+        self.data_dir = Path(data_dir)
+        self.audio_dir = Path(audio_dir)
+        self.poll_seconds = poll_seconds
+        self.sync_chapters = sync_chapters
+        # folder path -> (text folder, audio folder, newest chapter file) mtimes (ns)
+        self._manifest: Dict[str, tuple] = {}
+        self._pending: Set[str] = set()  # Folders with files reported changed since the last refresh
+        self._pending_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Rescan the novel folders that changed since the last refresh.
+        With sync_chapters their chapter rows and search entries are synced too.
+
+        A folder counts as changed when its own or its audio folder's mtime
+        moved, when a file in it was reported through notify(), or, when no
+        watchdog observer is running, when its newest chapter file changed.
+
+        Args:
+            force: Rescan every folder regardless of the manifest.
+
+        Returns:
+            Number of novels written to the database.
+        """
+        with self._lock:
+            if not self.data_dir.exists():
+                return 0
+
+            with self._pending_lock:
+                pending, self._pending = self._pending, set()
+            # Without events, in-place rewrites only show in the file mtimes
+            watch_files = self._observer is None
+
+            manifest = {}
+            changed = []
+            with os.scandir(self.data_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir() and not entry.name.startswith('.'):
+                        # Recorded before the scan, so files added during it trigger another pass
+                        mtime = (
+                            entry.stat().st_mtime_ns,
+                            self._audio_mtime(entry.name),
+                            latest_chapter_mtime(entry.path) if watch_files else None
+                        )
+                        manifest[entry.path] = mtime
+                        if force or entry.path in pending or self._manifest.get(entry.path) != mtime:
+                            changed.append(Path(entry.path))
+
+            novels = [novel for novel in map(scan_novel_folder, changed) if novel]
+            if novels:
+                upsert_novels(novels)
+                if self.sync_chapters:
+                    from .routes.chapters import sync_chapters_for_path
+                    for novel in novels:
+                        sync_chapters_for_path(novel['data_path'])
+
+            self._manifest = manifest
+            return len(novels)
+
+    def _audio_mtime(self, folder_name: str) -> Optional[int]:
+        try:
+            return os.stat(self.audio_dir / folder_name).st_mtime_ns
+        except OSError:
+            return None
+
+    def notify(self, path: Optional[str] = None):
+        """Ask the background loop to refresh now; path is a file that changed, e.g. a rewritten chapter"""
+        if path is not None:
+            with self._pending_lock:
+                self._pending.add(os.path.dirname(os.path.abspath(path)))
+        self._wake_event.set()
+
+    def _on_event(self, event):
+        if event.is_directory:
+            self.notify()
+            return
+        for path in (event.src_path, getattr(event, 'dest_path', None)):
+            if path:
+                self.notify(path)
+
+    def start(self):
+        """Start the background loop; the first pass indexes every folder"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="library-indexer", daemon=True)
+        self._thread.start()
+
+        if Observer is not None and self.data_dir.exists():
+            handler = FileSystemEventHandler()
+            handler.on_any_event = self._on_event
+            self._observer = Observer()
+            self._observer.schedule(handler, str(self.data_dir), recursive=True)
+            self._observer.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[WARN] Library index refresh failed: {e}")
+            self._wake_event.wait(self.poll_seconds)
+            self._wake_event.clear()
+
+
+library_indexer = LibraryIndexer(DATA_DIR, poll_seconds=API_CONFIG['index_poll_seconds'])
@@ -0,0 +1,223 @@
+"""
+Scrape job runner for NovelLabs
+Bounded worker pool with a priority queue, one active job per novel and
+thread-safe job state that can be streamed to asyncio subscribers. TTS jobs
+use a runner of their own (see tts_worker.py) so they never hold a scrape slot.
+"""
+
+import asyncio
+import itertools
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from ..config import SCRAPER_CONFIG
+from ..metrics import JOB_QUEUE_DEPTH
+
+# Lower runs first; jobs with the same priority run in submission order
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 10
+
+ACTIVE_STATUSES = ('pending', 'detecting', 'running')
+
+
+class ScrapeJobRunner:
+    """Runs jobs on a fixed number of worker threads; name prefixes the thread names"""
+
+    def __init__(self, max_workers: int = 2, name: str = "scrape"):
+        self.max_workers = max_workers
+        self.name = name
+        self._lock = threading.RLock()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._active_slugs: Dict[str, str] = {}  # slug -> job_id
+        self._subscribers: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._workers = []
+
+    # Lifecycle ------------------------------------------------
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._lock:
+            if self._workers:
+                return
+            for number in range(self.max_workers):
+                worker = threading.Thread(target=self._work, name=f"{self.name}-worker-{number + 1}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def stop(self):
+        """Cancel queued and running jobs and let the workers exit"""
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                if job['status'] in ACTIVE_STATUSES:
+                    self._set(job_id, status='cancelled', error='Server shutting down')
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._queue.put((float('inf'), next(self._sequence), None, None, None, (), {}))
+
+    # Submitting -----------------------------------------------
+
+    def submit(self, slug: str, target: Callable, args: tuple = (), kwargs: Optional[dict] = None,
+               priority: int = PRIORITY_USER, **fields) -> Tuple[str, bool]:
+        """
+        Queue target(job_id, *args, **kwargs) unless the novel already has an active job.
+
+        Returns:
+            Tuple of (job_id, created). When created is False job_id is the
+            job that is already queued or running for the slug.
+        """
+        self.start()
+
+        with self._lock:
+            existing = self.active_job_id(slug)
+            if existing:
+                return existing, False
+
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = {
+                'status': 'pending',
+                'current_chapter': 0,
+                'total_chapters': 0,
+                'skipped_chapters': 0,
+                'novel_title': None,
+                'error': None,
+                'slug': slug,
+                'priority': priority,
+                'queued_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                **fields
+            }
+            self._active_slugs[slug] = job_id
+            self._queue.put((priority, next(self._sequence), job_id, slug, target, args, kwargs or {}))
+            self._publish(job_id)
+
+        return job_id, True
+
+    # Job state ------------------------------------------------
+
+    def update(self, job_id: str, **fields):
+        """Update fields of a job; unknown (removed) jobs are ignored"""
+        with self._lock:
+            if job_id in self._jobs:
+                self._set(job_id, **fields)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of every job keyed by id"""
+        with self._lock:
+            return {job_id: dict(job) for job_id, job in self._jobs.items()}
+
+    def active_job_id(self, slug: str) -> Optional[str]:
+        with self._lock:
+            return self._active_slugs.get(slug)
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job is None or job['status'] == 'cancelled'
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job['status'] == 'pending')
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a job; returns the resulting status or None if the job is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] in ACTIVE_STATUSES:
+                # Queued jobs are skipped by the workers, running ones stop at the next chapter
+                self._set(job_id, status='cancelled', error='Cancelled by user')
+            return job['status']
+
+    def remove(self, job_id: str) -> bool:
+        with self._lock:
+            if job_id not in self._jobs:
+                return False
+            self.cancel(job_id)
+            del self._jobs[job_id]
+            self._publish_event({'job_id': job_id, 'removed': True})
+            return True
+
+    # Push channel ---------------------------------------------
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register an asyncio queue that receives every job change"""
+        events: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        with self._lock:
+            self._subscribers.add((asyncio.get_running_loop(), events))
+        return events
+
+    def unsubscribe(self, events: asyncio.Queue):
+        with self._lock:
+            self._subscribers = {(loop, q) for loop, q in self._subscribers if q is not events}
+
+    # Internals ------------------------------------------------
+
+    def _set(self, job_id: str, **fields):
+        job = self._jobs[job_id]
+        job.update(fields)
+        if fields.get('status') in ('completed', 'failed', 'cancelled'):
+            job['finished_at'] = time.time()
+            # A running job keeps its novel until its worker returns
+            if job['started_at'] is None:
+                self._release(job['slug'], job_id)
+        self._publish(job_id)
+
+    def _release(self, slug: str, job_id: str):
+        with self._lock:
+            if self._active_slugs.get(slug) == job_id:
+                del self._active_slugs[slug]
+
+    def _publish(self, job_id: str):
+        self._publish_event({'job_id': job_id, **self._jobs[job_id]})
+
+    def _publish_event(self, event: Dict[str, Any]):
+        for loop, events in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(self._offer, events, event)
+            except RuntimeError:  # Loop already closed
+                self._subscribers.discard((loop, events))
+
+    @staticmethod
+    def _offer(events: asyncio.Queue, event: Dict[str, Any]):
+        if not events.full():
+            events.put_nowait(event)
+
+    def _work(self):
+        while True:
+            _, _, job_id, slug, target, args, kwargs = self._queue.get()
+            if job_id is None:
+                return
+
+            try:
+                with self._lock:
+                    if self.is_cancelled(job_id):
+                        continue
+                    self._set(job_id, started_at=time.time())
+
+                try:
+                    target(job_id, *args, **kwargs)
+                except Exception as e:
+                    self.update(job_id, status='failed', error=str(e))
+                else:
+                    job = self.get(job_id)
+                    if job and job['status'] in ACTIVE_STATUSES:
+                        self.update(job_id, status='completed')
+            finally:
+                self._release(slug, job_id)
+                self._queue.task_done()
+
+
+job_runner = ScrapeJobRunner(max_workers=SCRAPER_CONFIG['max_concurrent_jobs'])
+JOB_QUEUE_DEPTH.set_function(job_runner.queue_depth)
@@ -4,12 +4,22 @@ Main application entry point
 """
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from .routes import novels, chapters, scraper, audio
-from .database import init_db
+from .compression import CompressionMiddleware
+from .routes import novels, chapters, scraper, audio, updates, search, admin
+from .counters import view_counter
+from .database import init_db, close_connections
+from .executor import shutdown_executor
+from .indexer import library_indexer
+from .jobs import job_runner
+from .scheduler import update_scheduler
+from .tts_worker import tts_job_runner
+from ..config import ensure_output_dirs, UPDATE_CONFIG, COMPRESSION_CONFIG, METRICS_CONFIG
+from ..metrics import REGISTRY, MetricsMiddleware
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -27,22 +37,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if COMPRESSION_CONFIG['enabled']:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_CONFIG['minimum_size'],
+        gzip_level=COMPRESSION_CONFIG['gzip_level'],
+        brotli_quality=COMPRESSION_CONFIG['brotli_quality'],
+        brotli_enabled=COMPRESSION_CONFIG['brotli']
+    )
+
+# Outermost, so latency includes compression
+if METRICS_CONFIG['enabled']:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(novels.router, prefix="/api/novels", tags=["novels"])
 app.include_router(chapters.router, prefix="/api/chapters", tags=["chapters"])
 app.include_router(scraper.router, prefix="/api/scraper", tags=["scraper"])
 app.include_router(audio.router, prefix="/api/audio", tags=["audio"])
+app.include_router(updates.router, prefix="/api/updates", tags=["updates"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 # Mount static files for covers and audio
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
+ensure_output_dirs()  # StaticFiles needs the audio folder to exist
 app.mount("/covers", StaticFiles(directory=str(BASE_DIR / "web" / "public" / "covers")), name="covers")
 app.mount("/audio", StaticFiles(directory=str(BASE_DIR / "audio")), name="audio")
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database on startup"""
+    """Initialize database and background services on startup"""
     init_db()
+    library_indexer.start()
+    view_counter.start()
+    job_runner.start()
+    tts_job_runner.start()
+    audio.warmup_on_startup()
+    if UPDATE_CONFIG['enabled']:
+        update_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background services"""
+    update_scheduler.stop()
+    job_runner.stop()
+    tts_job_runner.stop()
+    library_indexer.stop()
+    view_counter.stop()  # Writes buffered views before the connections close
+    shutdown_executor()
+    close_connections()
 
 
 @app.get("/")
@@ -55,3 +101,10 @@ async def root():
 async def health_check():
     """Health check for API"""
     return {"status": "healthy"}
+
+
+if METRICS_CONFIG['enabled']:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics"""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
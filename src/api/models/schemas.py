@@ -3,7 +3,7 @@ Pydantic models for API request/response schemas
 """
 
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 
 
@@ -67,26 +67,93 @@ class ChapterContentResponse(BaseModel):
     next_chapter: Optional[int]
 
 
+class ChapterListItem(ChapterBase):
+    """Slim chapter row for listings; ChapterResponse is the full record"""
+    id: int
+    word_count: int = 0
+    has_audio: bool
+
+
 class ChapterListResponse(BaseModel):
-    chapters: List[ChapterResponse]
-    total: int
+    chapters: List[ChapterListItem]
+    total: int  # Matching chapters across all pages
+    next_after: Optional[int] = None  # Pass as `after` for the next page; None on the last page
+
+
+# Audio schemas
+class AudioBatchItem(BaseModel):
+    chapter_id: int
+    voice: Optional[str] = None  # Defaults to TTS_CONFIG['default_voice']; languages can be mixed
+
+
+class AudioBatchRequest(BaseModel):
+    items: List[AudioBatchItem]
 
 
 # Scraper schemas
 class ScrapeRequest(BaseModel):
     toc_url: str
-    start_chapter: int
+    start_chapter: int = 1
     end_chapter: Optional[int] = None  # None triggers auto-detection
+    chapters: Optional[List[int]] = None  # Explicit sparse chapter numbers
+    chapter_ranges: Optional[List[Tuple[int, int]]] = None  # Inclusive (start, end) pairs
 
 
 class ScrapeStatusResponse(BaseModel):
     status: str  # 'pending', 'running', 'completed', 'failed'
     current_chapter: int
-    total_chapters: int
+    total_chapters: int  # Chapters that actually need fetching
+    skipped_chapters: int = 0  # Requested chapters already saved
     novel_title: Optional[str]
     error: Optional[str] = None
 
 
+# Update scheduler schemas
+class NovelUpdateResult(BaseModel):
+    slug: str
+    title: str
+    local_chapters: int
+    remote_chapters: Optional[int] = None
+    missing_chapters: int = 0
+    job_id: Optional[str] = None
+    job_created: bool = False  # False when job_id is a job that was already active
+    error: Optional[str] = None
+
+
+class UpdateSummaryResponse(BaseModel):
+    status: str  # 'idle', 'running'
+    enabled: bool
+    interval_hours: float
+    last_started: Optional[datetime]
+    last_finished: Optional[datetime]
+    next_run: Optional[datetime]
+    novels_checked: int
+    novels_outdated: int
+    missing_chapters: int
+    jobs_started: int
+    errors: int
+    novels: List[NovelUpdateResult]
+
+
+# Search schemas
+class SearchResult(BaseModel):
+    chapter_id: int
+    novel_id: int
+    novel_slug: str
+    novel_title: str
+    chapter_number: int
+    title: Optional[str] = None
+    snippet: str  # HTML-escaped, matches wrapped in <mark>
+    rank: float  # bm25 score, lower is better
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchResult]
+    total: int
+    limit: int
+    offset: int
+
+
 # User preferences
 class UserPreferencesBase(BaseModel):
     font_size: int = 18
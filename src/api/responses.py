@@ -0,0 +1,34 @@
+"""
+JSON responses for the heavy NovelLabs endpoints
+Routes that return large payloads build plain dicts and return them in a
+FastJSONResponse, which skips FastAPI's response_model revalidation and
+encodes with orjson when it is installed.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+
+def _default(value: Any):
+    """Types orjson cannot encode natively"""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json')
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """Compact JSON rendered with orjson (or json without whitespace)"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default)
+        return json.dumps(content, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
@@ -0,0 +1,22 @@
+"""
+Admin API routes - runtime statistics of the API process
+"""
+
+from fastapi import APIRouter
+
+from ..cache import content_cache
+
+router = APIRouter()
+
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Hit rate, size and prefetch statistics of the chapter content cache"""
+    return content_cache.stats()
+
+
+@router.delete("/cache")
+async def clear_cache():
+    """Drop every cached chapter body"""
+    content_cache.clear()
+    return {"message": "Content cache cleared"}
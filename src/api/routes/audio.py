@@ -2,12 +2,19 @@
 Audio API routes - handles TTS generation and audio streaming
 """
 
+import os
 from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, List, Optional, Tuple
 
 from ..database import get_db, dict_from_row
+from ..executor import run_blocking
+from ..models.schemas import AudioBatchRequest
+from ..jobs import PRIORITY_USER, PRIORITY_BACKGROUND
+from ..tts_worker import tts_worker, tts_job_runner
+from ..http_cache import make_etag, mtime_to_datetime, is_not_modified, not_modified, cache_headers
+from ..audio_stream import FileRangeResponse, media_type_for, parse_range, seek
+from ...config import TTS_CONFIG
 
 router = APIRouter()
 
@@ -16,9 +23,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 AUDIO_DIR = BASE_DIR / "audio"
 
 
-@router.get("/chapter/{chapter_id}")
-async def get_chapter_audio(chapter_id: int):
-    """Get audio file for a chapter"""
+def find_chapter_audio(chapter_id: int) -> Tuple[Path, os.stat_result]:
+    """Path and stat of a chapter's audio file; raises 404 if there is none"""
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('SELECT audio_path FROM chapters WHERE id = ?', (chapter_id,))
@@ -29,19 +35,16 @@ async def get_chapter_audio(chapter_id: int):
         
         audio_path = Path(chapter['audio_path'])
         
-        if not audio_path.exists():
+        try:
+            stat = audio_path.stat()
+        except OSError:
             raise HTTPException(status_code=404, detail="Audio file not found")
     
-    return FileResponse(
-        audio_path, 
-        media_type="audio/wav",
-        filename=audio_path.name
-    )
+    return audio_path, stat
 
 
-@router.get("/novel/{slug}/{chapter_number}")
-async def get_chapter_audio_by_number(slug: str, chapter_number: int):
-    """Get audio file by novel slug and chapter number"""
+def find_chapter_audio_by_number(slug: str, chapter_number: int) -> Tuple[Path, os.stat_result]:
+    """Path and stat of the audio file for a novel's chapter; raises 404 if there is none"""
     with get_db() as conn:
         cursor = conn.cursor()
         
@@ -64,28 +67,263 @@ async def get_chapter_audio_by_number(slug: str, chapter_number: int):
         
         audio_path = Path(chapter['audio_path'])
         
-        if not audio_path.exists():
+        try:
+            stat = audio_path.stat()
+        except OSError:
             raise HTTPException(status_code=404, detail="Audio file not found")
     
-    return FileResponse(
-        audio_path,
-        media_type="audio/wav", 
-        filename=audio_path.name
-    )
+    return audio_path, stat
+
+
+def audio_file_response(request: Request, audio_path: Path, stat: os.stat_result, t: Optional[float]):
+    """
+    Stream an audio file, honouring a single byte range or a start time.
+
+    With t the response is a complete file starting at that time (a fresh
+    header followed by the remaining audio), so Range is not applied to it.
+    """
+    # Strong validator so If-Range requests resume with a partial response
+    etag = make_etag('audio', str(audio_path), stat.st_mtime_ns, stat.st_size, t or None, weak=False)
+    last_modified = mtime_to_datetime(stat.st_mtime_ns)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified('audio', etag, last_modified)
+    
+    headers = cache_headers('audio', etag, last_modified)
+    headers['Content-Disposition'] = f'attachment; filename="{audio_path.name}"'
+    media_type = media_type_for(audio_path)
+    
+    if t:
+        prefix, start, end = seek(audio_path, stat, t)
+        return FileRangeResponse(audio_path, start, end, prefix=prefix, headers=headers, media_type=media_type)
+    
+    byte_range = None
+    range_header = request.headers.get('range')
+    if range_header:
+        # A stale If-Range means the client wants the whole new file
+        if_range = request.headers.get('if-range')
+        if if_range is None or if_range in (etag, headers.get('Last-Modified')):
+            byte_range = parse_range(range_header, stat.st_size)
+    
+    if byte_range is None:
+        return FileRangeResponse(audio_path, 0, stat.st_size - 1, headers=headers, media_type=media_type)
+    
+    start, end = byte_range
+    headers['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return FileRangeResponse(audio_path, start, end, status_code=206, headers=headers, media_type=media_type)
+
+
+@router.get("/chapter/{chapter_id}")
+async def get_chapter_audio(
+    chapter_id: int,
+    request: Request,
+    t: Optional[float] = Query(None, ge=0, description="Start at this many seconds")
+):
+    """Get audio file for a chapter"""
+    audio_path, stat = await run_blocking(find_chapter_audio, chapter_id)
+    return await run_blocking(audio_file_response, request, audio_path, stat, t)
+
+
+@router.get("/novel/{slug}/{chapter_number}")
+async def get_chapter_audio_by_number(
+    slug: str,
+    chapter_number: int,
+    request: Request,
+    t: Optional[float] = Query(None, ge=0, description="Start at this many seconds")
+):
+    """Get audio file by novel slug and chapter number"""
+    audio_path, stat = await run_blocking(find_chapter_audio_by_number, slug, chapter_number)
+    return await run_blocking(audio_file_response, request, audio_path, stat, t)
+
+
+def load_audio_chapter(chapter_id: int):
+    """Chapter row with its novel's title and folder; raises ValueError if missing"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT c.chapter_number, c.content_path, n.id AS novel_id, n.title AS novel_title, n.data_path
+            FROM chapters c JOIN novels n ON n.id = c.novel_id
+            WHERE c.id = ?
+        ''', (chapter_id,))
+        chapter = cursor.fetchone()
+    if chapter is None:
+        raise ValueError("Chapter not found")
+    return chapter
+
+
+def synthesize_audio_chapter(generator, segmenter, chapter) -> Dict:
+    """Segment a chapter's text and write AUDIO_DIR/<novel folder>/Chapter_XXXX.wav"""
+    chapter_key = f"Chapter_{chapter['chapter_number']:04d}"
+    novel_dir = AUDIO_DIR / Path(chapter['data_path']).name
+    
+    with segmenter.profiler.chapter(f"{novel_dir.name}/{chapter_key}"):
+        with segmenter.profiler.phase("read"):
+            with open(chapter['content_path'], 'r', encoding='utf-8') as f:
+                raw_text = f.read()
+        with segmenter.profiler.phase("segment"):
+            _, chunks = segmenter.segment_chapter(raw_text)
+    
+    novel_dir.mkdir(parents=True, exist_ok=True)
+    result = generator.synthesize_chapter(chapter_key, chunks, str(novel_dir / f"{chapter_key}.wav"))
+    if chunks and not result['success']:
+        raise RuntimeError("Synthesis failed for every chunk")
+    return result
+
+
+def run_audio_generation(job_id: str, chapter_id: int, voice: str, profile: bool):
+    """Segment and synthesize one chapter on the TTS job runner
+    
+    With profile set, phase timings, the sampling profiler report and a
+    torch trace are written to logs/profiles/audio-<job_id> and the top
+    phases are stored on the job.
+    """
+    from ...profiling import Profiler, profile_dir
+    from .chapters import sync_chapters_for_novel
+    
+    chapter = load_audio_chapter(chapter_id)
+    tts_job_runner.update(job_id, status='running', novel_title=chapter['novel_title'], total_chapters=1)
+    
+    profiler = None
+    if profile:
+        profiler = Profiler(output_dir=profile_dir(f"audio-{job_id}"), label=f"chapter {chapter_id} ({voice})")
+    
+    try:
+        # The shared generator and segmenter keep the model, voices and spaCy warm between jobs
+        with tts_worker.session(voice, profiler=profiler) as (generator, segmenter):
+            if profiler is not None:
+                profiler.start()
+            synthesize_audio_chapter(generator, segmenter, chapter)
+        
+        sync_chapters_for_novel(chapter['novel_id'], chapter['data_path'])
+        tts_job_runner.update(job_id, current_chapter=1)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            profiler.write()
+            report = profiler.report()
+            tts_job_runner.update(job_id, profile={
+                'dir': str(profiler.output_dir),
+                'wall_seconds': report['wall_seconds'],
+                'top_phases': report['totals'][:5]
+            })
+
+
+def run_batch_generation(job_id: str, items: List[Tuple[int, str]]):
+    """Synthesize (chapter_id, voice) pairs in order; voices of any language share the model"""
+    from .chapters import sync_chapters_for_novel
+    
+    tts_job_runner.update(job_id, status='running', total_chapters=len(items))
+    novels, errors = {}, []
+    for index, (chapter_id, voice) in enumerate(items, 1):
+        if tts_job_runner.is_cancelled(job_id):
+            break
+        try:
+            chapter = load_audio_chapter(chapter_id)
+            with tts_worker.session(voice) as (generator, segmenter):
+                synthesize_audio_chapter(generator, segmenter, chapter)
+            novels[chapter['novel_id']] = chapter['data_path']
+        except Exception as e:
+            errors.append({'chapter_id': chapter_id, 'voice': voice, 'error': str(e)})
+        tts_job_runner.update(job_id, current_chapter=index, errors=errors)
+    
+    for novel_id, data_path in novels.items():
+        sync_chapters_for_novel(novel_id, data_path)
+    if errors and not novels:
+        raise RuntimeError(f"Every chapter failed: {errors[0]['error']}")
+
+
+def check_voice(voice: str):
+    """400 for a voice whose language Kokoro does not know"""
+    from ...main import lang_code_for
+    
+    try:
+        lang_code_for(voice)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/generate/{chapter_id}")
-async def generate_audio(chapter_id: int, voice: str = "af_heart"):
-    """Generate audio for a chapter using TTS (placeholder for now)"""
-    # This would trigger the TTS generator
-    # For now, return a message
+async def generate_audio(chapter_id: int, voice: str = TTS_CONFIG['default_voice'], profile: bool = False):
+    """Queue TTS generation for a chapter; profile=true records a profiling report"""
+    check_voice(voice)
+    job_id, created = tts_job_runner.submit(
+        f"audio:{chapter_id}", run_audio_generation,
+        args=(chapter_id, voice, profile),
+        priority=PRIORITY_USER,
+        kind='audio', chapter_id=chapter_id, voice=voice, profile_requested=profile
+    )
     return {
-        "message": "Audio generation queued",
+        "job_id": job_id,
+        "message": "Audio generation queued" if created else "Audio generation is already queued or running",
         "chapter_id": chapter_id,
-        "voice": voice
+        "voice": voice,
+        "profile": profile
     }
 
 
+@router.get("/jobs/{job_id}")
+async def get_audio_job(job_id: str):
+    """Status of an audio generation job, with its profile summary when profiled"""
+    job = tts_job_runner.get(job_id)
+    if job is None or job.get('kind') != 'audio':
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/generate-batch")
+async def generate_audio_batch(request: AudioBatchRequest):
+    """Queue one job that synthesizes several chapters, each with its own voice"""
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No chapters given")
+    items = [(item.chapter_id, item.voice or TTS_CONFIG['default_voice']) for item in request.items]
+    for _, voice in items:
+        check_voice(voice)
+    
+    job_id, created = tts_job_runner.submit(
+        "audio-batch:" + ",".join(f"{chapter_id}:{voice}" for chapter_id, voice in items),
+        run_batch_generation, args=(items,), priority=PRIORITY_USER,
+        kind='audio', chapter_ids=[chapter_id for chapter_id, _ in items],
+        voices=sorted({voice for _, voice in items})
+    )
+    return {
+        "job_id": job_id,
+        "message": "Batch queued" if created else "This batch is already queued or running",
+        "chapters": len(items)
+    }
+
+
+def run_warmup(job_id: str, voices: Optional[List[str]]):
+    """Load the TTS model and preload voices on the TTS job runner"""
+    tts_job_runner.update(job_id, status='running')
+    report = tts_worker.warmup(voices)
+    tts_job_runner.update(job_id, warmup=report)
+
+
+@router.post("/warmup")
+async def warmup_tts(voices: Optional[str] = Query(None, description="Comma-separated voices to preload")):
+    """Queue loading the model, preloading voices and running the warmup corpus"""
+    voice_list = [v.strip() for v in voices.split(',') if v.strip()] if voices else None
+    job_id, created = tts_job_runner.submit(
+        "tts:warmup", run_warmup, args=(voice_list,), priority=PRIORITY_USER,
+        kind='audio', voices=voice_list
+    )
+    return {
+        "job_id": job_id,
+        "message": "Warmup queued" if created else "Warmup is already queued or running"
+    }
+
+
+@router.get("/worker")
+async def get_tts_worker():
+    """Whether the TTS model is loaded, the voices held in memory and the cold vs warm latency of the warmup"""
+    return tts_worker.status()
+
+
+def warmup_on_startup():
+    """Queue a background warmup when TTS_CONFIG['warmup_on_startup'] is set"""
+    if TTS_CONFIG['warmup_on_startup']:
+        tts_job_runner.submit("tts:warmup", run_warmup, args=(None,), priority=PRIORITY_BACKGROUND, kind='audio')
+
+
 @router.get("/voices")
 async def list_voices():
     """List available TTS voices"""
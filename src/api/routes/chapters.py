@@ -4,13 +4,19 @@ Chapters API routes
 
 import os
 import re
+import time
 from pathlib import Path
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional, List, Set
 
 from ..database import get_db, dict_from_row, list_from_rows
+from ..cache import content_cache
+from ..executor import run_blocking, get_executor
+from ..http_cache import make_etag, mtime_to_datetime, is_not_modified, not_modified, cache_headers
+from ..responses import FastJSONResponse
+from ..search import update_search_index, remove_from_search_index
 from ..models.schemas import ChapterResponse, ChapterListResponse, ChapterContentResponse
+from ...config import API_CONFIG
 
 router = APIRouter()
 
@@ -19,202 +25,407 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 AUDIO_DIR = BASE_DIR / "audio"
 
 
+CHAPTER_FILE_RE = re.compile(r'^Chapter_(\d+)\.txt$')
+
+# Changed chapters read and written per batch during a sync
+SYNC_BATCH = 200
+
+
+# A chapter with its neighbours in one statement. The bounds come from two
+# index seeks, so the window only ever sees the target and its neighbours.
+CHAPTER_NAV_QUERY = '''
+    WITH target AS ({target}),
+    bounds AS (
+        SELECT t.novel_id, t.chapter_number,
+            COALESCE((SELECT MAX(c.chapter_number) FROM chapters c
+                      WHERE c.novel_id = t.novel_id AND c.chapter_number < t.chapter_number),
+                     t.chapter_number) AS low,
+            COALESCE((SELECT MIN(c.chapter_number) FROM chapters c
+                      WHERE c.novel_id = t.novel_id AND c.chapter_number > t.chapter_number),
+                     t.chapter_number) AS high
+        FROM target t
+    )
+    SELECT * FROM (
+        SELECT c.*,
+            LAG(c.chapter_number) OVER nav AS prev_chapter,
+            LEAD(c.chapter_number) OVER nav AS next_chapter,
+            LEAD(c.content_path) OVER nav AS next_content_path,
+            (SELECT n.chapters_changed_ns FROM novels n WHERE n.id = c.novel_id) AS chapters_changed_ns
+        FROM bounds b
+        JOIN chapters c ON c.novel_id = b.novel_id AND c.chapter_number BETWEEN b.low AND b.high
+        WINDOW nav AS (ORDER BY c.chapter_number)
+    )
+    WHERE chapter_number = (SELECT chapter_number FROM target)
+'''
+
+CHAPTER_BY_ID = CHAPTER_NAV_QUERY.format(
+    target='SELECT novel_id, chapter_number FROM chapters WHERE id = ?'
+)
+
+CHAPTER_BY_NUMBER = CHAPTER_NAV_QUERY.format(target='''
+        SELECT c.novel_id, c.chapter_number FROM chapters c
+        JOIN novels n ON n.id = c.novel_id
+        WHERE n.slug = ? AND c.chapter_number = ?
+    ''')
+
+
+def read_chapter_content(content_path: Optional[str]) -> str:
+    """Read a chapter file without its title and separator lines, through the content cache"""
+    return content_cache.get(content_path)
+
+
+def chapter_content_response(chapter: dict) -> dict:
+    """The ChapterContentResponse body for a chapter row"""
+    content = read_chapter_content(chapter['content_path'])
+    
+    # Readers usually continue to the next chapter; have it ready
+    if API_CONFIG['prefetch_next_chapter'] and chapter['next_content_path']:
+        get_executor().submit(content_cache.prefetch, chapter['next_content_path'])
+    
+    return {
+        'id': chapter['id'],
+        'novel_id': chapter['novel_id'],
+        'chapter_number': chapter['chapter_number'],
+        'title': chapter['title'] or f"Chapter {chapter['chapter_number']}",
+        'content': content,
+        'has_audio': bool(chapter['audio_path']),
+        'prev_chapter': chapter['prev_chapter'],
+        'next_chapter': chapter['next_chapter']
+    }
+
+
+def read_chapter_summary(path: str, chapter_number: int, with_body: bool = False):
+    """Read the title from the first line and count words line by line
+    
+    Returns (title, word_count, body); body is None unless with_body is set.
+    """
+    lines = [] if with_body else None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            title = f.readline().strip() or f"Chapter {chapter_number}"
+            word_count = len(title.split())
+            for line in f:
+                word_count += len(line.split())
+                if lines is not None:
+                    lines.append(line)
+    except Exception:
+        return f"Chapter {chapter_number}", 0, None
+    
+    # The body starts after the separator line
+    body = ''.join(lines[1:]).strip() if lines is not None else None
+    return title, word_count, body
+
+
 def sync_chapters_for_novel(novel_id: int, data_path: str):
-    """Sync chapters from filesystem to database for a novel"""
+    """Sync chapters from filesystem to database for a novel
+    
+    Files are compared with the size and mtime recorded at the last sync, so
+    only new or modified chapters are read and only changed rows are written.
+    Rows are upserted in place to keep chapter ids stable, and the search
+    index is updated for the same rows.
+    """
     data_dir = Path(data_path)
     
     if not data_dir.exists():
+        # Mark the novel synced so the chapter list does not retry on every request
+        with get_db() as conn:
+            conn.execute('UPDATE novels SET chapters_version = 1 WHERE id = ? AND chapters_version = 0', (novel_id,))
         return 0
     
-    chapter_files = sorted(data_dir.glob("Chapter_*.txt"))
+    # One directory listing each for text and audio instead of a stat per chapter
+    files = {}
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            match = CHAPTER_FILE_RE.match(entry.name)
+            if match:
+                stat = entry.stat()
+                files[int(match.group(1))] = (entry.path, stat.st_size, stat.st_mtime_ns)
+    
+    audio_dir = AUDIO_DIR / data_dir.name
+    audio_files = set()
+    if audio_dir.is_dir():
+        with os.scandir(audio_dir) as entries:
+            audio_files = {entry.name for entry in entries}
     
     with get_db() as conn:
         cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, chapter_number, content_path, audio_path, file_size, file_mtime_ns
+            FROM chapters WHERE novel_id = ?
+        ''', (novel_id,))
+        known = {row['chapter_number']: row for row in cursor.fetchall()}
+        cursor.execute('SELECT chapters_version FROM novels WHERE id = ?', (novel_id,))
+        novel = cursor.fetchone()
+        never_synced = novel is not None and novel['chapters_version'] == 0
         
-        for chapter_file in chapter_files:
-            # Extract chapter number from filename (Chapter_0001.txt)
-            match = re.search(r'Chapter_(\d+)', chapter_file.name)
-            if not match:
-                continue
+        changed = []
+        audio_changed = []
+        for chapter_number, (path, size, mtime_ns) in sorted(files.items()):
+            audio_name = f"Chapter_{chapter_number:04d}.wav"
+            audio_path = str(audio_dir / audio_name) if audio_name in audio_files else None
             
-            chapter_number = int(match.group(1))
-            
-            # Read chapter to get title and word count
-            try:
-                with open(chapter_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    lines = content.split('\n')
-                    title = lines[0].strip() if lines else f"Chapter {chapter_number}"
-                    word_count = len(content.split())
-            except Exception:
-                title = f"Chapter {chapter_number}"
-                word_count = 0
-            
-            # Check for audio file
-            # Get novel folder name for audio path
-            novel_folder = data_dir.name
-            audio_file = AUDIO_DIR / novel_folder / f"Chapter_{chapter_number:04d}.wav"
-            audio_path = str(audio_file) if audio_file.exists() else None
+            row = known.get(chapter_number)
+            if row and (row['content_path'], row['file_size'], row['file_mtime_ns']) == (path, size, mtime_ns):
+                if row['audio_path'] != audio_path:
+                    audio_changed.append((audio_path, novel_id, chapter_number))
+                continue
             
-            # Insert or update chapter
+            changed.append((chapter_number, path, audio_path, size, mtime_ns))
+        
+        # Batches keep at most SYNC_BATCH chapter bodies in memory
+        for start in range(0, len(changed), SYNC_BATCH):
+            upsert_chapters(cursor, novel_id, changed[start:start + SYNC_BATCH])
+        
+        if audio_changed:
+            cursor.executemany('''
+                UPDATE chapters SET audio_path = ?
+                WHERE novel_id = ? AND chapter_number = ?
+            ''', audio_changed)
+        
+        # Drop rows whose chapter file is gone
+        removed = [row['id'] for number, row in known.items() if number not in files]
+        if removed:
+            remove_from_search_index(cursor, removed)
+            cursor.executemany('DELETE FROM chapters WHERE id = ?', [(chapter_id,) for chapter_id in removed])
+        
+        # Invalidates cached chapter lists; 0 means the novel was never synced,
+        # so the first sync bumps it even when the folder has no chapters
+        if changed or audio_changed or removed or never_synced:
             cursor.execute('''
-                INSERT OR REPLACE INTO chapters 
-                (novel_id, chapter_number, title, content_path, audio_path, word_count)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (novel_id, chapter_number, title, str(chapter_file), audio_path, word_count))
+                UPDATE novels SET chapters_version = chapters_version + 1, chapter_count = ?,
+                    chapters_changed_ns = ?
+                WHERE id = ?
+            ''', (len(files), time.time_ns(), novel_id))
     
-    return len(chapter_files)
+    return len(files)
 
 
-@router.get("/novel/{slug}", response_model=ChapterListResponse)
-async def list_chapters(
-    slug: str,
-    sort: str = Query("asc", regex="^(asc|desc)$"),
-    search: Optional[str] = Query(None)
-):
-    """Get all chapters for a novel"""
+def upsert_chapters(cursor, novel_id: int, batch: List[tuple]):
+    """Read a batch of changed chapter files and write their rows and search entries"""
+    index_bodies = API_CONFIG['search_index']
+    rows = []
+    bodies = {}
+    for chapter_number, path, audio_path, size, mtime_ns in batch:
+        title, word_count, body = read_chapter_summary(path, chapter_number, with_body=index_bodies)
+        rows.append((novel_id, chapter_number, title, path, audio_path, word_count, size, mtime_ns))
+        bodies[chapter_number] = (title, body)
+    
+    cursor.executemany('''
+        INSERT INTO chapters
+        (novel_id, chapter_number, title, content_path, audio_path, word_count, file_size, file_mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(novel_id, chapter_number) DO UPDATE SET
+            title = excluded.title,
+            content_path = excluded.content_path,
+            audio_path = excluded.audio_path,
+            word_count = excluded.word_count,
+            file_size = excluded.file_size,
+            file_mtime_ns = excluded.file_mtime_ns
+    ''', rows)
+    
+    if index_bodies:
+        numbers = list(bodies)
+        cursor.execute(f'''
+            SELECT id, chapter_number FROM chapters
+            WHERE novel_id = ? AND chapter_number IN ({', '.join('?' * len(numbers))})
+        ''', [novel_id] + numbers)
+        update_search_index(cursor, [
+            (row['id'], *bodies[row['chapter_number']]) for row in cursor.fetchall()
+        ])
+
+
+def sync_chapters_for_path(data_path: str):
+    """Sync chapters for the library novel stored at data_path"""
     with get_db() as conn:
         cursor = conn.cursor()
-        
-        # Get novel
-        cursor.execute('SELECT id, data_path FROM novels WHERE slug = ?', (slug,))
+        cursor.execute('SELECT id FROM novels WHERE data_path = ?', (data_path,))
         novel = cursor.fetchone()
-        
-        if not novel:
-            raise HTTPException(status_code=404, detail="Novel not found")
-        
-        novel_id, data_path = novel['id'], novel['data_path']
-        
-        # Sync chapters from filesystem
-        if data_path:
-            sync_chapters_for_novel(novel_id, data_path)
-        
-        # Get chapters
-        order = "ASC" if sort == "asc" else "DESC"
-        query = f'SELECT * FROM chapters WHERE novel_id = ?'
-        params = [novel_id]
-        
-        if search:
-            query += ' AND (title LIKE ? OR chapter_number = ?)'
-            params.extend([f'%{search}%', search if search.isdigit() else -1])
-        
-        query += f' ORDER BY chapter_number {order}'
-        
-        cursor.execute(query, params)
+    
+    if not novel:
+        return 0
+    
+    return sync_chapters_for_novel(novel['id'], data_path)
+
+
+def get_indexed_chapter_numbers(novel_id: int, data_path: Optional[str] = None) -> Set[int]:
+    """Get the chapter numbers recorded in the chapters table for a novel
+    
+    The table is filled from the filesystem the first time a novel is seen,
+    after that it is kept current by the sync calls.
+    """
+    query = 'SELECT chapter_number FROM chapters WHERE novel_id = ?'
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (novel_id,))
+        numbers = {row['chapter_number'] for row in cursor.fetchall()}
+    
+    if not numbers and data_path:
+        sync_chapters_for_novel(novel_id, data_path)
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (novel_id,))
+            numbers = {row['chapter_number'] for row in cursor.fetchall()}
+    
+    return numbers
+
+
+# List projection: paths and timestamps are only needed by the detail routes
+CHAPTER_LIST_COLUMNS = 'id, chapter_number, title, word_count, audio_path IS NOT NULL AS has_audio'
+
+
+def fetch_novel_for_chapter_list(slug: str) -> dict:
+    """Novel id, chapter count and list version; a novel never synced is synced first"""
+    query = 'SELECT id, data_path, chapter_count, chapters_version FROM novels WHERE slug = ?'
+    with get_db() as conn:
+        novel = dict_from_row(conn.execute(query, (slug,)).fetchone())
+    
+    if not novel:
+        raise HTTPException(status_code=404, detail="Novel not found")
+    
+    # Later changes are synced by the library indexer
+    if novel['chapters_version'] == 0 and novel['data_path']:
+        sync_chapters_for_novel(novel['id'], novel['data_path'])
+        with get_db() as conn:
+            novel = dict_from_row(conn.execute(query, (slug,)).fetchone())
+    
+    return novel
+
+
+def load_chapter_list(novel: dict, sort: str, search: Optional[str],
+                      after: Optional[int], limit: int) -> dict:
+    """
+    Return one page of a novel's chapters in the requested order as a
+    ChapterListResponse body.
+
+    Pages are keyed on chapter_number, so every page is an index range scan
+    no matter how deep it is.
+    """
+    filters = ''
+    params = [novel['id']]
+    
+    if search:
+        filters += ' AND (title LIKE ? OR chapter_number = ?)'
+        params.extend([f'%{search}%', search if search.isdigit() else -1])
+    
+    order, seek = ('ASC', '>') if sort == 'asc' else ('DESC', '<')
+    page_filter = f' AND chapter_number {seek} ?' if after is not None else ''
+    page_params = [after] if after is not None else []
+    
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # One extra row tells whether there is a next page
+        cursor.execute(f'''
+            SELECT {CHAPTER_LIST_COLUMNS} FROM chapters
+            WHERE novel_id = ?{filters}{page_filter}
+            ORDER BY chapter_number {order} LIMIT ?
+        ''', params + page_params + [limit + 1])
         chapters = list_from_rows(cursor.fetchall())
         
-    return ChapterListResponse(chapters=chapters, total=len(chapters))
+        if search:
+            cursor.execute(f'SELECT COUNT(*) FROM chapters WHERE novel_id = ?{filters}', params)
+            total = cursor.fetchone()[0]
+        else:
+            total = novel['chapter_count']
+    
+    next_after = None
+    if len(chapters) > limit:
+        chapters = chapters[:limit]
+        next_after = chapters[-1]['chapter_number']
+    
+    for chapter in chapters:
+        chapter['has_audio'] = bool(chapter['has_audio'])
+    
+    return {'chapters': chapters, 'total': total, 'next_after': next_after}
 
 
-@router.get("/{chapter_id}", response_model=ChapterContentResponse)
-async def get_chapter(chapter_id: int):
-    """Get chapter content by ID"""
+@router.get("/novel/{slug}", response_model=ChapterListResponse, response_class=FastJSONResponse)
+async def list_chapters(
+    request: Request,
+    slug: str,
+    sort: str = Query("asc", regex="^(asc|desc)$"),
+    search: Optional[str] = Query(None),
+    after: Optional[int] = Query(None, description="Return chapters after this chapter number (in sort order)"),
+    limit: int = Query(API_CONFIG['chapter_page_size'], ge=1, le=API_CONFIG['chapter_page_max'])
+):
+    """Get a page of chapters for a novel"""
+    novel = await run_blocking(fetch_novel_for_chapter_list, slug)
+    
+    etag = make_etag('chapters', novel['id'], novel['chapters_version'], sort, search, after, limit)
+    if is_not_modified(request, etag, None):
+        return not_modified('chapter_list', etag, None)
+    
+    chapters = await run_blocking(load_chapter_list, novel, sort, search, after, limit)
+    return FastJSONResponse(chapters, headers=cache_headers('chapter_list', etag, None))
+
+
+def fetch_chapter_by_id(chapter_id: int) -> dict:
+    """Query a chapter with its neighbours"""
     with get_db() as conn:
         cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM chapters WHERE id = ?', (chapter_id,))
+        cursor.execute(CHAPTER_BY_ID, (chapter_id,))
         chapter = dict_from_row(cursor.fetchone())
-        
-        if not chapter:
-            raise HTTPException(status_code=404, detail="Chapter not found")
-        
-        # Read content from file
-        content = ""
-        if chapter['content_path'] and os.path.exists(chapter['content_path']):
-            with open(chapter['content_path'], 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Skip the title and separator lines
-                lines = content.split('\n')
-                if len(lines) > 2:
-                    content = '\n'.join(lines[2:]).strip()
-        
-        # Get prev/next chapter numbers
-        cursor.execute('''
-            SELECT chapter_number FROM chapters 
-            WHERE novel_id = ? AND chapter_number < ?
-            ORDER BY chapter_number DESC LIMIT 1
-        ''', (chapter['novel_id'], chapter['chapter_number']))
-        prev_row = cursor.fetchone()
-        prev_chapter = prev_row['chapter_number'] if prev_row else None
-        
-        cursor.execute('''
-            SELECT chapter_number FROM chapters 
-            WHERE novel_id = ? AND chapter_number > ?
-            ORDER BY chapter_number ASC LIMIT 1
-        ''', (chapter['novel_id'], chapter['chapter_number']))
-        next_row = cursor.fetchone()
-        next_chapter = next_row['chapter_number'] if next_row else None
-    
-    return ChapterContentResponse(
-        id=chapter['id'],
-        novel_id=chapter['novel_id'],
-        chapter_number=chapter['chapter_number'],
-        title=chapter['title'] or f"Chapter {chapter['chapter_number']}",
-        content=content,
-        has_audio=bool(chapter['audio_path']),
-        prev_chapter=prev_chapter,
-        next_chapter=next_chapter
-    )
+    
+    if not chapter:
+        raise HTTPException(status_code=404, detail="Chapter not found")
+    
+    return chapter
 
 
-@router.get("/novel/{slug}/{chapter_number}", response_model=ChapterContentResponse)
-async def get_chapter_by_number(slug: str, chapter_number: int):
-    """Get chapter content by novel slug and chapter number"""
+def fetch_chapter_by_number(slug: str, chapter_number: int) -> dict:
+    """Query a chapter of a novel with its neighbours"""
     with get_db() as conn:
         cursor = conn.cursor()
-        
-        # Get novel
-        cursor.execute('SELECT id, data_path FROM novels WHERE slug = ?', (slug,))
-        novel = cursor.fetchone()
-        
-        if not novel:
-            raise HTTPException(status_code=404, detail="Novel not found")
-        
-        novel_id = novel['id']
-        
-        # Get chapter
-        cursor.execute('''
-            SELECT * FROM chapters 
-            WHERE novel_id = ? AND chapter_number = ?
-        ''', (novel_id, chapter_number))
+        cursor.execute(CHAPTER_BY_NUMBER, (slug, chapter_number))
         chapter = dict_from_row(cursor.fetchone())
         
         if not chapter:
+            cursor.execute('SELECT 1 FROM novels WHERE slug = ?', (slug,))
+            if not cursor.fetchone():
+                raise HTTPException(status_code=404, detail="Novel not found")
             raise HTTPException(status_code=404, detail="Chapter not found")
-        
-        # Read content from file
-        content = ""
-        if chapter['content_path'] and os.path.exists(chapter['content_path']):
-            with open(chapter['content_path'], 'r', encoding='utf-8') as f:
-                content = f.read()
-                lines = content.split('\n')
-                if len(lines) > 2:
-                    content = '\n'.join(lines[2:]).strip()
-        
-        # Get prev/next
-        cursor.execute('''
-            SELECT chapter_number FROM chapters 
-            WHERE novel_id = ? AND chapter_number < ?
-            ORDER BY chapter_number DESC LIMIT 1
-        ''', (novel_id, chapter_number))
-        prev_row = cursor.fetchone()
-        prev_chapter = prev_row['chapter_number'] if prev_row else None
-        
-        cursor.execute('''
-            SELECT chapter_number FROM chapters 
-            WHERE novel_id = ? AND chapter_number > ?
-            ORDER BY chapter_number ASC LIMIT 1
-        ''', (novel_id, chapter_number))
-        next_row = cursor.fetchone()
-        next_chapter = next_row['chapter_number'] if next_row else None
-    
-    return ChapterContentResponse(
-        id=chapter['id'],
-        novel_id=chapter['novel_id'],
-        chapter_number=chapter['chapter_number'],
-        title=chapter['title'] or f"Chapter {chapter_number}",
-        content=content,
-        has_audio=bool(chapter['audio_path']),
-        prev_chapter=prev_chapter,
-        next_chapter=next_chapter
+    
+    return chapter
+
+
+def chapter_validators(chapter: dict):
+    """ETag and Last-Modified from the row; none for rows synced without file stats
+    
+    The body carries the neighbours and audio path as well as the file, so
+    Last-Modified is the later of the file mtime and the novel's last chapter
+    change.
+    """
+    if chapter['file_mtime_ns'] is None:
+        return None, None
+    etag = make_etag(
+        'chapter', chapter['id'], chapter['file_size'], chapter['file_mtime_ns'], chapter['title'],
+        chapter['audio_path'], chapter['prev_chapter'], chapter['next_chapter']
     )
+    modified_ns = max(chapter['file_mtime_ns'], chapter['chapters_changed_ns'] or 0)
+    return etag, mtime_to_datetime(modified_ns)
+
+
+async def conditional_chapter_response(request: Request, chapter: dict):
+    """Answer from the row when the client is current, else read the content"""
+    etag, last_modified = chapter_validators(chapter)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified('chapter', etag, last_modified)
+    
+    content = await run_blocking(chapter_content_response, chapter)
+    return FastJSONResponse(content, headers=cache_headers('chapter', etag, last_modified))
+
+
+@router.get("/{chapter_id}", response_model=ChapterContentResponse, response_class=FastJSONResponse)
+async def get_chapter(chapter_id: int, request: Request):
+    """Get chapter content by ID"""
+    chapter = await run_blocking(fetch_chapter_by_id, chapter_id)
+    return await conditional_chapter_response(request, chapter)
+
+
+@router.get(
+    "/novel/{slug}/{chapter_number}", response_model=ChapterContentResponse, response_class=FastJSONResponse
+)
+async def get_chapter_by_number(slug: str, chapter_number: int, request: Request):
+    """Get chapter content by novel slug and chapter number"""
+    chapter = await run_blocking(fetch_chapter_by_number, slug, chapter_number)
+    return await conditional_chapter_response(request, chapter)
@@ -2,150 +2,141 @@
 Novels API routes
 """
 
-import os
 import re
 from pathlib import Path
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional, List
 
 from ..database import get_db, dict_from_row, list_from_rows
+from ..counters import view_counter
+from ..executor import run_blocking
+from ..http_cache import make_etag, is_not_modified, not_modified, cache_headers
+from ..responses import FastJSONResponse
+from ..indexer import library_indexer
 from ..models.schemas import NovelResponse, NovelListResponse, NovelCreate
 
 router = APIRouter()
 
-# Base directory for scraped data
-BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
-DATA_DIR = BASE_DIR / "data" / "output"
-
-
-def scan_novels_from_filesystem():
-    """Scan the data/output directory for scraped novels"""
-    novels = []
-    
-    if not DATA_DIR.exists():
-        return novels
-    
-    for folder in DATA_DIR.iterdir():
-        if folder.is_dir() and not folder.name.startswith('.'):
-            # Count chapters
-            chapter_files = list(folder.glob("Chapter_*.txt"))
-            chapter_count = len(chapter_files)
-            
-            if chapter_count > 0:
-                # Create slug from folder name
-                slug = folder.name.lower().replace(' ', '-')
-                slug = re.sub(r'[^a-z0-9-]', '', slug)
-                
-                # Get last modified time
-                latest_file = max(chapter_files, key=lambda f: f.stat().st_mtime)
-                last_updated = datetime.fromtimestamp(latest_file.stat().st_mtime)
-                
-                novels.append({
-                    'slug': slug,
-                    'title': folder.name.replace('-', ' ').title(),
-                    'description': f'Novel with {chapter_count} chapters',
-                    'genres': 'Fantasy,Action',  # Default genres
-                    'chapter_count': chapter_count,
-                    'data_path': str(folder),
-                    'last_updated': last_updated
-                })
-    
-    return novels
-
-
-def sync_novels_to_db():
-    """Sync filesystem novels to database"""
-    novels = scan_novels_from_filesystem()
+# Novel ids having a genre, answered from the genre_id primary key
+GENRE_NOVELS_QUERY = '''
+    SELECT ng.novel_id FROM novel_genres ng
+    JOIN genres g ON g.id = ng.genre_id
+    WHERE g.name = ?
+'''
+
+# Novel ids whose title has every search word as a word prefix, from the FTS index
+NOVEL_TITLE_QUERY = '''
+    SELECT rowid FROM novel_search WHERE novel_search MATCH ?
+'''
+
+# NovelResponse fields; timestamps in the ISO form Pydantic would produce
+NOVEL_LIST_COLUMNS = '''
+    id, slug, title, description, cover_url, genres, COALESCE(views, 0) AS views, chapter_count, data_path,
+    replace(last_updated, ' ', 'T') AS last_updated, replace(created_at, ' ', 'T') AS created_at
+'''
+
+# Changes whenever a row shown in the library list does
+LIBRARY_VERSION_QUERY = '''
+    SELECT COUNT(*), MAX(id), MAX(last_updated), TOTAL(views), TOTAL(chapter_count), TOTAL(chapters_version)
+    FROM novels
+'''
+
+
+def sync_novels_to_db(force: bool = False) -> int:
+    """Sync changed novel folders from the filesystem to the database"""
+    return library_indexer.refresh(force=force)
+
+
+def title_match_query(search: str) -> str:
+    """FTS5 query matching titles with a word starting with each search word"""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'[^\W_]+', search))
+
+
+def query_novels(search: Optional[str], genre: Optional[str], limit: int, offset: int) -> dict:
+    """Run the library list query; returns a NovelListResponse body"""
+    filters = ''
+    params = []
+    
+    match = title_match_query(search) if search else ''
+    if match:
+        filters += ' AND id IN (' + NOVEL_TITLE_QUERY + ')'
+        params.append(match)
+    
+    if genre and genre != 'all':
+        filters += ' AND id IN (' + GENRE_NOVELS_QUERY + ')'
+        params.append(genre)
     
     with get_db() as conn:
         cursor = conn.cursor()
         
-        for novel in novels:
-            # Check if novel exists
-            cursor.execute('SELECT id FROM novels WHERE slug = ?', (novel['slug'],))
-            existing = cursor.fetchone()
-            
-            if existing:
-                # Update existing novel
-                cursor.execute('''
-                    UPDATE novels 
-                    SET chapter_count = ?, last_updated = ?, data_path = ?
-                    WHERE slug = ?
-                ''', (novel['chapter_count'], novel['last_updated'], 
-                      novel['data_path'], novel['slug']))
-            else:
-                # Insert new novel
-                cursor.execute('''
-                    INSERT INTO novels (slug, title, description, genres, chapter_count, data_path, last_updated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (novel['slug'], novel['title'], novel['description'],
-                      novel['genres'], novel['chapter_count'], novel['data_path'],
-                      novel['last_updated']))
-    
-    return len(novels)
-
-
-@router.get("", response_model=NovelListResponse)
+        # The window count returns the total with the page in one query
+        cursor.execute(f'''
+            SELECT {NOVEL_LIST_COLUMNS}, COUNT(*) OVER () AS total_count FROM novels
+            WHERE 1=1{filters}
+            ORDER BY last_updated DESC LIMIT ? OFFSET ?
+        ''', params + [limit, offset])
+        novels = list_from_rows(cursor.fetchall())
+        
+        if novels:
+            total = novels[0]['total_count']
+        elif offset:
+            cursor.execute(f'SELECT COUNT(*) FROM novels WHERE 1=1{filters}', params)
+            total = cursor.fetchone()[0]
+        else:
+            total = 0
+    
+    for novel in novels:
+        del novel['total_count']
+    
+    return {'novels': novels, 'total': total}
+
+
+def library_version() -> tuple:
+    with get_db() as conn:
+        return tuple(conn.execute(LIBRARY_VERSION_QUERY).fetchone())
+
+
+@router.get("", response_model=NovelListResponse, response_class=FastJSONResponse)
 async def list_novels(
+    request: Request,
     search: Optional[str] = Query(None, description="Search by title"),
     genre: Optional[str] = Query(None, description="Filter by genre"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ):
-    """Get all novels with optional filtering"""
-    # Sync from filesystem first
-    sync_novels_to_db()
+    """Get all novels with optional filtering
+    
+    The library indexer keeps the table current in the background, so this
+    is a pure database query.
+    """
+    version = await run_blocking(library_version)
+    etag = make_etag('novels', version, search, genre, limit, offset)
+    if is_not_modified(request, etag, None):
+        return not_modified('novel_list', etag, None)
     
+    novels = await run_blocking(query_novels, search, genre, limit, offset)
+    return FastJSONResponse(novels, headers=cache_headers('novel_list', etag, None))
+
+
+def fetch_novel(slug: str) -> Optional[dict]:
+    """Get a novel row by slug"""
     with get_db() as conn:
         cursor = conn.cursor()
-        
-        query = 'SELECT * FROM novels WHERE 1=1'
-        params = []
-        
-        if search:
-            query += ' AND title LIKE ?'
-            params.append(f'%{search}%')
-        
-        if genre and genre != 'all':
-            query += ' AND genres LIKE ?'
-            params.append(f'%{genre}%')
-        
-        query += ' ORDER BY last_updated DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        novels = list_from_rows(cursor.fetchall())
-        
-        # Get total count
-        count_query = 'SELECT COUNT(*) FROM novels WHERE 1=1'
-        count_params = []
-        if search:
-            count_query += ' AND title LIKE ?'
-            count_params.append(f'%{search}%')
-        if genre and genre != 'all':
-            count_query += ' AND genres LIKE ?'
-            count_params.append(f'%{genre}%')
-        
-        cursor.execute(count_query, count_params)
-        total = cursor.fetchone()[0]
-    
-    return NovelListResponse(novels=novels, total=total)
+        cursor.execute('SELECT * FROM novels WHERE slug = ?', (slug,))
+        return dict_from_row(cursor.fetchone())
 
 
 @router.get("/{slug}", response_model=NovelResponse)
 async def get_novel(slug: str):
     """Get a single novel by slug"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM novels WHERE slug = ?', (slug,))
-        novel = dict_from_row(cursor.fetchone())
-        
-        if not novel:
-            raise HTTPException(status_code=404, detail="Novel not found")
-        
-        # Increment views
-        cursor.execute('UPDATE novels SET views = views + 1 WHERE slug = ?', (slug,))
+    novel = await run_blocking(fetch_novel, slug)
+    
+    if not novel:
+        raise HTTPException(status_code=404, detail="Novel not found")
+    
+    # Counted in memory and written in batches by the view counter
+    view_counter.increment(slug)
+    novel['views'] = (novel['views'] or 0) + view_counter.pending(slug) - 1
     
     return novel
 
@@ -153,64 +144,53 @@ async def get_novel(slug: str):
 @router.post("/sync")
 async def sync_novels():
     """Manually trigger syncing novels from filesystem to database"""
-    count = sync_novels_to_db()
+    count = await run_blocking(sync_novels_to_db, force=True)
     return {"message": f"Synced {count} novels from filesystem"}
 
 
-@router.post("/{slug}/update")
-async def update_novel(slug: str):
-    """Check for missing chapters and scrape them"""
-    import sys
-    import threading
-    import uuid
-    
-    # Add scraper to path
-    sys.path.insert(0, str(BASE_DIR / "src"))
-    from scraper import NovelScraper
-    from .scraper import scrape_jobs, run_scraper
+def check_for_missing_chapters(slug: str) -> dict:
+    """Compare the local chapters of a novel with the site and queue the missing ones"""
+    from .chapters import get_indexed_chapter_numbers
+    from ..jobs import job_runner
+    from ..scheduler import get_toc_url, detect_total_chapters, find_missing_chapters, queue_missing_chapters
     
     # Get novel from DB
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM novels WHERE slug = ?', (slug,))
-        novel = dict_from_row(cursor.fetchone())
-        
-        if not novel:
-            raise HTTPException(status_code=404, detail="Novel not found")
+    novel = fetch_novel(slug)
+    if not novel:
+        raise HTTPException(status_code=404, detail="Novel not found")
+    
+    # Only one job per novel: report the one already queued or running
+    active_job = job_runner.active_job_id(slug)
+    if active_job:
+        job = job_runner.get(active_job) or {}
+        return {
+            "message": "An update for this novel is already in progress",
+            "job_id": active_job,
+            "missing_count": job.get('total_chapters', 0),
+            "missing_chapters": []
+        }
     
     data_path = Path(novel['data_path']) if novel.get('data_path') else None
     
     if not data_path or not data_path.exists():
         raise HTTPException(status_code=400, detail="Novel data path not found")
     
-    # Get existing chapter numbers from filesystem
-    existing_chapters = set()
-    for chapter_file in data_path.glob("Chapter_*.txt"):
-        match = re.search(r'Chapter_(\d+)', chapter_file.name)
-        if match:
-            existing_chapters.add(int(match.group(1)))
+    # Get existing chapter numbers from the chapters index
+    existing_chapters = get_indexed_chapter_numbers(novel['id'], str(data_path))
     
     if not existing_chapters:
         raise HTTPException(status_code=400, detail="No existing chapters found")
     
     # Detect total chapters from website
-    # Use folder name which matches the original URL format
-    folder_name = data_path.name  # This is the cleaned novel name from scraping
-    toc_url = f"https://novelhi.com/s/{folder_name}"
+    toc_url = get_toc_url(data_path)
     
     try:
-        scraper = NovelScraper(headless=True)
-        driver = scraper.start_driver()
-        try:
-            total_chapters = scraper.get_total_chapters(driver, toc_url)
-        finally:
-            driver.quit()
+        total_chapters = detect_total_chapters(toc_url)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to detect chapters: {str(e)}")
     
     # Find missing chapters
-    all_chapters = set(range(1, total_chapters + 1))
-    missing_chapters = sorted(all_chapters - existing_chapters)
+    missing_chapters = find_missing_chapters(existing_chapters, total_chapters)
     
     if not missing_chapters:
         return {
@@ -220,33 +200,21 @@ async def update_novel(slug: str):
             "missing_chapters": []
         }
     
-    # Start scraping job for missing chapters
-    job_id = str(uuid.uuid4())
-    
-    # For now, scrape from first missing to last missing (handles gaps)
-    start_chapter = min(missing_chapters)
-    end_chapter = max(missing_chapters)
-    
-    scrape_jobs[job_id] = {
-        'status': 'pending',
-        'current_chapter': 0,
-        'total_chapters': len(missing_chapters),
-        'novel_title': novel['title'],
-        'error': None
-    }
-    
-    # Start scraper in background
-    thread = threading.Thread(
-        target=run_scraper,
-        args=(job_id, toc_url, start_chapter, end_chapter)
-    )
-    thread.start()
+    # Queue a scraping job for exactly the missing chapters
+    job_id, _ = queue_missing_chapters(slug, novel['title'], toc_url, missing_chapters)
     
     return {
         "message": f"Started scraping {len(missing_chapters)} missing chapters",
         "job_id": job_id,
         "total_chapters": total_chapters,
         "local_chapters": len(existing_chapters),
+        "missing_count": len(missing_chapters),
         "missing_chapters": missing_chapters[:20]  # Return first 20 for display
     }
 
+
+@router.post("/{slug}/update")
+async def update_novel(slug: str):
+    """Check for missing chapters and scrape them"""
+    # Reads the chapter index and starts a browser to detect the chapter count
+    return await run_blocking(check_for_missing_chapters, slug)
@@ -3,180 +3,213 @@ Scraper API routes - triggers the Python web scraper
 """
 
 import asyncio
-import threading
+import json
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Dict
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
 
+from ..jobs import job_runner, PRIORITY_USER
 from ..models.schemas import ScrapeRequest, ScrapeStatusResponse
+from ...config import OUTPUT_DIRS, SCRAPER_CONFIG, BROWSER_CONFIG
 
 router = APIRouter()
 
-# Store for tracking scrape jobs
-scrape_jobs: Dict[str, dict] = {}
+# Seconds between keep-alive comments on the event stream
+EVENT_KEEPALIVE = 15
 
 
 def run_scraper_with_detection(job_id: str, toc_url: str, start: int):
-    """Run detection + scraping in a background thread"""
-    import sys
-    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
-    
-    from scraper import NovelScraper
+    """Run detection + scraping on a job runner worker"""
+    from ...scraper import NovelScraper
     
     try:
+        job_runner.update(job_id, status='detecting')
         scraper = NovelScraper(headless=True)
         driver = scraper.start_driver()
         
         try:
             # Detect total chapters first
             end_chapter = scraper.get_total_chapters(driver, toc_url)
-            scrape_jobs[job_id]['total_chapters'] = end_chapter - start + 1
+            job_runner.update(job_id, total_chapters=end_chapter - start + 1)
             print(f"[INFO] Detected {end_chapter} chapters, starting scrape from {start}")
         finally:
             driver.quit()
         
-        # Now run the actual scraper
-        run_scraper(job_id, toc_url, start, end_chapter)
-        
     except Exception as e:
-        scrape_jobs[job_id]['status'] = 'failed'
-        scrape_jobs[job_id]['error'] = f"Detection failed: {str(e)}"
+        job_runner.update(job_id, status='failed', error=f"Detection failed: {str(e)}")
         print(f"[ERROR] Detection failed: {e}")
+        return
+    
+    # Now run the actual scraper
+    run_scraper(job_id, toc_url, [(start, end_chapter)])
 
 
-def run_scraper(job_id: str, toc_url: str, start: int, end: int):
-    """Run the scraper in a background thread"""
-    import sys
-    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+def run_scraper(job_id: str, toc_url: str, chapter_ranges: List[Tuple[int, int]]):
+    """Run the scraper on a job runner worker
     
-    from scraper import NovelScraper
+    chapter_ranges is a sorted list of inclusive (start, end) ranges. Chapters
+    already saved are skipped up front, so progress counts only real fetches.
+    """
+    import os
+    import re
+    import time
+    
+    from ...scraper import NovelScraper, count_chapters, contains_chapter, saved_chapter_numbers
+    from ...extractor import write_chapter_file
     
     try:
-        scrape_jobs[job_id]['status'] = 'running'
+        job_runner.update(job_id, status='running')
         
-        scraper = NovelScraper(headless=True)
+        raw_dir = str(OUTPUT_DIRS['raw']) if SCRAPER_CONFIG['save_raw_html'] else None
+        scraper = NovelScraper(headless=True, raw_dir=raw_dir,
+                               raw_compression=SCRAPER_CONFIG['raw_compression'])
+        novel_name = scraper.get_novel_name(toc_url)
+        job_runner.update(job_id, novel_title=novel_name)
         
-        # Custom scrape with progress updates
-        driver = scraper.start_driver()
+        novel_name_clean = re.sub(r'[\\/*?<>:"|]', "", novel_name)
+        save_dir = Path(__file__).resolve().parent.parent.parent.parent / "data" / "output" / novel_name_clean
+        os.makedirs(save_dir, exist_ok=True)
+        raw_store = scraper.open_raw_store(novel_name_clean)
+        
+        # One directory listing instead of an existence check per chapter
+        existing = {n for n in saved_chapter_numbers(str(save_dir)) if contains_chapter(chapter_ranges, n)}
+        job_runner.update(
+            job_id,
+            skipped_chapters=len(existing),
+            total_chapters=count_chapters(chapter_ranges) - len(existing)
+        )
+        
+        # Custom scrape with progress updates; the browser starts on the first fetch
+        browser = scraper.driver_manager(
+            max_pages=BROWSER_CONFIG['recycle_after_pages'],
+            max_rss_mb=BROWSER_CONFIG['max_rss_mb']
+        )
         
         try:
-            chapter_urls, novel_name = scraper.generate_chapter_urls(toc_url, start, end)
-            scrape_jobs[job_id]['novel_title'] = novel_name
-            scrape_jobs[job_id]['total_chapters'] = len(chapter_urls)
-            
-            import os
-            import re
-            novel_name_clean = re.sub(r'[\\/*?<>:"|]', "", novel_name)
-            save_dir = Path(__file__).resolve().parent.parent.parent.parent / "data" / "output" / novel_name_clean
-            os.makedirs(save_dir, exist_ok=True)
-            
-            for idx, url in enumerate(chapter_urls, start=start):
+            fetched = 0
+            for idx, url in scraper.iter_chapter_urls(toc_url, chapter_ranges):
+                if idx in existing:
+                    continue
+                
                 # Check for cancellation
-                if scrape_jobs[job_id].get('status') == 'cancelled':
+                if job_runner.is_cancelled(job_id):
                     print(f"[INFO] Job {job_id} cancelled by user")
                     break
                 
-                scrape_jobs[job_id]['current_chapter'] = idx - start + 1
-                
-                filename = f"Chapter_{idx:04d}.txt"
-                filepath = save_dir / filename
+                fetched += 1
+                job_runner.update(job_id, current_chapter=fetched)
                 
-                if filepath.exists():
-                    continue
+                filepath = save_dir / f"Chapter_{idx:04d}.txt"
                 
                 try:
-                    title, content = scraper.scrape_chapter(driver, url)
-                    
-                    with open(filepath, "w", encoding="utf-8") as f:
-                        f.write(f"{title}\n")
-                        f.write("=" * 60 + "\n\n")
-                        f.write(content)
+                    html = browser.fetch_page(url)
+                    title, content = scraper.parse_chapter(html, url, raw_store, idx)
+                    write_chapter_file(filepath, title, content)
                 
                 except Exception as e:
                     print(f"Error scraping chapter {idx}: {e}")
                 
-                import time
+                job_runner.update(job_id, browser=browser.metrics())
+                
                 time.sleep(2)
             
             # Only mark completed if not cancelled
-            if scrape_jobs[job_id].get('status') != 'cancelled':
-                scrape_jobs[job_id]['status'] = 'completed'
+            if not job_runner.is_cancelled(job_id):
                 # Sync to database so novel appears in library
                 try:
                     from .novels import sync_novels_to_db
+                    from .chapters import sync_chapters_for_path
                     sync_novels_to_db()
+                    sync_chapters_for_path(str(save_dir))
                     print(f"[INFO] Library synced after scraping {novel_name}")
                 except Exception as e:
                     print(f"[WARN] Failed to sync library: {e}")
+                job_runner.update(job_id, status='completed')
             
         finally:
-            driver.quit()
+            browser.close()
+            job_runner.update(job_id, browser=browser.metrics())
     
     except Exception as e:
-        scrape_jobs[job_id]['status'] = 'failed'
-        scrape_jobs[job_id]['error'] = str(e)
+        job_runner.update(job_id, status='failed', error=str(e))
+
+
+def resolve_chapter_ranges(request: ScrapeRequest) -> Optional[List[Tuple[int, int]]]:
+    """Turn the chapter selection of a request into merged ranges
+    
+    Returns None when the end chapter has to be detected from the site.
+    """
+    from ...scraper import compress_chapter_ranges, merge_chapter_ranges
+    
+    if request.chapters or request.chapter_ranges:
+        ranges = list(request.chapter_ranges or [])
+        ranges.extend(compress_chapter_ranges(request.chapters or []))
+        return merge_chapter_ranges(ranges)
+    
+    if request.end_chapter is None:
+        return None
+    
+    return merge_chapter_ranges([(request.start_chapter, request.end_chapter)])
+
+
+def novel_slug_for_url(toc_url: str) -> str:
+    """Library slug of the novel a TOC URL points to"""
+    from ...scraper import NovelScraper
+    from ..indexer import make_slug
+    
+    return make_slug(NovelScraper().get_novel_name(toc_url))
 
 
 @router.post("/start")
-async def start_scraping(request: ScrapeRequest, background_tasks: BackgroundTasks):
-    """Start a new scraping job"""
-    import uuid
-    import sys
-    sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
-    
-    job_id = str(uuid.uuid4())
-    
-    end_chapter = request.end_chapter
-    
-    # If auto-detect is needed, set status to detecting and run in background
-    if end_chapter is None:
-        scrape_jobs[job_id] = {
-            'status': 'detecting',
-            'current_chapter': 0,
-            'total_chapters': 0,
-            'novel_title': None,
-            'error': None
-        }
-        
-        # Start detection + scraping in background
-        thread = threading.Thread(
-            target=run_scraper_with_detection,
-            args=(job_id, request.toc_url, request.start_chapter)
+async def start_scraping(request: ScrapeRequest):
+    """Queue a new scraping job"""
+    try:
+        chapter_ranges = resolve_chapter_ranges(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    slug = novel_slug_for_url(request.toc_url)
+    
+    # If auto-detect is needed, queue detection + scraping
+    if chapter_ranges is None:
+        job_id, created = job_runner.submit(
+            slug, run_scraper_with_detection,
+            args=(request.toc_url, request.start_chapter),
+            priority=PRIORITY_USER
         )
-        thread.start()
-        
-        return {"job_id": job_id, "message": "Detecting chapters...", "total_chapters": 0}
-    
-    # If end_chapter provided, start scraping directly
-    scrape_jobs[job_id] = {
-        'status': 'pending',
-        'current_chapter': 0,
-        'total_chapters': end_chapter - request.start_chapter + 1,
-        'novel_title': None,
-        'error': None
-    }
-    
-    # Start scraper in background thread
-    thread = threading.Thread(
-        target=run_scraper,
-        args=(job_id, request.toc_url, request.start_chapter, end_chapter)
-    )
-    thread.start()
+        total_chapters = 0
+    else:
+        # If the chapters are known, queue scraping directly
+        total_chapters = sum(end - start + 1 for start, end in chapter_ranges)
+        job_id, created = job_runner.submit(
+            slug, run_scraper,
+            args=(request.toc_url, chapter_ranges),
+            priority=PRIORITY_USER,
+            total_chapters=total_chapters
+        )
+    
+    if not created:
+        job = job_runner.get(job_id)
+        return {"job_id": job_id, "message": "A job for this novel is already queued or running",
+                "total_chapters": job['total_chapters'] if job else 0}
     
-    return {"job_id": job_id, "message": "Scraping started", "total_chapters": end_chapter}
+    message = "Detecting chapters..." if chapter_ranges is None else "Scraping queued"
+    return {"job_id": job_id, "message": message, "total_chapters": total_chapters}
 
 
 @router.get("/status/{job_id}", response_model=ScrapeStatusResponse)
 async def get_scrape_status(job_id: str):
     """Get the status of a scraping job"""
-    if job_id not in scrape_jobs:
+    job = job_runner.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = scrape_jobs[job_id]
     return ScrapeStatusResponse(
         status=job['status'],
         current_chapter=job['current_chapter'],
         total_chapters=job['total_chapters'],
+        skipped_chapters=job.get('skipped_chapters', 0),
         novel_title=job['novel_title'],
         error=job['error']
     )
@@ -185,23 +218,46 @@ async def get_scrape_status(job_id: str):
 @router.get("/jobs")
 async def list_jobs():
     """List all scraping jobs"""
-    return scrape_jobs
+    return job_runner.snapshot()
+
+
+@router.get("/events")
+async def job_events(request: Request):
+    """Server-sent events stream of job changes, starting with a snapshot of all jobs"""
+    events = job_runner.subscribe()
+    
+    async def stream():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(job_runner.snapshot(), default=str)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=EVENT_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: job\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            job_runner.unsubscribe(events)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.post("/cancel/{job_id}")
 async def cancel_job(job_id: str):
-    """Cancel a running scraping job"""
-    if job_id not in scrape_jobs:
+    """Cancel a queued or running scraping job"""
+    job = job_runner.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job = scrape_jobs[job_id]
-    
     if job['status'] in ('completed', 'failed', 'cancelled'):
         return {"message": f"Job already {job['status']}", "status": job['status']}
     
-    # Mark as cancelled - the run_scraper loop will check this
-    job['status'] = 'cancelled'
-    job['error'] = 'Cancelled by user'
+    # Queued jobs are dropped, the run_scraper loop checks this between chapters
+    job_runner.cancel(job_id)
     
     return {"message": "Job cancelled", "status": "cancelled"}
 
@@ -209,9 +265,7 @@ async def cancel_job(job_id: str):
 @router.delete("/job/{job_id}")
 async def remove_job(job_id: str):
     """Remove a completed/failed job from the list"""
-    if job_id not in scrape_jobs:
+    if not job_runner.remove(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    del scrape_jobs[job_id]
     return {"message": "Job removed"}
-
@@ -0,0 +1,26 @@
+"""
+Search API routes - full-text search over chapter titles and bodies
+"""
+
+from fastapi import APIRouter, Query
+from typing import Optional
+
+from ..executor import run_blocking
+from ..models.schemas import SearchResponse
+from ..search import search_chapters
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description='Words to find; "quoted phrases" and prefix* are supported'),
+    novel: Optional[str] = Query(None, description="Only search the novel with this slug"),
+    chapter_from: Optional[int] = Query(None, ge=0),
+    chapter_to: Optional[int] = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Search chapters, best matches first, with highlighted snippets"""
+    results, total = await run_blocking(search_chapters, q, novel, chapter_from, chapter_to, limit, offset)
+    return SearchResponse(results=results, total=total, limit=limit, offset=offset)
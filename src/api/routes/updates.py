@@ -0,0 +1,24 @@
+"""
+Library update API routes - summary and control of the update scheduler
+"""
+
+from fastapi import APIRouter
+
+from ..models.schemas import UpdateSummaryResponse
+from ..scheduler import update_scheduler
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=UpdateSummaryResponse)
+async def get_update_summary():
+    """Get the results of the last library update check"""
+    return update_scheduler.get_summary()
+
+
+@router.post("/run")
+async def run_update_check():
+    """Start a library update check right away"""
+    if not update_scheduler.trigger():
+        return {"message": "Update check already running", "started": False}
+    return {"message": "Update check started", "started": True}
@@ -0,0 +1,239 @@
+"""
+Background update scheduler for NovelLabs
+Periodically checks every library novel for missing chapters and scrapes them
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+from ..config import UPDATE_CONFIG
+from .database import get_db, list_from_rows
+from .jobs import job_runner, PRIORITY_BACKGROUND, PRIORITY_USER
+
+
+def get_toc_url(data_path: Path) -> str:
+    """Build the novelhi TOC URL for a scraped novel folder"""
+    # The folder name is the cleaned novel name from the original URL
+    return f"https://novelhi.com/s/{data_path.name}"
+
+
+def detect_total_chapters(toc_url: str) -> int:
+    """Open a browser and read the chapter count from the novel TOC page"""
+    from ..scraper import NovelScraper
+
+    scraper = NovelScraper(headless=True)
+    driver = scraper.start_driver()
+    try:
+        return scraper.get_total_chapters(driver, toc_url)
+    finally:
+        driver.quit()
+
+
+def find_missing_chapters(existing: Set[int], total_chapters: int) -> List[int]:
+    """Get the sorted chapter numbers up to total_chapters that are not stored locally"""
+    return [number for number in range(1, total_chapters + 1) if number not in existing]
+
+
+def queue_missing_chapters(slug: str, novel_title: str, toc_url: str, missing_chapters: List[int],
+                           priority: int = PRIORITY_USER) -> Tuple[str, bool]:
+    """Queue a scrape of exactly the missing chapters on the job runner
+
+    Returns the job id and whether a new job was created; an existing job
+    for the same novel is returned instead of queueing a second one.
+    """
+    from ..scraper import compress_chapter_ranges
+    from .routes.scraper import run_scraper
+
+    return job_runner.submit(
+        slug, run_scraper,
+        args=(toc_url, compress_chapter_ranges(missing_chapters)),
+        priority=priority,
+        total_chapters=len(missing_chapters),
+        novel_title=novel_title
+    )
+
+
+def check_novel(novel: Dict[str, Any], scrape: bool = True) -> Dict[str, Any]:
+    """Find the missing chapters of one novel and optionally queue a scrape for them"""
+    from .routes.chapters import get_indexed_chapter_numbers
+
+    result = {
+        'slug': novel['slug'],
+        'title': novel['title'],
+        'local_chapters': 0,
+        'remote_chapters': None,
+        'missing_chapters': 0,
+        'job_id': None,
+        'job_created': False,
+        'error': None
+    }
+
+    # A novel that is already being scraped is left alone
+    active_job = job_runner.active_job_id(novel['slug'])
+    if active_job:
+        result['job_id'] = active_job
+        return result
+
+    data_path = Path(novel['data_path']) if novel.get('data_path') else None
+    if not data_path or not data_path.exists():
+        result['error'] = "Novel data path not found"
+        return result
+
+    existing = get_indexed_chapter_numbers(novel['id'], str(data_path))
+    result['local_chapters'] = len(existing)
+
+    toc_url = get_toc_url(data_path)
+    try:
+        total_chapters = detect_total_chapters(toc_url)
+    except Exception as e:
+        result['error'] = f"Failed to detect chapters: {str(e)}"
+        return result
+
+    missing = find_missing_chapters(existing, total_chapters)
+    result['remote_chapters'] = total_chapters
+    result['missing_chapters'] = len(missing)
+
+    if missing and scrape:
+        result['job_id'], result['job_created'] = queue_missing_chapters(
+            novel['slug'], novel['title'], toc_url, missing, priority=PRIORITY_BACKGROUND
+        )
+
+    return result
+
+
+class UpdateScheduler:
+    """Runs library-wide update checks on an interval with bounded concurrency
+
+    Checks run on the scheduler's own pool; the scrapes they queue run on
+    the shared job runner at background priority.
+    """
+
+    def __init__(self, interval_hours: float, max_concurrent: int, initial_delay_seconds: float = 60):
+        self.interval_hours = interval_hours
+        self.initial_delay_seconds = initial_delay_seconds
+        self.max_concurrent = max_concurrent
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self._summary_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._summary: Dict[str, Any] = {
+            'status': 'idle',
+            'last_started': None,
+            'last_finished': None,
+            'next_run': None,
+            'novels_checked': 0,
+            'novels_outdated': 0,
+            'missing_chapters': 0,
+            'jobs_started': 0,
+            'errors': 0,
+            'novels': []
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the periodic check loop in a daemon thread"""
+        if self.enabled:
+            return
+
+        self._stop_event.clear()
+        self._set_next_run(self.initial_delay_seconds)
+        self._thread = threading.Thread(target=self._loop, name="update-scheduler", daemon=True)
+        self._thread.start()
+        print(f"[INFO] Update scheduler started (every {self.interval_hours}h)")
+
+    def stop(self):
+        """Stop the loop; a check already in progress finishes its current novels"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def trigger(self) -> bool:
+        """Run a check now in the background; returns False if one is already running"""
+        if self._run_lock.locked():
+            return False
+
+        threading.Thread(target=self.run_once, name="update-check", daemon=True).start()
+        return True
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Get a snapshot of the last check"""
+        with self._summary_lock:
+            summary = dict(self._summary)
+            summary['novels'] = list(summary['novels'])
+        summary['enabled'] = self.enabled
+        summary['interval_hours'] = self.interval_hours
+        return summary
+
+    def run_once(self) -> Dict[str, Any]:
+        """Check every novel in the library and queue scrapes for the missing chapters"""
+        if not self._run_lock.acquire(blocking=False):
+            return self.get_summary()
+
+        try:
+            with self._summary_lock:
+                self._summary['status'] = 'running'
+                self._summary['last_started'] = datetime.now()
+
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT id, slug, title, data_path FROM novels ORDER BY last_updated DESC')
+                novels = list_from_rows(cursor.fetchall())
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrent) as pool:
+                results = [r for r in pool.map(self._check_if_running, novels) if r]
+
+            with self._summary_lock:
+                self._summary.update({
+                    'status': 'idle',
+                    'last_finished': datetime.now(),
+                    'novels_checked': len(results),
+                    'novels_outdated': sum(1 for r in results if r['missing_chapters']),
+                    'missing_chapters': sum(r['missing_chapters'] for r in results),
+                    'jobs_started': sum(1 for r in results if r['job_created']),
+                    'errors': sum(1 for r in results if r['error']),
+                    'novels': results
+                })
+
+            print(f"[INFO] Update check finished: {len(results)} novels checked")
+        except Exception as e:
+            print(f"[ERROR] Update check failed: {e}")
+            with self._summary_lock:
+                self._summary['status'] = 'idle'
+        finally:
+            self._run_lock.release()
+
+        return self.get_summary()
+
+    def _check_if_running(self, novel: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # Novels still queued when the scheduler stops are skipped
+        if self._stop_event.is_set():
+            return None
+        return check_novel(novel)
+
+    def _set_next_run(self, seconds: Optional[float] = None):
+        if seconds is None:
+            seconds = self.interval_hours * 3600
+        with self._summary_lock:
+            self._summary['next_run'] = datetime.now() + timedelta(seconds=seconds)
+
+    def _loop(self):
+        # The first check runs shortly after startup instead of a full interval later
+        delay = self.initial_delay_seconds
+        while not self._stop_event.wait(delay):
+            self.run_once()
+            self._set_next_run()
+            delay = self.interval_hours * 3600
+
+
+update_scheduler = UpdateScheduler(
+    interval_hours=UPDATE_CONFIG['interval_hours'],
+    max_concurrent=UPDATE_CONFIG['max_concurrent'],
+    initial_delay_seconds=UPDATE_CONFIG['initial_delay_seconds']
+)
@@ -0,0 +1,117 @@
+"""
+Chapter full-text search for NovelLabs
+The chapter_search FTS5 table is filled by the chapter sync (rowid is the
+chapter id) and queried with bm25 ranking and highlighted snippets.
+"""
+
+import html
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import get_db, list_from_rows
+
+# Sentinels marking matches inside snippets; replaced after HTML escaping
+_MATCH_START = '\x02'
+_MATCH_END = '\x03'
+
+# bm25 column weights for (title, body)
+TITLE_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+SNIPPET_TOKENS = 24
+
+
+def update_search_index(cursor, entries: List[Tuple[int, str, Optional[str]]]):
+    """Replace the search entries of (chapter_id, title, body) rows"""
+    if not entries:
+        return
+    cursor.executemany('DELETE FROM chapter_search WHERE rowid = ?', [(entry[0],) for entry in entries])
+    cursor.executemany(
+        'INSERT INTO chapter_search (rowid, title, body) VALUES (?, ?, ?)',
+        [(chapter_id, title, body or '') for chapter_id, title, body in entries]
+    )
+
+
+def remove_from_search_index(cursor, chapter_ids: List[int]):
+    cursor.executemany('DELETE FROM chapter_search WHERE rowid = ?', [(chapter_id,) for chapter_id in chapter_ids])
+
+
+def build_match_query(text: str) -> str:
+    """
+    Turn user input into an FTS5 query that cannot raise a syntax error.
+
+    Every word must match; quoted "phrases" are kept together and a trailing
+    * on a word makes it a prefix search.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip().replace('"', '""') + '"')
+        elif word:
+            prefix = word.endswith('*')
+            word = word.rstrip('*').replace('"', '""')
+            if word:
+                terms.append(f'"{word}"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+
+
+def format_snippet(snippet: str) -> str:
+    """HTML-escape a snippet and wrap the matches in <mark> tags"""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_MATCH_START, '<mark>').replace(_MATCH_END, '</mark>')
+
+
+def search_chapters(text: str, novel_slug: Optional[str] = None,
+                    chapter_from: Optional[int] = None, chapter_to: Optional[int] = None,
+                    limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Search chapter titles and bodies.
+
+    Returns:
+        Tuple of (results best match first, total number of matches).
+    """
+    match = build_match_query(text)
+    if not match:
+        return [], 0
+
+    filters = ''
+    params: List[Any] = [match, f'bm25({TITLE_WEIGHT}, {BODY_WEIGHT})']
+    if novel_slug:
+        filters += ' AND n.slug = ?'
+        params.append(novel_slug)
+    if chapter_from is not None:
+        filters += ' AND c.chapter_number >= ?'
+        params.append(chapter_from)
+    if chapter_to is not None:
+        filters += ' AND c.chapter_number <= ?'
+        params.append(chapter_to)
+
+    matches = f'''
+        FROM chapter_search
+        JOIN chapters c ON c.id = chapter_search.rowid
+        JOIN novels n ON n.id = c.novel_id
+        WHERE chapter_search MATCH ? AND chapter_search.rank MATCH ?{filters}
+    '''
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COUNT(*) {matches}', params)
+        total = cursor.fetchone()[0]
+
+        results = []
+        if total > offset:
+            # FTS5 returns rows in rank order, so snippets are built for this page only
+            cursor.execute(f'''
+                SELECT c.id AS chapter_id, c.novel_id, n.slug AS novel_slug, n.title AS novel_title,
+                    c.chapter_number, c.title, chapter_search.rank AS rank,
+                    snippet(chapter_search, 1, ?, ?, '...', ?) AS snippet
+                {matches}
+                ORDER BY chapter_search.rank
+                LIMIT ? OFFSET ?
+            ''', [_MATCH_START, _MATCH_END, SNIPPET_TOKENS] + params + [limit, offset])
+            results = list_from_rows(cursor.fetchall())
+
+    for result in results:
+        result['snippet'] = format_snippet(result['snippet'])
+
+    return results, total
@@ -0,0 +1,103 @@
+"""
+Warm TTS generator for NovelLabs audio jobs
+Keeps one AudioBookGenerator and one SmartSegmenter per server process so the
+model, its warmup, the preloaded voice packs and the spaCy pipeline survive
+between jobs; audio jobs borrow them one at a time and switch voices without
+reloading anything. Audio jobs run on tts_job_runner, whose single worker
+matches the single model, so they never wait for or block a scrape.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .jobs import ScrapeJobRunner
+from ..config import OUTPUT_DIRS, TTS_CONFIG
+from ..metrics import TTS_JOB_QUEUE_DEPTH
+
+
+class TTSWorker:
+    """Builds the generator on first use and lends it to one job at a time"""
+
+    def __init__(self, output_dir: str, use_gpu: bool = True):
+        self.output_dir = output_dir
+        self.use_gpu = use_gpu
+        self._generator = None
+        self._segmenter = None
+        self._lock = threading.Lock()  # One model: jobs synthesize one after another
+
+    @property
+    def loaded(self) -> bool:
+        return self._generator is not None
+
+    def _get(self):
+        if self._generator is None:
+            from ..main import AudioBookGenerator  # Loads torch and kokoro
+            self._generator = AudioBookGenerator(
+                voice=TTS_CONFIG['default_voice'], output_dir=self.output_dir, use_gpu=self.use_gpu
+            )
+        return self._generator
+
+    def _get_segmenter(self):
+        if self._segmenter is None:
+            from ..segmenter import SmartSegmenter  # Loads spaCy
+            self._segmenter = SmartSegmenter()
+        return self._segmenter
+
+    def warmup(self, voices: Optional[List[str]] = None) -> Dict:
+        """Load the model if needed, preload voices and run the warmup corpus"""
+        with self._lock:
+            return self._get().warmup(voices=voices)
+
+    @contextmanager
+    def generator(self, voice: str, profiler=None) -> Iterator:
+        """The shared generator set to voice, timed by profiler for this job only"""
+        with self._lock:
+            generator = self._get()
+            generator.set_voice(voice)
+            if profiler is not None:
+                generator.set_profiler(profiler)
+            try:
+                yield generator
+            finally:
+                if profiler is not None:
+                    generator.set_profiler(None)
+
+    @contextmanager
+    def session(self, voice: str, profiler=None) -> Iterator[Tuple]:
+        """(generator, segmenter) for one job; both are timed by profiler for this job only"""
+        from ..profiling import Profiler
+
+        with self.generator(voice, profiler=profiler) as generator:
+            segmenter = self._get_segmenter()
+            segmenter.profiler = profiler or Profiler.disabled()
+            try:
+                yield generator, segmenter
+            finally:
+                segmenter.profiler = Profiler.disabled()
+
+    def status(self) -> Dict:
+        generator = self._generator
+        if generator is None:
+            return {'loaded': False, 'voices': [], 'warmup': None}
+        return {
+            'loaded': True,
+            'warmed': generator.warmed,
+            'voice': generator.voice,
+            'voices': sorted(generator.voice_packs),
+            'warmup': generator.warmup_report,
+            'segmenter_loaded': self._segmenter is not None
+        }
+
+    def unload(self):
+        """Drop the generator and segmenter so their memory can be freed"""
+        with self._lock:
+            self._generator = None
+            self._segmenter = None
+
+
+tts_worker = TTSWorker(str(OUTPUT_DIRS['audio']), use_gpu=TTS_CONFIG['use_gpu'])
+
+# One model synthesizes one chapter at a time, so more workers would only wait on tts_worker
+tts_job_runner = ScrapeJobRunner(max_workers=1, name="tts")
+TTS_JOB_QUEUE_DEPTH.set_function(tts_job_runner.queue_depth)
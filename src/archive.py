@@ -0,0 +1,187 @@
+"""Raw page archive and offline chapter re-extraction.
+
+Every fetched chapter page can be kept as a compressed, content-addressed
+object so chapter files can be rebuilt after the extraction logic changes,
+without a browser or network access:
+
+    python src/archive.py data/raw/Novel-Name --workers 8
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+try:
+    from .extractor import extract_chapter, write_chapter_file
+except ImportError:
+    from extractor import extract_chapter, write_chapter_file
+
+CODEC_SUFFIXES = {'zstd': '.html.zst', 'gzip': '.html.gz'}
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd archives")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class RawPageStore:
+    """Content-addressed store of compressed chapter pages for one novel.
+
+    Layout::
+
+        <root>/objects/ab/abcdef....html.zst   one object per distinct page
+        <root>/index.jsonl                     chapter -> object, last entry wins
+    """
+
+    def __init__(self, root: str, compression: str = 'zstd'):
+        if compression not in CODEC_SUFFIXES:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            compression = 'gzip'
+
+        self.root = Path(root)
+        self.compression = compression
+        self.index_path = self.root / "index.jsonl"
+        self._lock = threading.Lock()
+
+    def object_path(self, digest: str, codec: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}{CODEC_SUFFIXES[codec]}"
+
+    def put(self, chapter_number: int, url: str, html: str) -> str:
+        """Store a page and record it as the latest copy of the chapter"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest, self.compression)
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(path.suffix + ".tmp")
+                tmp_path.write_bytes(_compress(data, self.compression))
+                os.replace(tmp_path, path)
+
+            entry = {
+                'chapter': chapter_number,
+                'sha256': digest,
+                'codec': self.compression,
+                'url': url,
+                'fetched_at': time.time()
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+        return digest
+
+    def entries(self) -> Dict[int, dict]:
+        """Get the latest index entry for every archived chapter"""
+        latest = {}
+        if not self.index_path.exists():
+            return latest
+
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    latest[entry['chapter']] = entry
+        return latest
+
+    def read(self, entry: dict) -> str:
+        """Load and decompress the page referenced by an index entry"""
+        data = self.object_path(entry['sha256'], entry['codec']).read_bytes()
+        return _decompress(data, entry['codec']).decode("utf-8")
+
+
+def _reextract_one(task: Tuple[str, dict, str, int]) -> Tuple[int, Optional[str]]:
+    root, entry, output_dir, min_length = task
+    try:
+        html = RawPageStore(root, entry['codec']).read(entry)
+        title, content = extract_chapter(html, min_length)
+        filepath = os.path.join(output_dir, f"Chapter_{entry['chapter']:04d}.txt")
+        write_chapter_file(filepath, title, content)
+        return entry['chapter'], None
+    except Exception as e:
+        return entry['chapter'], str(e)
+
+
+def reextract_novel(raw_dir: str, output_dir: str, workers: Optional[int] = None,
+                    start: Optional[int] = None, end: Optional[int] = None,
+                    min_content_length: int = 100) -> Dict:
+    """
+    Rebuild Chapter_XXXX.txt files from a novel's raw page archive.
+
+    Args:
+        raw_dir: Archive folder of one novel.
+        output_dir: Folder the chapter files are written to.
+        workers: Worker processes, defaults to the CPU count.
+        start: First chapter to rebuild (inclusive).
+        end: Last chapter to rebuild (inclusive).
+        min_content_length: Passed through to extract_chapter.
+
+    Returns:
+        Dictionary with 'processed', 'failed' and 'errors' per chapter.
+    """
+    store = RawPageStore(raw_dir)
+    entries = [
+        entry for number, entry in sorted(store.entries().items())
+        if (start is None or number >= start) and (end is None or number <= end)
+    ]
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(str(store.root), entry, output_dir, min_content_length) for entry in entries]
+    errors = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chapter, error in pool.map(_reextract_one, tasks, chunksize=16):
+            if error:
+                errors[chapter] = error
+
+    return {'processed': len(tasks) - len(errors), 'failed': len(errors), 'errors': errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild chapter files from a raw page archive")
+    parser.add_argument("raw_dir", help="Archive folder of one novel, e.g. data/raw/Novel-Name")
+    parser.add_argument("--output-dir", help="Defaults to data/output/<novel>")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--min-length", type=int, default=100, help="Minimum content length")
+    args = parser.parse_args()
+
+    novel_name = re.sub(r'[\\/*?<>:"|]', "", Path(args.raw_dir).name)
+    output_dir = args.output_dir or os.path.join("data", "output", novel_name)
+
+    started = time.perf_counter()
+    stats = reextract_novel(args.raw_dir, output_dir, args.workers, args.start, args.end, args.min_length)
+    elapsed = time.perf_counter() - started
+
+    for chapter, error in sorted(stats['errors'].items()):
+        print(f"✗ Chapter {chapter}: {error[:80]}")
+    print(f"[COMPLETE] Rebuilt: {stats['processed']} | Failed: {stats['failed']} | {elapsed:.1f}s")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Browser session management for long scrapes.
+
+DriverManager owns the Chrome instance used by a scrape: it recycles the
+browser every N pages or when its memory grows past a limit, restarts it
+after a crash, carries cookies (including challenge clearance) over to the
+new session and keeps per-session page-load and memory metrics.
+"""
+
+import logging
+import time
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # Memory watchdog is skipped without psutil
+    psutil = None
+
+try:
+    from .metrics import SCRAPER_PAGE_LOAD_SECONDS
+except ImportError:
+    from metrics import SCRAPER_PAGE_LOAD_SECONDS
+
+SETTLE_DELAY = 2  # Seconds to let dynamic content finish after the container appears
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class DriverManager:
+    """Hands out a healthy Chrome session and replaces it when needed."""
+
+    def __init__(self, scraper, max_pages: int = 200, max_rss_mb: float = 1500.0,
+                 rss_check_every: int = 10):
+        """
+        Args:
+            scraper: NovelScraper used to start drivers and load pages.
+            max_pages: Recycle the browser after this many page loads (0 disables).
+            max_rss_mb: Recycle when the browser process tree exceeds this RSS (0 disables).
+            rss_check_every: Sample memory every N page loads.
+        """
+        self.scraper = scraper
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.rss_check_every = max(1, rss_check_every)
+
+        self._driver = None
+        self._session: Optional[Dict] = None
+        self._sessions: List[Dict] = []
+        self._last_cookies: List[Dict] = []
+        self.restarts = 0
+        self.crashes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def driver(self):
+        """The current driver, started on first use"""
+        if self._driver is None:
+            self._start()
+        return self._driver
+
+    def fetch_page(self, url: str) -> str:
+        """Load a chapter page and return its source, restarting the browser once on a crash"""
+        self._recycle_if_needed()
+
+        for attempt in (1, 2):
+            driver = self.driver
+            started = time.perf_counter()
+            try:
+                self.scraper.load_page(driver, url)
+            except Exception:
+                if self._is_alive():
+                    self._session['failed_pages'] += 1
+                    raise
+                if attempt == 2:
+                    raise
+                self.crashes += 1
+                logging.warning("Browser session crashed, restarting")
+                self._restart("crash", keep_cookies=False)
+                continue
+
+            self._record_load(time.perf_counter() - started)
+            time.sleep(SETTLE_DELAY)
+            return driver.page_source
+
+    def close(self):
+        """Quit the browser and finish the current session's metrics"""
+        self._stop("closed")
+
+    def metrics(self) -> Dict:
+        """Summary of every browser session used so far"""
+        sessions = self._sessions + ([self._session] if self._session else [])
+        return {
+            'restarts': self.restarts,
+            'crashes': self.crashes,
+            'sessions': [self._summarize(session) for session in sessions]
+        }
+
+    # --------------------------------------------------
+
+    def _start(self):
+        self._driver = self.scraper.start_driver()
+        self._session = {
+            'session': len(self._sessions) + 1,
+            'started_at': time.time(),
+            'ended_at': None,
+            'end_reason': None,
+            'pages': 0,
+            'failed_pages': 0,
+            'load_seconds': [],
+            'rss_mb': None,
+            'peak_rss_mb': None
+        }
+
+    def _stop(self, reason: str):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+        if self._session is not None:
+            self._session['ended_at'] = time.time()
+            self._session['end_reason'] = reason
+            self._sessions.append(self._session)
+            self._session = None
+
+    def _restart(self, reason: str, keep_cookies: bool = True):
+        cookies = self._get_cookies() if keep_cookies else self._last_cookies
+        self._stop(reason)
+        self.restarts += 1
+        self._start()
+        if cookies:
+            self._set_cookies(cookies)
+
+    def _recycle_if_needed(self):
+        session = self._session
+        if session is None:
+            return
+
+        loaded = session['pages'] + session['failed_pages']
+        if self.max_pages and loaded >= self.max_pages:
+            logging.info(f"Recycling browser after {loaded} pages")
+            self._restart("page_limit")
+        elif self.max_rss_mb and session['rss_mb'] and session['rss_mb'] >= self.max_rss_mb:
+            logging.info(f"Recycling browser at {session['rss_mb']:.0f} MB RSS")
+            self._restart("memory")
+
+    def _record_load(self, seconds: float):
+        session = self._session
+        session['pages'] += 1
+        session['load_seconds'].append(seconds)
+        SCRAPER_PAGE_LOAD_SECONDS.observe(seconds)
+
+        if session['pages'] % self.rss_check_every == 0:
+            rss = self._browser_rss_mb()
+            if rss is not None:
+                session['rss_mb'] = rss
+                session['peak_rss_mb'] = max(rss, session['peak_rss_mb'] or 0)
+            # Keep a recent copy so cookies survive a crash that kills the session
+            self._last_cookies = self._get_cookies()
+
+    def _is_alive(self) -> bool:
+        try:
+            self._driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _browser_rss_mb(self) -> Optional[float]:
+        """Resident memory of the browser and all its child processes"""
+        pid = getattr(self._driver, "browser_pid", None)
+        if psutil is None or not pid:
+            return None
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def _get_cookies(self) -> List[Dict]:
+        try:
+            return self._driver.get_cookies()
+        except Exception:
+            return []
+
+    def _set_cookies(self, cookies: List[Dict]):
+        """Install cookies through DevTools so no page load is needed first"""
+        try:
+            self._driver.execute_cdp_cmd("Network.enable", {})
+            for cookie in cookies:
+                params = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")
+                          if key in cookie}
+                if "expiry" in cookie:
+                    params["expires"] = cookie["expiry"]
+                self._driver.execute_cdp_cmd("Network.setCookie", params)
+        except Exception as e:
+            logging.warning(f"Could not restore cookies: {e}")
+
+    @staticmethod
+    def _summarize(session: Dict) -> Dict:
+        loads = sorted(session['load_seconds'])
+        summary = {key: value for key, value in session.items() if key != 'load_seconds'}
+        summary['load_seconds'] = {
+            'count': len(loads),
+            'mean': sum(loads) / len(loads) if loads else None,
+            'p50': _percentile(loads, 0.5) if loads else None,
+            'p95': _percentile(loads, 0.95) if loads else None,
+            'max': loads[-1] if loads else None
+        }
+        return summary
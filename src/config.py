@@ -7,6 +7,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 OUTPUT_DIRS = {
     'scraped': BASE_DIR / 'data' / 'output',
+    'raw': BASE_DIR / 'data' / 'raw',
     'segmented': BASE_DIR / 'Segmentor' / 'output',
     'audio': BASE_DIR / 'audio',
     'logs': BASE_DIR / 'logs'
@@ -15,13 +16,18 @@ OUTPUT_DIRS = {
 BROWSER_CONFIG = {
     'window_size': '1920,1080',
     'timeout': 15,
-    'delay_between_chapters': 2
+    'delay_between_chapters': 2,
+    'recycle_after_pages': 200,
+    'max_rss_mb': 1500
 }
 
 SCRAPER_CONFIG = {
     'min_content_length': 100,
     'max_retries': 3,
-    'headless': True
+    'headless': True,
+    'save_raw_html': False,
+    'raw_compression': 'zstd',
+    'max_concurrent_jobs': 2
 }
 
 SEGMENTATION_CONFIG = {
@@ -31,11 +37,87 @@ SEGMENTATION_CONFIG = {
 }
 
 TTS_CONFIG = {
+    'repo_id': 'hexgrad/Kokoro-82M',
+    'backend': 'torch',               # torch, int8 (dynamic quantization, CPU) or onnx (ONNX Runtime, CPU)
+    'onnx_model': BASE_DIR / 'models' / 'kokoro.onnx',
+    'onnx_threads': 0,                # 0 lets ONNX Runtime use every core
     'sample_rate': 24000,
     'silence_duration': 0.3,
     'default_voice': 'af_heart',
-    'use_gpu': True
+    'use_gpu': True,
+    'preload_voices': ['af_heart'],   # Voice packs a warmed generator keeps in memory
+    # Warmup corpus: the first call pays graph setup and allocator growth,
+    # the rest measure warm latency
+    'warmup_texts': [
+        "The warmup sentence is short.",
+        "\"Are you ready?\" she asked, and he nodded before stepping into the light.",
+        "A longer warmup passage exercises the same shapes as a typical chunk of narration, "
+        "with commas, a clause or two, and enough words to fill several seconds of speech."
+    ],
+    'warmup_on_startup': False        # API: load and warm the model when the server starts
 }
 
-for dir_path in OUTPUT_DIRS.values():
-    os.makedirs(dir_path, exist_ok=True)
+UPDATE_CONFIG = {
+    'enabled': False,   # Opt in: every check opens a browser per novel
+    'interval_hours': 6,
+    'initial_delay_seconds': 60,   # First check after the API starts, then every interval_hours
+    'max_concurrent': 2
+}
+
+API_CONFIG = {
+    'index_poll_seconds': 5,
+    'io_threads': 16,   # Threads for blocking database and file work in routes
+    'view_flush_seconds': 10,
+    'view_counter_shards': 16,
+    'search_index': True,   # Index chapter bodies for /api/search during chapter sync
+    'content_cache_mb': 64,   # Memory for parsed chapter bodies
+    'prefetch_next_chapter': True,
+    'audio_chunk_kb': 256,   # Read size when streaming audio without sendfile
+    'chapter_page_size': 200,   # Default and maximum page sizes of chapter listings
+    'chapter_page_max': 1000
+}
+
+# Cache-Control per endpoint group; responses also carry ETag/Last-Modified validators
+HTTP_CACHE_CONFIG = {
+    'chapter': 'public, max-age=300',   # Chapter text rarely changes once scraped
+    'chapter_list': 'no-cache',   # Revalidate; new chapters arrive from the scraper
+    'novel_list': 'no-cache',
+    'audio': 'public, max-age=86400'
+}
+
+COMPRESSION_CONFIG = {
+    'enabled': True,
+    'minimum_size': 1024,   # Bytes; smaller responses are sent as is
+    'gzip_level': 6,
+    'brotli': True,   # Used when the brotli package is installed and the client accepts it
+    'brotli_quality': 4
+}
+
+METRICS_CONFIG = {
+    'enabled': True,   # Serve /metrics and time API requests and database statements
+    'dump_file': os.environ.get('NOVELLABS_METRICS_FILE')   # CLIs write their metrics here (.json or text)
+}
+
+PROFILING_CONFIG = {
+    'output_dir': BASE_DIR / 'logs' / 'profiles',   # One folder per profiled run or API job
+    'sampler': 'auto',   # 'pyinstrument', 'cprofile', 'auto' (pyinstrument when installed) or 'off'
+    'sampler_interval': 0.001,   # Seconds between pyinstrument samples
+    'torch_trace_chapters': 1,   # Chapters per run recorded with the torch profiler
+    'top_phases': 5   # Phases per chapter in the text report
+}
+
+DATABASE_CONFIG = {
+    'pool_connections': True,   # Reuse one connection per thread
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size_kb': 16384,
+    'mmap_size_mb': 256,
+    'busy_timeout_ms': 5000,
+    'cached_statements': 256   # Prepared statements kept per connection
+}
+
+
+def ensure_output_dirs():
+    """Create the output folders; called by entry points, not on import"""
+    for dir_path in OUTPUT_DIRS.values():
+        os.makedirs(dir_path, exist_ok=True)
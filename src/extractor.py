@@ -0,0 +1,116 @@
+"""Chapter extraction from raw novelhi page HTML.
+
+Shared by the live scraper and the offline re-extraction command so both
+produce identical chapter files. Needs no browser.
+
+Text follows Selenium's WebElement.text, which the scraper used before
+pages were parsed from their source: hidden elements are skipped, <br>
+and block elements break lines, and spaces are collapsed within a line.
+Only inline styles and the hidden attribute are seen here; text hidden by
+a stylesheet rule is still included.
+"""
+
+import re
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup, NavigableString
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
+
+MIN_CONTENT_LENGTH = 100
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'center', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+    'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+}
+# Never rendered, whatever their style
+HIDDEN_TAGS = {'head', 'noscript', 'script', 'style', 'template', 'title'}
+# Markup that is not text
+SKIPPED_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+_SPACES_RE = re.compile(r'[ \t\n\r\f\v]+')  # Whitespace a browser collapses; not the no-break space
+
+
+def _is_hidden(element) -> bool:
+    if element.name in HIDDEN_TAGS or element.has_attr('hidden'):
+        return True
+    style = element.get('style', '').replace(' ', '').lower()
+    return 'display:none' in style or 'visibility:hidden' in style
+
+
+def _is_displayed(element) -> bool:
+    """False when the element or one of its ancestors is hidden"""
+    return not any(_is_hidden(node) for node in [element, *element.parents] if node.name != '[document]')
+
+
+def _visible_text(element) -> str:
+    """Element text as Selenium's WebElement.text renders it"""
+    if not _is_displayed(element):
+        return ""
+
+    lines: List[str] = ['']
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                if not isinstance(child, SKIPPED_STRINGS):
+                    lines[-1] += child
+            elif child.name == 'br':
+                lines.append('')
+                walk(child)  # html.parser can nest the following text inside a <br>
+            elif not _is_hidden(child):
+                # A block starts and ends a line, but never adds an empty one
+                block = child.name in BLOCK_TAGS
+                if block and lines[-1].strip():
+                    lines.append('')
+                walk(child)
+                if block and lines[-1].strip():
+                    lines.append('')
+
+    walk(element)
+    text = "\n".join(_SPACES_RE.sub(' ', line).strip(' ') for line in lines)
+    return text.replace('\xa0', ' ').strip()
+
+
+def extract_chapter(html: str, min_content_length: int = MIN_CONTENT_LENGTH) -> Tuple[str, str]:
+    """
+    Extract the title and body of a chapter page.
+
+    Args:
+        html: Raw page source.
+        min_content_length: Shorter bodies are treated as failed loads.
+
+    Returns:
+        Tuple of (title, content) with paragraphs separated by blank lines.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    title = "Untitled Chapter"
+    for tag in ["h1", "h2"]:
+        title_elem = soup.find(tag)
+        if title_elem is not None:
+            title = _visible_text(title_elem)
+            break
+
+    show_reading_div = soup.find(id="showReading")
+    if show_reading_div is None:
+        raise ValueError("Content container not found - page may not have loaded")
+
+    paragraphs = [_visible_text(p) for p in show_reading_div.find_all("p")]
+    if paragraphs:
+        content = "\n\n".join(p for p in paragraphs if p)
+    else:
+        content = _visible_text(show_reading_div)
+
+    if len(content) < min_content_length:
+        raise ValueError(f"Content too short ({len(content)} characters)")
+
+    return title, content
+
+
+def write_chapter_file(filepath: str, title: str, content: str):
+    """Write a chapter in the Chapter_XXXX.txt layout (title, rule, body)"""
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(f"{title}\n")
+        f.write("=" * 60 + "\n\n")
+        f.write(content)
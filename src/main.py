@@ -2,11 +2,28 @@ import os
 import re
 import json
 import logging
-import numpy as np
-import soundfile as sf
-import torch
-from typing import Optional, Dict
-from kokoro import KPipeline
+import statistics
+import time
+from typing import TYPE_CHECKING, Iterator, Optional, Dict, List, Tuple
+
+try:
+    from .config import TTS_CONFIG
+    from .tts_backends import BACKENDS, load_model
+    from .metrics import (TTS_AUDIO_SECONDS, TTS_CHUNK_SECONDS, TTS_FIRST_CHUNK_SECONDS, TTS_REAL_TIME_FACTOR,
+                          TTS_SEGMENT_SECONDS, TTS_SYNTHESIS_SECONDS, TTS_VOICE_LOAD_SECONDS, dump_metrics)
+    from .profiling import Profiler, profile_dir, run_name
+except ImportError:
+    from config import TTS_CONFIG
+    from tts_backends import BACKENDS, load_model
+    from metrics import (TTS_AUDIO_SECONDS, TTS_CHUNK_SECONDS, TTS_FIRST_CHUNK_SECONDS, TTS_REAL_TIME_FACTOR,
+                         TTS_SEGMENT_SECONDS, TTS_SYNTHESIS_SECONDS, TTS_VOICE_LOAD_SECONDS, dump_metrics)
+    from profiling import Profiler, profile_dir, run_name
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# torch, kokoro, numpy and soundfile are imported where they are first used so
+# `--help`, `--list-voices` and modules that only need VOICES start instantly
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
@@ -22,30 +39,257 @@ VOICES = {
     "Portuguese": ["pf_dora", "pm_alex", "pm_santa"]
 }
 
+# Kokoro language code of each voice group; it is the first letter of the voice name
+LANG_CODES = {
+    'a': "American English", 'b': "British English", 'e': "Spanish", 'f': "French", 'h': "Hindi",
+    'i': "Italian", 'j': "Japanese", 'p': "Portuguese", 'z': "Mandarin"
+}
+
+
+def lang_code_for(voice: str) -> str:
+    """Kokoro language code of a voice, e.g. 'j' for jf_alpha"""
+    code = voice[:1]
+    if code not in LANG_CODES:
+        raise ValueError(f"Unknown voice language: {voice}")
+    return code
+
+
+class AudioBuffer:
+    """
+    Growable float32 audio buffer that model output is copied into once.
+
+    It is sized from the text up front and zero-filled, so silence costs
+    nothing, and grows by half when speech runs longer than estimated.
+    """
+
+    SECONDS_PER_CHAR = 0.08  # Slightly above Kokoro's speaking rate at speed 1
+
+    def __init__(self, capacity: int, sample_rate: int = 24000):
+        import numpy as np
+
+        self.sample_rate = sample_rate
+        self.length = 0
+        self._data = np.zeros(max(capacity, 1), dtype=np.float32)
+
+    @classmethod
+    def for_text(cls, texts, sample_rate: int = 24000, gap: int = 0) -> "AudioBuffer":
+        """Buffer sized for a text or a list of chunks separated by gap samples"""
+        texts = [texts] if isinstance(texts, str) else texts
+        chars = sum(len(text) for text in texts)
+        return cls(int(chars * cls.SECONDS_PER_CHAR * sample_rate) + gap * len(texts), sample_rate)
+
+    def _reserve(self, samples: int):
+        needed = self.length + samples
+        if needed > len(self._data):
+            import numpy as np
+
+            grown = np.zeros(max(needed, len(self._data) * 3 // 2), dtype=np.float32)
+            grown[:self.length] = self._data[:self.length]
+            self._data = grown
+
+    def write(self, audio):
+        """Copy a 1-D numpy array or torch tensor (CPU or GPU) to the end"""
+        samples = audio.shape[-1]
+        self._reserve(samples)
+        target = self._data[self.length:self.length + samples]
+        if type(audio).__module__.startswith('torch'):
+            import torch
+
+            # One device-to-host copy straight into the buffer, no intermediate array
+            torch.from_numpy(target).copy_(audio.reshape(-1))
+        else:
+            target[:] = audio.reshape(-1)
+        self.length += samples
+
+    def skip(self, samples: int):
+        """Leave samples of silence"""
+        self._reserve(samples)
+        self.length += samples
+
+    def truncate(self, length: int):
+        """Forget everything after length, zeroing it again for reuse"""
+        self._data[length:self.length] = 0
+        self.length = length
+
+    def audio(self) -> "np.ndarray":
+        """The written audio (a view, not a copy)"""
+        return self._data[:self.length]
+
 
 class AudioBookGenerator:
-    def __init__(self, voice: str = "af_heart", output_dir: str = "audio", use_gpu: bool = True):
+    def __init__(self, voice: str = "af_heart", output_dir: str = "audio", use_gpu: bool = True,
+                 profiler: Optional[Profiler] = None, backend: Optional[str] = None):
         self.voice = voice
         self.output_dir = output_dir
-        
-        device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
-        if device == "cuda":
+        self.profiler = profiler or Profiler.disabled()
+        self.voice_packs: Dict[str, object] = {}  # Preloaded voice tensors by name
+        self.warmed = False                       # Set by the first successful synthesis
+        self.warmup_report: Optional[Dict] = None
+
+        import torch
+
+        self.backend = backend or TTS_CONFIG['backend']
+        self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
+        if self.device == "cuda" and self.backend != 'torch':
+            logging.warning(f"The {self.backend} backend runs on the CPU; ignoring the GPU")
+            self.device = "cpu"
+        if self.device == "cuda":
             logging.info(f"GPU: {torch.cuda.get_device_name(0)}")
         
-        self.pipeline = KPipeline(repo_id="hexgrad/Kokoro-82M", lang_code="a", device=device)
-        logging.info(f"TTS ready: {voice} on {device}")
+        # One acoustic model shared by a G2P front-end per language, built on first use
+        self.model = load_model(self.backend, self.device, TTS_CONFIG['repo_id'])
+        self.pipelines: Dict[str, object] = {}
+        self.pipeline_for(voice)
+        if self.profiler.enabled:
+            self._instrument_model()
+        logging.info(f"TTS ready: {voice} on {self.device} ({self.backend} backend)")
 
-    def _synthesize(self, text: str) -> Optional[np.ndarray]:
+    @property
+    def pipeline(self):
+        """Pipeline of the current voice's language"""
+        return self.pipeline_for(self.voice)
+
+    def pipeline_for(self, voice: str):
+        """G2P pipeline for the voice's language, sharing the loaded model"""
+        lang_code = lang_code_for(voice)
+        pipeline = self.pipelines.get(lang_code)
+        if pipeline is None:
+            from kokoro import KPipeline
+
+            pipeline = KPipeline(repo_id=TTS_CONFIG['repo_id'], lang_code=lang_code, model=self.model, device=self.device)
+            self.pipelines[lang_code] = pipeline
+            if self.profiler.enabled:
+                self._instrument_pipeline(pipeline)
+            logging.info(f"Loaded {LANG_CODES[lang_code]} G2P")
+        return pipeline
+
+    def _wrap(self, function, name: str):
+        # Re-instrumenting starts from the original, so a disabled profiler removes the timers
+        return self.profiler.wrap(getattr(function, '__wrapped__', function), name)
+
+    def _instrument_pipeline(self, pipeline):
+        """Split pipeline time into G2P and voice loading phases"""
+        if callable(getattr(pipeline, 'g2p', None)):
+            pipeline.g2p = self._wrap(pipeline.g2p, "g2p")
+        if callable(getattr(pipeline, 'load_voice', None)):
+            pipeline.load_voice = self._wrap(pipeline.load_voice, "voice_load")
+
+    def _instrument_model(self):
+        for pipeline in self.pipelines.values():
+            self._instrument_pipeline(pipeline)
+        # nn.Module.__call__ looks up forward on the instance
+        self.model.forward = self._wrap(self.model.forward, "model")
+
+    def set_profiler(self, profiler: Optional[Profiler]):
+        """Time the following work with profiler (None disables profiling)"""
+        self.profiler = profiler or Profiler.disabled()
+        self._instrument_model()
+
+    # Voices and warmup ---------------------------------------
+
+    def load_voice(self, voice: str):
+        """Load a voice pack once and keep it in memory"""
+        pack = self.voice_packs.get(voice)
+        if pack is None:
+            started = time.perf_counter()
+            load = getattr(self.pipeline_for(voice), 'load_voice', None)
+            # KPipeline caches packs by name, so later calls with the name reuse this tensor
+            pack = load(voice) if callable(load) else voice
+            TTS_VOICE_LOAD_SECONDS.observe(time.perf_counter() - started)
+            self.voice_packs[voice] = pack
+        return pack
+
+    def set_voice(self, voice: str):
+        """Switch voices; instant when the voice is preloaded"""
+        self.load_voice(voice)
+        self.voice = voice
+
+    def warmup(self, voices: Optional[List[str]] = None, texts: Optional[List[str]] = None) -> Dict:
+        """
+        Preload voice packs and synthesize the warmup corpus.
+
+        The first call pays lazy initialisation (graph setup, allocator
+        growth), so its latency is reported as cold and the median of the
+        remaining calls as warm.
+        """
+        voices = TTS_CONFIG['preload_voices'] if voices is None else voices
+        texts = TTS_CONFIG['warmup_texts'] if texts is None else texts
+        voices = list(dict.fromkeys([self.voice, *voices]))
+        started = time.perf_counter()
+
+        voice_load_ms = {}
+        for voice in voices:
+            load_started = time.perf_counter()
+            self.load_voice(voice)
+            voice_load_ms[voice] = round((time.perf_counter() - load_started) * 1000, 1)
+
+        latencies = []
+        with self.profiler.phase("warmup"):
+            for text in texts:
+                call_started = time.perf_counter()
+                if self._synthesize(text) is None:
+                    raise RuntimeError("Warmup synthesis failed")
+                latencies.append(time.perf_counter() - call_started)
+
+        self.warmup_report = {
+            'voices': voices,
+            'voice_load_ms': voice_load_ms,
+            'cold_ms': round(latencies[0] * 1000, 1) if latencies else None,
+            'warm_ms': round(statistics.median(latencies[1:]) * 1000, 1) if len(latencies) > 1 else None,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+        logging.info(f"Warmup: {len(voices)} voice(s) loaded, cold {self.warmup_report['cold_ms']} ms, "
+                     f"warm {self.warmup_report['warm_ms']} ms")
+        return self.warmup_report
+
+    # Synthesis ------------------------------------------------
+
+    def stream(self, text: str) -> Iterator[Tuple[object, float]]:
+        """
+        Yield (audio, seconds) for every sub-segment the pipeline produces.
+
+        Kokoro splits text that exceeds its token window into several
+        segments; each is yielded as the model returns it, still as the
+        pipeline's tensor, with the time the model took for it.
+        """
+        self.load_voice(self.voice)
+        results = iter(self.pipeline(text, voice=self.voice))
+        while True:
+            started = time.perf_counter()
+            with self.profiler.phase("synthesize"):
+                result = next(results, None)
+            if result is None:
+                return
+            audio = result[2]
+            if audio is None:
+                continue
+            elapsed = time.perf_counter() - started  # Excludes the consumer's time between segments
+            TTS_SEGMENT_SECONDS.observe(elapsed)
+            yield audio, elapsed
+
+    def _synthesize_into(self, buffer: "AudioBuffer", text: str) -> int:
+        """Append all of text's audio to buffer; returns the segment count, 0 on failure"""
+        mark = buffer.length
+        segments = 0
         try:
-            audio_chunks = []
-            for _, _, audio in self.pipeline(text, voice=self.voice):
-                if isinstance(audio, torch.Tensor):
-                    audio = audio.cpu().numpy()
-                audio_chunks.append(audio)
-            return audio_chunks[0] if audio_chunks else None
+            for audio, elapsed in self.stream(text):
+                with self.profiler.phase("copy"):
+                    buffer.write(audio)
+                segments += 1
+                logging.debug(f"    Segment {segments}: {audio.shape[-1] / buffer.sample_rate:.2f}s audio in {elapsed:.2f}s")
         except Exception as e:
             logging.error(f"Synthesis failed: {e}")
-            return None
+            segments = 0
+        if not segments:
+            buffer.truncate(mark)  # Drop a partly written chunk
+            return 0
+        self.warmed = True
+        return segments
+
+    def _synthesize(self, text: str) -> Optional["np.ndarray"]:
+        """All audio for text, every sub-segment included"""
+        buffer = AudioBuffer.for_text(text, TTS_CONFIG['sample_rate'])
+        return buffer.audio() if self._synthesize_into(buffer, text) else None
 
     def process_chapter(self, json_path: str, output_dir: str) -> Dict:
         try:
@@ -60,34 +304,63 @@ class AudioBookGenerator:
                 logging.info(f"Skipping {chapter_id} (exists)")
                 return {'chapter_id': chapter_id, 'success': len(chunks), 'failed': 0}
             
-            logging.info(f"Processing {chapter_id}: {len(chunks)} chunks")
-            
-            segments, success, failed = [], 0, 0
+            return self.synthesize_chapter(chapter_id, chunks, output_file)
+        except Exception as e:
+            logging.error(f"Failed: {e}")
+            return {'error': str(e)}
+
+    def synthesize_chapter(self, chapter_id: str, chunks: List[str], output_file: str) -> Dict:
+        """Synthesize a chapter's chunks into one WAV file"""
+        novel_name = os.path.basename(os.path.dirname(os.path.abspath(output_file)))
+        with self.profiler.chapter(f"{novel_name}/{chapter_id}"):
+            return self._synthesize_chapter(chapter_id, chunks, output_file)
+
+    def _synthesize_chapter(self, chapter_id: str, chunks: List[str], output_file: str) -> Dict:
+        import soundfile as sf
+
+        logging.info(f"Processing {chapter_id}: {len(chunks)} chunks")
+        
+        sample_rate = TTS_CONFIG['sample_rate']
+        gap = int(sample_rate * TTS_CONFIG['silence_duration'])
+        # Sub-segments are copied straight into one zeroed buffer; the silence between chunks is skipped over
+        buffer = AudioBuffer.for_text(chunks, sample_rate, gap)
+        success, failed, segments = 0, 0, 0
+        synthesis_seconds = 0.0
+        # The first chunk is cold when the model or the voice has not been used yet
+        first_state = 'warm' if self.warmed and self.voice in self.voice_packs else 'cold'
+        with self.profiler.model_trace(chapter_id):
             for idx, text in enumerate(chunks, 1):
-                logging.info(f"  Chunk {idx}/{len(chunks)}")
-                audio = self._synthesize(text)
-                if audio is not None:
-                    segments.append(audio)
+                logging.debug(f"  Chunk {idx}/{len(chunks)}")
+                mark = buffer.length
+                if success:
+                    buffer.skip(gap)
+                started = time.perf_counter()
+                written = self._synthesize_into(buffer, text)
+                elapsed = time.perf_counter() - started
+                TTS_CHUNK_SECONDS.observe(elapsed)
+                if idx == 1:
+                    TTS_FIRST_CHUNK_SECONDS.observe(elapsed, state=first_state)
+                synthesis_seconds += elapsed
+                if written:
+                    segments += written
                     success += 1
                 else:
+                    buffer.truncate(mark)
                     failed += 1
-            
-            if segments:
-                silence = np.zeros(int(24000 * 0.3), dtype=np.float32)
-                combined = []
-                for i, seg in enumerate(segments):
-                    combined.append(seg)
-                    if i < len(segments) - 1:
-                        combined.append(silence)
-                
-                final_audio = np.concatenate(combined)
-                sf.write(output_file, final_audio, 24000)
-                logging.info(f"✓ {chapter_id}.wav ({len(final_audio)/24000:.1f}s)")
-            
-            return {'chapter_id': chapter_id, 'success': success, 'failed': failed}
-        except Exception as e:
-            logging.error(f"Failed: {e}")
-            return {'error': str(e)}
+        
+        if success:
+            with self.profiler.phase("write"):
+                sf.write(output_file, buffer.audio(), sample_rate)
+
+            audio_seconds = buffer.length / sample_rate
+            rtf = synthesis_seconds / audio_seconds if audio_seconds else 0.0
+            TTS_AUDIO_SECONDS.inc(audio_seconds)
+            TTS_SYNTHESIS_SECONDS.inc(synthesis_seconds)
+            TTS_REAL_TIME_FACTOR.set(rtf)
+            logging.info(f"✓ {chapter_id}.wav ({audio_seconds:.1f}s, {segments} segments, "
+                         f"synthesized in {synthesis_seconds:.1f}s, RTF {rtf:.2f})")
+        
+        return {'chapter_id': chapter_id, 'success': success, 'failed': failed, 'segments': segments}
 
     def process_novel(self, input_path: str, novel_name: Optional[str] = None) -> Dict:
         if not os.path.exists(input_path):
@@ -143,6 +416,40 @@ class AudioBookGenerator:
         
         return stats
 
+    def process_batch(self, items: List[Dict]) -> Dict:
+        """
+        Process chapter files or novel folders that each name their own voice.
+
+        items: [{'path': ..., 'voice': ..., 'name': optional novel name}]. Voices
+        of any language can be mixed; every language shares the loaded model.
+        """
+        default_voice = self.voice
+        stats = {'items': len(items), 'processed': 0, 'success': 0, 'failed': 0, 'errors': []}
+        try:
+            for item in items:
+                path, name = item['path'], item.get('name')
+                try:
+                    self.set_voice(item.get('voice') or default_voice)
+                except ValueError as e:
+                    stats['errors'].append(f"{path}: {e}")
+                    continue
+                if os.path.isdir(path):
+                    result = self.process_novel(path, name)
+                else:
+                    output_path = os.path.join(self.output_dir, name or "SingleChapter")
+                    os.makedirs(output_path, exist_ok=True)
+                    result = self.process_chapter(path, output_path)
+                    result['processed'] = 0 if 'error' in result else 1
+                if 'error' in result:
+                    stats['errors'].append(f"{path}: {result['error']}")
+                    continue
+                stats['processed'] += result.get('processed', 0)
+                stats['success'] += result.get('success', 0)
+                stats['failed'] += result.get('failed', 0)
+        finally:
+            self.voice = default_voice
+        return stats
+
 
 def select_voice() -> str:
     print("\n" + "=" * 70)
@@ -171,7 +478,121 @@ def select_voice() -> str:
         print("Invalid choice")
 
 
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate audiobook chapters with Kokoro TTS",
+        epilog="Without a command the interactive menu is shown."
+    )
+    parser.add_argument("--voice", default="af_heart", help="Kokoro voice (default: af_heart)")
+    parser.add_argument("--cpu", action="store_true", help="Run on the CPU even if a GPU is available")
+    parser.add_argument("--backend", choices=BACKENDS, help="Inference backend (default: TTS_CONFIG['backend'])")
+    parser.add_argument("--output-dir", default="audio", help="Folder for generated audio (default: audio)")
+    parser.add_argument("--list-voices", action="store_true", help="Print the available voices and exit")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Preload TTS_CONFIG['preload_voices'] and run the warmup corpus before the first chapter")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile the run and write the report to DIR (default: logs/profiles/tts-<time>)")
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    chapter = commands.add_parser("chapter", help="Synthesize one segment JSON file")
+    chapter.add_argument("json_file")
+    chapter.add_argument("--name", help="Novel folder name for the output (default: SingleChapter)")
+    novel = commands.add_parser("novel", help="Synthesize every chapter of a novel folder")
+    novel.add_argument("folder")
+    novel.add_argument("--name", help="Novel name (default: folder name)")
+    everything = commands.add_parser("all", help="Synthesize every novel under the segment output folder")
+    everything.add_argument("--input", default="Segmentor/output", help="Segment folder (default: Segmentor/output)")
+    chapter_range = commands.add_parser("range", help="Synthesize chapters START to END of a novel folder")
+    chapter_range.add_argument("folder")
+    chapter_range.add_argument("start", type=int)
+    chapter_range.add_argument("end", type=int)
+    chapter_range.add_argument("--name", help="Novel name (default: folder name)")
+    batch = commands.add_parser("batch", help="Synthesize a JSON list of {path, voice, name} items with mixed voices")
+    batch.add_argument("manifest")
+    return parser
+
+
 def main():
+    args = build_parser().parse_args()
+
+    if args.list_voices:
+        for lang, voices in VOICES.items():
+            print(f"{lang}: {', '.join(voices)}")
+        return
+
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(output_dir=args.profile or profile_dir(run_name("tts")), label="audiobook generator")
+
+    try:
+        if args.command is None:
+            run_menu(profiler)
+        else:
+            run_command(args, profiler)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            print(profiler.format_report())
+            print(f"Profile written to {profiler.write()}")
+
+    metrics_file = dump_metrics()
+    if metrics_file:
+        print(f"Metrics written to {metrics_file}")
+
+
+def run_command(args, profiler: Optional[Profiler] = None):
+    """Run one non-interactive command from the parsed arguments"""
+    gen = AudioBookGenerator(voice=args.voice, output_dir=args.output_dir, use_gpu=not args.cpu, profiler=profiler,
+                             backend=args.backend)
+    if args.warmup:
+        gen.warmup()
+    if profiler is not None:
+        profiler.start()
+
+    stats = {}
+    if args.command == "chapter":
+        output_dir = os.path.join(gen.output_dir, args.name or "SingleChapter")
+        os.makedirs(output_dir, exist_ok=True)
+        stats = gen.process_chapter(args.json_file, output_dir)
+        if 'error' not in stats:
+            print(f"\n✓ Complete: {stats['success']} chunks")
+
+    elif args.command == "novel":
+        stats = gen.process_novel(args.folder, args.name)
+        if 'error' not in stats:
+            print(f"\n✓ {stats['novel']}: {stats['processed']} chapters, {stats['success']} chunks")
+
+    elif args.command == "all":
+        if not os.path.exists(args.input):
+            print(f"{args.input} not found")
+            return
+        folders = [os.path.join(args.input, d) for d in sorted(os.listdir(args.input))
+                   if os.path.isdir(os.path.join(args.input, d))]
+        for folder in folders:
+            stats = gen.process_novel(folder)
+            if 'error' not in stats:
+                print(f"✓ {stats['novel']}: {stats['success']} chunks")
+
+    elif args.command == "range":
+        stats = gen.process_range(args.folder, args.start, args.end, args.name)
+        if 'error' not in stats:
+            print(f"\n✓ Range {stats['range']}: {stats['processed']} chapters, {stats['success']} chunks")
+
+    elif args.command == "batch":
+        with open(args.manifest, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        stats = gen.process_batch(items)
+        print(f"\n✓ Batch: {stats['processed']} chapters, {stats['success']} chunks")
+        for error in stats['errors']:
+            print(f"  ✗ {error}")
+
+    if 'error' in stats:
+        print(f"Error: {stats['error']}")
+
+
+def run_menu(profiler: Optional[Profiler] = None):
     print("\n" + "=" * 70)
     print("AUDIOBOOK GENERATOR".center(70))
     print("=" * 70)
@@ -181,7 +602,9 @@ def main():
     voice = select_voice()
     use_gpu = input("\nUse GPU? (Y/n): ").strip().lower() != 'n'
     
-    gen = AudioBookGenerator(voice=voice, use_gpu=use_gpu)
+    gen = AudioBookGenerator(voice=voice, use_gpu=use_gpu, profiler=profiler)
+    if profiler is not None:
+        profiler.start()
     
     if choice == "1":
         path = input("JSON file: ").strip()
@@ -0,0 +1,378 @@
+"""
+Metrics for NovelLabs
+One registry of counters, gauges and histograms shared by the API, the
+scraper, the segmenter and the TTS generator. The API renders it in the
+Prometheus text format at /metrics; the CLIs dump it to
+METRICS_CONFIG['dump_file'] when that is set.
+"""
+
+import json
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .config import METRICS_CONFIG
+except ImportError:
+    from config import METRICS_CONFIG
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    text = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + text + '}' if text else ''
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """(suffix, labels, value) for every sample"""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [('_total', dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Metric):
+    """A value that goes up and down, or is read from a callback at collection time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (unlabelled) value from function whenever metrics are collected"""
+        self._function = function
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            try:
+                value = self._function()
+            except Exception:
+                return []
+            return [] if value is None else [('', {}, value)]
+        with self._lock:
+            items = list(self._values.items())
+        return [('', dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self, **labels) -> Dict[str, float]:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return {'count': 0, 'sum': 0.0}
+            return {'count': state[2], 'sum': state[1]}
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        samples = []
+        for key, (counts, total, count) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', {**labels, 'le': _format_value(bound)}, cumulative))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+
+class Registry:
+    """The set of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def metrics(self) -> List[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def clear(self):
+        """Reset every recorded value (callback gauges keep their callbacks)"""
+        for metric in self.metrics():
+            metric.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{metric.name}{suffix}{_format_labels(labels.items())} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Recorded samples as plain data, for JSON dumps"""
+        snapshot = {}
+        for metric in self.metrics():
+            samples = metric.samples()
+            if samples:
+                snapshot[metric.name] = {
+                    'type': metric.kind,
+                    'help': metric.documentation,
+                    'samples': [
+                        {'name': metric.name + suffix, 'labels': labels, 'value': value}
+                        for suffix, labels, value in samples
+                    ]
+                }
+        return snapshot
+
+    def dump(self, path: str):
+        """Write the metrics to path: JSON for a .json file, Prometheus text otherwise"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if str(path).endswith('.json'):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.render())
+
+
+REGISTRY = Registry()
+
+
+def dump_metrics(path: Optional[str] = None) -> Optional[str]:
+    """Dump the registry for a CLI run when a dump file is configured; returns the path"""
+    path = path or METRICS_CONFIG['dump_file']
+    if not path:
+        return None
+    REGISTRY.dump(path)
+    return path
+
+
+# API ----------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'novellabs_http_request_duration_seconds', 'API request latency by route template',
+    ('method', 'route', 'status')
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    'novellabs_db_query_duration_seconds', 'SQLite statement execution time by statement type',
+    ('operation',), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge('novellabs_scrape_jobs_queued', 'Scrape jobs waiting for a worker')
+TTS_JOB_QUEUE_DEPTH = REGISTRY.gauge('novellabs_tts_jobs_queued', 'Audio jobs waiting for the TTS model')
+IO_QUEUE_DEPTH = REGISTRY.gauge('novellabs_io_pool_queued', 'Calls waiting for an API I/O pool thread')
+CONTENT_CACHE_HIT_RATIO = REGISTRY.gauge('novellabs_content_cache_hit_ratio', 'Chapter content cache hit ratio')
+CONTENT_CACHE_BYTES = REGISTRY.gauge('novellabs_content_cache_bytes', 'Memory held by the chapter content cache')
+
+# Scraper ------------------------------------------------------
+
+SCRAPER_PAGE_LOAD_SECONDS = REGISTRY.histogram(
+    'novellabs_scraper_page_load_seconds', 'Time until a chapter page shows its content',
+    buckets=(0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0)
+)
+SCRAPER_EXTRACT_SECONDS = REGISTRY.histogram(
+    'novellabs_scraper_extract_seconds', 'Chapter HTML extraction time',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+SCRAPER_CHAPTERS = REGISTRY.counter('novellabs_scraper_chapters', 'Chapters handled by the scraper', ('result',))
+
+# Segmenter ----------------------------------------------------
+
+SEGMENTER_CHUNKS = REGISTRY.counter('novellabs_segmenter_chunks', 'TTS chunks produced by the segmenter')
+SEGMENTER_SECONDS = REGISTRY.counter('novellabs_segmenter_seconds', 'Time spent segmenting chapters')
+SEGMENTER_CHUNKS_PER_SECOND = REGISTRY.gauge(
+    'novellabs_segmenter_chunks_per_second', 'Segmenter throughput of the last novel'
+)
+
+# TTS ----------------------------------------------------------
+
+TTS_CHUNK_SECONDS = REGISTRY.histogram(
+    'novellabs_tts_chunk_seconds', 'Synthesis latency per text chunk',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+)
+TTS_SEGMENT_SECONDS = REGISTRY.histogram(
+    'novellabs_tts_segment_seconds', 'Model latency per sub-segment Kokoro splits a chunk into',
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+TTS_FIRST_CHUNK_SECONDS = REGISTRY.histogram(
+    'novellabs_tts_first_chunk_seconds', 'Latency of a chapter\'s first chunk; cold when the voice had not been used yet',
+    ('state',), buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+)
+TTS_VOICE_LOAD_SECONDS = REGISTRY.histogram(
+    'novellabs_tts_voice_load_seconds', 'Time to load a voice pack into memory',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+)
+TTS_AUDIO_SECONDS = REGISTRY.counter('novellabs_tts_audio_seconds', 'Seconds of audio synthesized')
+TTS_SYNTHESIS_SECONDS = REGISTRY.counter('novellabs_tts_synthesis_seconds', 'Time spent synthesizing audio')
+TTS_REAL_TIME_FACTOR = REGISTRY.gauge(
+    'novellabs_tts_real_time_factor', 'Synthesis time / audio duration of the last chapter (below 1 is faster than real time)'
+)
+
+
+def route_template(scope) -> str:
+    """Full path template of the route that handled a request, e.g. /api/chapters/novel/{slug}
+
+    Routes inside included routers only know their path relative to the
+    router, so the router prefix is recovered from the request path: the
+    shortest tail of the path the route matches is what the route consumed.
+    """
+    route = scope.get('route')
+    template = getattr(route, 'path', None)
+    if template is None:
+        return 'unmatched'
+    path = scope.get('path', '')
+    regex = getattr(route, 'path_regex', None)
+    if regex is None:
+        return template or 'unmatched'
+    cut = len(path)
+    while cut >= 0:
+        if regex.match(path[cut:]):
+            return path[:cut] + template
+        cut = path.rfind('/', 0, cut)
+    return template or 'unmatched'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency by route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Templates keep the label set bounded; unmatched paths share one label
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=scope['method'], route=route_template(scope), status=status
+            )
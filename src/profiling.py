@@ -0,0 +1,300 @@
+"""
+Profiling for NovelLabs TTS and segmentation runs
+Opt-in per-phase wall/CPU timers grouped by chapter, a whole-run sampling
+profiler (pyinstrument when installed, cProfile otherwise) and torch
+profiler traces of the model stage. The report ranks each chapter's phases
+by self time, so the hot spot (G2P, model forward, tensor copies, spaCy,
+disk writes) is the first row.
+
+A disabled Profiler costs one method call per phase, so instrumented code
+always goes through one:
+
+    profiler = Profiler(output_dir="logs/profiles/run")
+    profiler.start()
+    with profiler.chapter("Chapter_0001"):
+        with profiler.phase("synthesize"):
+            ...
+    profiler.stop()
+    print(profiler.format_report())
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    from .config import PROFILING_CONFIG
+except ImportError:
+    from config import PROFILING_CONFIG
+
+try:
+    import pyinstrument
+except ImportError:  # Falls back to cProfile
+    pyinstrument = None
+
+RUN_SCOPE = '_run'  # Phases timed outside any chapter
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Collects phase timings per chapter plus optional sampler and torch traces"""
+
+    def __init__(self, output_dir: Optional[str] = None, enabled: bool = True,
+                 sampler: str = PROFILING_CONFIG['sampler'],
+                 torch_trace_chapters: int = PROFILING_CONFIG['torch_trace_chapters'],
+                 label: str = 'run'):
+        self.enabled = enabled
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.sampler_name = sampler
+        self.torch_trace_chapters = torch_trace_chapters
+        self.label = label
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._chapters: List[str] = []
+        self._sampler = None
+        self._sampler_kind = None
+        self._started = None
+        self._wall = 0.0
+        self.artifacts: Dict[str, List[str]] = {'sampler': [], 'torch_traces': []}
+
+    @classmethod
+    def disabled(cls) -> "Profiler":
+        """A profiler that records nothing; the default for unprofiled runs, at no cost"""
+        return cls(enabled=False)
+
+    # Run ------------------------------------------------------
+
+    def start(self):
+        """Start the run clock and the sampling profiler"""
+        if not self.enabled:
+            return
+        self._started = time.perf_counter()
+        kind = self.sampler_name
+        if kind == 'auto':
+            kind = 'pyinstrument' if pyinstrument is not None else 'cprofile'
+        if kind == 'pyinstrument' and pyinstrument is not None:
+            self._sampler = pyinstrument.Profiler(interval=PROFILING_CONFIG['sampler_interval'])
+            self._sampler.start()
+        elif kind == 'cprofile':
+            self._sampler = cProfile.Profile()
+            try:
+                self._sampler.enable()
+            except ValueError:  # Another profiler is already active
+                self._sampler, kind = None, None
+        else:
+            kind = None
+        self._sampler_kind = kind
+
+    def stop(self):
+        """Stop the sampler and write its report next to the summary"""
+        if not self.enabled or self._started is None:
+            return
+        self._wall = time.perf_counter() - self._started
+        self._started = None
+        if self._sampler is None:
+            return
+
+        sampler, self._sampler = self._sampler, None
+        if self._sampler_kind == 'pyinstrument':
+            sampler.stop()
+            if self.output_dir:
+                self._write_artifact('sampler', 'sampler.html', sampler.output_html())
+                self._write_artifact('sampler', 'sampler.txt', sampler.output_text(unicode=True))
+        else:
+            sampler.disable()
+            if self.output_dir:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                sampler.dump_stats(str(self.output_dir / 'profile.pstats'))
+                self.artifacts['sampler'].append(str(self.output_dir / 'profile.pstats'))
+                text = io.StringIO()
+                pstats.Stats(sampler, stream=text).sort_stats('cumulative').print_stats(40)
+                self._write_artifact('sampler', 'profile.txt', text.getvalue())
+
+    # Scopes ---------------------------------------------------
+
+    def chapter(self, chapter_id: str):
+        """Group phases timed inside the block under chapter_id (per thread)"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._chapter_scope(str(chapter_id))
+
+    @contextmanager
+    def _chapter_scope(self, chapter_id: str):
+        previous = getattr(self._local, 'chapter', None)
+        self._local.chapter = chapter_id
+        with self._lock:
+            if chapter_id not in self._stats:
+                self._stats[chapter_id] = {}
+                self._chapters.append(chapter_id)
+        try:
+            yield
+        finally:
+            self._local.chapter = previous
+
+    def phase(self, name: str):
+        """Time the block as phase name of the current chapter"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name: str):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        # [name, wall start, cpu start, child wall, child cpu]
+        frame = [name, time.perf_counter(), time.process_time(), 0.0, 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            wall = time.perf_counter() - frame[1]
+            cpu = time.process_time() - frame[2]
+            if stack:
+                stack[-1][3] += wall
+                stack[-1][4] += cpu
+            self._record(name, wall, cpu, wall - frame[3], cpu - frame[4])
+
+    def wrap(self, function: Callable, name: str) -> Callable:
+        """function timed as phase name on every call"""
+        if not self.enabled:
+            return function
+
+        def timed(*args, **kwargs):
+            with self._phase(name):
+                return function(*args, **kwargs)
+
+        timed.__wrapped__ = function
+        return timed
+
+    def model_trace(self, chapter_id: str):
+        """torch profiler trace of the block for the first torch_trace_chapters chapters"""
+        if not self.enabled or not self.output_dir or len(self.artifacts['torch_traces']) >= self.torch_trace_chapters:
+            return _NULL_CONTEXT
+        try:
+            import torch
+        except ImportError:
+            return _NULL_CONTEXT
+        return self._torch_trace(torch, str(chapter_id))
+
+    @contextmanager
+    def _torch_trace(self, torch, chapter_id: str):
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        with torch.profiler.profile(activities=activities) as trace:
+            yield
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / f'torch_trace_{chapter_id}.json'
+        trace.export_chrome_trace(str(path))
+        self.artifacts['torch_traces'].append(str(path))
+
+    # Report ---------------------------------------------------
+
+    def _record(self, name: str, wall: float, cpu: float, self_wall: float, self_cpu: float):
+        chapter = getattr(self._local, 'chapter', None) or RUN_SCOPE
+        with self._lock:
+            phases = self._stats.get(chapter)
+            if phases is None:
+                phases = self._stats[chapter] = {}
+                self._chapters.append(chapter)
+            stat = phases.get(name)
+            if stat is None:
+                stat = phases[name] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0, 'self_wall': 0.0, 'self_cpu': 0.0}
+            stat['calls'] += 1
+            stat['wall'] += wall
+            stat['cpu'] += cpu
+            stat['self_wall'] += self_wall
+            stat['self_cpu'] += self_cpu
+
+    @staticmethod
+    def _ranked(phases: Dict[str, Dict[str, float]]) -> List[Dict]:
+        total = sum(stat['self_wall'] for stat in phases.values()) or 1.0
+        rows = [
+            {'phase': name, **{key: round(value, 6) for key, value in stat.items()},
+             'share': round(stat['self_wall'] / total, 4)}
+            for name, stat in phases.items()
+        ]
+        return sorted(rows, key=lambda row: row['self_wall'], reverse=True)
+
+    def report(self) -> Dict:
+        """Phases ranked by self wall time per chapter and for the whole run"""
+        with self._lock:
+            stats = {chapter: {name: dict(stat) for name, stat in phases.items()}
+                     for chapter, phases in self._stats.items()}
+            chapters = list(self._chapters)
+
+        totals: Dict[str, Dict[str, float]] = {}
+        for phases in stats.values():
+            for name, stat in phases.items():
+                total = totals.setdefault(name, dict.fromkeys(stat, 0))
+                for key, value in stat.items():
+                    total[key] += value
+
+        return {
+            'label': self.label,
+            'wall_seconds': round(self._wall, 6),
+            'sampler': self._sampler_kind,
+            'chapters': {
+                chapter: {
+                    'wall': round(sum(stat['self_wall'] for stat in stats[chapter].values()), 6),
+                    'phases': self._ranked(stats[chapter])
+                }
+                for chapter in chapters
+            },
+            'totals': self._ranked(totals),
+            'artifacts': {key: list(paths) for key, paths in self.artifacts.items()}
+        }
+
+    def format_report(self, top: int = PROFILING_CONFIG['top_phases']) -> str:
+        """Plain text ranking of the top phases per chapter and overall"""
+        report = self.report()
+        lines = [f"Profile: {report['label']} ({report['wall_seconds']:.2f}s wall, sampler: {report['sampler']})"]
+
+        def rows(ranked):
+            for row in ranked[:top]:
+                lines.append(f"    {row['phase']:<16} {row['self_wall']:>9.3f}s self  {row['cpu']:>9.3f}s cpu  "
+                             f"{row['calls']:>6} calls  {row['share']:>6.1%}")
+
+        for chapter, data in report['chapters'].items():
+            lines.append(f"  {chapter} ({data['wall']:.2f}s)")
+            rows(data['phases'])
+        lines.append("  All chapters")
+        rows(report['totals'])
+        for kind, paths in report['artifacts'].items():
+            for path in paths:
+                lines.append(f"  {kind}: {path}")
+        return '\n'.join(lines)
+
+    def write(self) -> Optional[str]:
+        """Write summary.json to output_dir; returns its path"""
+        if not self.enabled or not self.output_dir:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / 'summary.json'
+        path.write_text(json.dumps(self.report(), indent=2), encoding='utf-8')
+        return str(path)
+
+    def _write_artifact(self, kind: str, name: str, text: str):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self.output_dir / name
+        path.write_text(text, encoding='utf-8')
+        self.artifacts[kind].append(str(path))
+
+
+def profile_dir(name: str) -> Path:
+    """Directory for one profiled run under PROFILING_CONFIG['output_dir']"""
+    return Path(PROFILING_CONFIG['output_dir']) / name
+
+
+def run_name(prefix: str) -> str:
+    return f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}"
@@ -1,19 +1,102 @@
+import bisect
 import os
 import re
 import time
-from typing import Tuple, List
+from typing import TYPE_CHECKING, Tuple, List, Iterable, Iterator, Optional, Set
 
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+try:
+    from .archive import RawPageStore
+    from .browser import DriverManager, SETTLE_DELAY
+    from .extractor import extract_chapter, write_chapter_file
+    from .metrics import SCRAPER_CHAPTERS, SCRAPER_EXTRACT_SECONDS, dump_metrics
+except ImportError:
+    from archive import RawPageStore
+    from browser import DriverManager, SETTLE_DELAY
+    from extractor import extract_chapter, write_chapter_file
+    from metrics import SCRAPER_CHAPTERS, SCRAPER_EXTRACT_SECONDS, dump_metrics
+
+if TYPE_CHECKING:
+    import undetected_chromedriver as uc
+
+
+ChapterRanges = List[Tuple[int, int]]
+
+
+def compress_chapter_ranges(chapters: Iterable[int]) -> ChapterRanges:
+    """Collapse chapter numbers into sorted, inclusive (start, end) ranges"""
+    ranges = []
+    for number in sorted(set(chapters)):
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], number)
+        else:
+            ranges.append((number, number))
+    return ranges
+
+
+def merge_chapter_ranges(ranges: Iterable[Tuple[int, int]]) -> ChapterRanges:
+    """Sort inclusive ranges and merge the ones that overlap or touch"""
+    merged = []
+    for start, end in sorted((int(s), int(e)) for s, e in ranges):
+        if start > end:
+            raise ValueError(f"Invalid chapter range: {start}-{end}")
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def iter_chapter_numbers(ranges: ChapterRanges) -> Iterator[int]:
+    """Yield every chapter number covered by the ranges"""
+    for start, end in ranges:
+        yield from range(start, end + 1)
+
+
+def format_chapter_ranges(ranges: ChapterRanges) -> str:
+    """Render ranges as e.g. '1-3, 7, 10-12'"""
+    return ", ".join(f"{start}-{end}" if start != end else str(start) for start, end in ranges)
+
+
+def count_chapters(ranges: ChapterRanges) -> int:
+    """Number of chapters covered by the ranges"""
+    return sum(end - start + 1 for start, end in ranges)
+
+
+def contains_chapter(ranges: ChapterRanges, number: int) -> bool:
+    """Check whether a chapter number falls inside sorted, merged ranges"""
+    idx = bisect.bisect_right(ranges, (number, float("inf"))) - 1
+    return idx >= 0 and ranges[idx][0] <= number <= ranges[idx][1]
+
+
+def saved_chapter_numbers(save_dir: str) -> Set[int]:
+    """Get the numbers of the Chapter_XXXX.txt files in a folder with one listing"""
+    if not os.path.isdir(save_dir):
+        return set()
+    numbers = set()
+    for name in os.listdir(save_dir):
+        match = re.fullmatch(r'Chapter_(\d+)\.txt', name)
+        if match:
+            numbers.add(int(match.group(1)))
+    return numbers
 
 
 class NovelScraper:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, raw_dir: Optional[str] = None, raw_compression: str = "zstd"):
         self.headless = headless
+        # When set, every fetched chapter page is archived under raw_dir/<novel>
+        self.raw_dir = raw_dir
+        self.raw_compression = raw_compression
+
+    def open_raw_store(self, novel_name: str) -> Optional[RawPageStore]:
+        """Get the raw page archive for a novel, or None when archiving is off"""
+        if not self.raw_dir:
+            return None
+        return RawPageStore(os.path.join(self.raw_dir, novel_name), self.raw_compression)
+
+    def start_driver(self) -> "uc.Chrome":
+        # Selenium and undetected_chromedriver load only when a browser is needed
+        import undetected_chromedriver as uc
 
-    def start_driver(self) -> uc.Chrome:
         options = uc.ChromeOptions()
         
         if self.headless:
@@ -29,18 +112,14 @@ class NovelScraper:
         # Use version_main to match Chrome browser version (143)
         return uc.Chrome(options=options, version_main=143)
 
-    def generate_chapter_urls(self, toc_url: str, start: int, end: int) -> Tuple[List[str], str]:
+    def parse_toc_url(self, toc_url: str) -> Tuple[str, str]:
+        """Split a novelhi URL into its base URL and novel name"""
         # Handle multiple URL formats:
         # - https://novelhi.com/s/index/Novel-Name
         # - https://novelhi.com/s/Novel-Name
         # - https://novelhi.com/s/Novel-Name/123 (chapter URL)
         
-        novel_name = toc_url.rstrip("/").split("/")[-1]
-        
-        # Remove chapter number if present (numeric ending)
-        if novel_name.isdigit():
-            parts = toc_url.rstrip("/").split("/")
-            novel_name = parts[-2] if len(parts) >= 2 else novel_name
+        novel_name = self.get_novel_name(toc_url)
         
         # Extract base URL
         if "/s/index/" in toc_url:
@@ -50,6 +129,22 @@ class NovelScraper:
         else:
             raise ValueError("Invalid URL format. Expected novelhi.com URL with /s/ path")
         
+        return base_url, novel_name
+
+    def get_chapter_url(self, toc_url: str, chapter_number: int) -> str:
+        """Build the URL of a single chapter"""
+        base_url, novel_name = self.parse_toc_url(toc_url)
+        return f"{base_url}/s/{novel_name}/{chapter_number}"
+
+    def iter_chapter_urls(self, toc_url: str, ranges: ChapterRanges) -> Iterator[Tuple[int, str]]:
+        """Lazily yield (chapter_number, url) for every chapter in the ranges"""
+        base_url, novel_name = self.parse_toc_url(toc_url)
+        for num in iter_chapter_numbers(ranges):
+            yield num, f"{base_url}/s/{novel_name}/{num}"
+
+    def generate_chapter_urls(self, toc_url: str, start: int, end: int) -> Tuple[List[str], str]:
+        base_url, novel_name = self.parse_toc_url(toc_url)
+        
         chapter_urls = [f"{base_url}/s/{novel_name}/{num}" for num in range(start, end + 1)]
         
         print(f"[INFO] Generated {len(chapter_urls)} chapter URLs")
@@ -65,8 +160,12 @@ class NovelScraper:
             novel_name = parts[-2] if len(parts) >= 2 else novel_name
         return novel_name
 
-    def get_total_chapters(self, driver: uc.Chrome, toc_url: str) -> int:
+    def get_total_chapters(self, driver: "uc.Chrome", toc_url: str) -> int:
         """Scrape the TOC page to find total chapter count"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         novel_name = self.get_novel_name(toc_url)
         
         # Build TOC URL - use index page format
@@ -146,7 +245,12 @@ class NovelScraper:
             print(f"[ERROR] Could not detect chapter count: {e}")
             raise ValueError(f"Could not detect total chapters: {e}")
 
-    def scrape_chapter(self, driver: uc.Chrome, url: str) -> Tuple[str, str]:
+    def load_page(self, driver: "uc.Chrome", url: str):
+        """Navigate to a chapter page and wait for the content container"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         driver.get(url)
 
         try:
@@ -156,76 +260,76 @@ class NovelScraper:
         except:
             raise ValueError("Content container not found - page may not have loaded")
 
-        time.sleep(2)
-
-        title = "Untitled Chapter"
-        for tag in ["h1", "h2"]:
-            try:
-                title_elem = driver.find_element(By.TAG_NAME, tag)
-                title = title_elem.text.strip()
-                break
-            except:
-                continue
-
-        try:
-            show_reading_div = driver.find_element(By.ID, "showReading")
-            paragraphs = show_reading_div.find_elements(By.TAG_NAME, "p")
-            
-            if paragraphs:
-                content = "\n\n".join(p.text.strip() for p in paragraphs if p.text.strip())
-            else:
-                content = show_reading_div.text.strip()
-            
-        except Exception as e:
-            raise ValueError(f"Could not extract content: {e}")
-
-        if len(content) < 100:
-            raise ValueError(f"Content too short ({len(content)} characters)")
-
-        return title, content
-
-    def scrape_range(self, toc_url: str, start: int, end: int, output_dir: str = "data/output"):
-        driver = self.start_driver()
+    def fetch_page(self, driver: "uc.Chrome", url: str) -> str:
+        """Load a chapter page and return its source once the content is present"""
+        self.load_page(driver, url)
+        time.sleep(SETTLE_DELAY)
+        return driver.page_source
+
+    def parse_chapter(self, html: str, url: str, raw_store: Optional[RawPageStore] = None,
+                      chapter_number: Optional[int] = None) -> Tuple[str, str]:
+        """Archive a fetched page if requested and extract its title and content"""
+        # Archive before extracting so failed extractions can be redone offline
+        if raw_store is not None and chapter_number is not None:
+            raw_store.put(chapter_number, url, html)
+
+        with SCRAPER_EXTRACT_SECONDS.time():
+            return extract_chapter(html)
+
+    def scrape_chapter(self, driver: "uc.Chrome", url: str, raw_store: Optional[RawPageStore] = None,
+                       chapter_number: Optional[int] = None) -> Tuple[str, str]:
+        html = self.fetch_page(driver, url)
+        return self.parse_chapter(html, url, raw_store, chapter_number)
+
+    def driver_manager(self, max_pages: int = 200, max_rss_mb: float = 1500.0) -> DriverManager:
+        """Create a recycling browser session manager for a long scrape"""
+        return DriverManager(self, max_pages=max_pages, max_rss_mb=max_rss_mb)
+
+    def scrape_range(self, toc_url: str, start: int, end: int, output_dir: str = "data/output",
+                     chapters: Optional[Iterable[int]] = None):
+        """Scrape chapters start..end, or only the given chapter numbers"""
+        ranges = compress_chapter_ranges(chapters) if chapters is not None else [(start, end)]
+        browser = self.driver_manager()
 
         try:
-            chapter_urls, novel_name = self.generate_chapter_urls(toc_url, start, end)
-            novel_name = re.sub(r'[\\/*?<>:"|]', "", novel_name)
+            novel_name = re.sub(r'[\\/*?<>:"|]', "", self.get_novel_name(toc_url))
 
             save_dir = os.path.join(output_dir, novel_name)
             os.makedirs(save_dir, exist_ok=True)
+            raw_store = self.open_raw_store(novel_name)
 
             print(f"[INFO] Output directory: {save_dir}")
-            print(f"[INFO] Scraping chapters {start} to {end}\n")
+            print(f"[INFO] Scraping {count_chapters(ranges)} chapters ({format_chapter_ranges(ranges)})\n")
 
             success_count = 0
             fail_count = 0
 
-            for idx, url in enumerate(chapter_urls, start=start):
+            for idx, url in self.iter_chapter_urls(toc_url, ranges):
                 filename = f"Chapter_{idx:04d}.txt"
                 filepath = os.path.join(save_dir, filename)
 
                 if os.path.exists(filepath):
                     print(f"[SKIP] Chapter {idx} (already exists)")
                     success_count += 1
+                    SCRAPER_CHAPTERS.inc(result="skipped")
                     continue
 
                 print(f"[PROCESSING] Chapter {idx}...", end=" ", flush=True)
 
                 try:
-                    title, content = self.scrape_chapter(driver, url)
-
-                    with open(filepath, "w", encoding="utf-8") as f:
-                        f.write(f"{title}\n")
-                        f.write("=" * 60 + "\n\n")
-                        f.write(content)
+                    html = browser.fetch_page(url)
+                    title, content = self.parse_chapter(html, url, raw_store, idx)
+                    write_chapter_file(filepath, title, content)
 
                     print(f"✓ {title[:50]}")
                     success_count += 1
+                    SCRAPER_CHAPTERS.inc(result="success")
 
                 except Exception as e:
                     print(f"✗ {str(e)[:80]}")
                     fail_count += 1
-                    
+                    SCRAPER_CHAPTERS.inc(result="failed")
+
                     error_file = os.path.join(save_dir, f"_error_chapter_{idx}.txt")
                     with open(error_file, "w", encoding="utf-8") as f:
                         f.write(f"Chapter {idx}\nURL: {url}\nError: {str(e)}\n")
@@ -237,21 +341,62 @@ class NovelScraper:
             print("=" * 60)
 
         finally:
-            driver.quit()
+            browser.close()
+            self.print_browser_metrics(browser.metrics())
+
+    def print_browser_metrics(self, metrics: dict):
+        """Print page-load latency and memory per browser session"""
+        print(f"[INFO] Browser sessions: {len(metrics['sessions'])} "
+              f"(restarts: {metrics['restarts']}, crashes: {metrics['crashes']})")
+        for session in metrics['sessions']:
+            loads = session['load_seconds']
+            if not loads['count']:
+                continue
+            peak = f"{session['peak_rss_mb']:.0f} MB" if session['peak_rss_mb'] else "n/a"
+            print(f"  #{session['session']}: {loads['count']} pages, "
+                  f"load p50 {loads['p50']:.2f}s / p95 {loads['p95']:.2f}s, "
+                  f"peak RSS {peak}, ended: {session['end_reason']}")
 
 
 def main():
     """Main entry point for the scraper application."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape novelhi chapters into data/output")
+    parser.add_argument("toc_url", nargs="?", help="Novel TOC URL; prompts for everything when omitted")
+    parser.add_argument("--start", type=int, default=1, help="First chapter (default: 1)")
+    parser.add_argument("--end", type=int, help="Last chapter (default: detected from the TOC page)")
+    parser.add_argument("--output-dir", default="data/output")
+    parser.add_argument("--raw", action="store_true", help="Archive raw pages for offline re-extraction")
+    parser.add_argument("--show-browser", action="store_true", help="Run Chrome with a visible window")
+    args = parser.parse_args()
+
     print("\n" + "=" * 60)
     print("        NOVEL SCRAPER - PRODUCTION VERSION")
     print("=" * 60 + "\n")
 
-    toc_url = input("Novel TOC URL (e.g., https://novelhi.com/s/index/Novel-Name): ").strip()
-    start = int(input("Start chapter: "))
-    end = int(input("End chapter: "))
+    if args.toc_url:
+        toc_url, start, end, keep_raw = args.toc_url, args.start, args.end, args.raw
+        headless = not args.show_browser
+    else:
+        toc_url = input("Novel TOC URL (e.g., https://novelhi.com/s/index/Novel-Name): ").strip()
+        start = int(input("Start chapter: "))
+        end = int(input("End chapter: "))
+        keep_raw = input("Archive raw pages for offline re-extraction? (y/N): ").strip().lower() == 'y'
+        headless = False
+
+    scraper = NovelScraper(headless=headless, raw_dir="data/raw" if keep_raw else None)
+    if end is None:
+        driver = scraper.start_driver()
+        try:
+            end = scraper.get_total_chapters(driver, toc_url)
+        finally:
+            driver.quit()
+    scraper.scrape_range(toc_url, start, end, output_dir=args.output_dir)
 
-    scraper = NovelScraper(headless=False)
-    scraper.scrape_range(toc_url, start, end)
+    metrics_file = dump_metrics()
+    if metrics_file:
+        print(f"[INFO] Metrics written to {metrics_file}")
 
 
 if __name__ == "__main__":
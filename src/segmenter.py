@@ -2,8 +2,15 @@ import os
 import json
 import re
 import logging
-from typing import List, Dict
-import spacy
+import time
+from typing import List, Dict, Optional, Tuple
+
+try:
+    from .metrics import SEGMENTER_CHUNKS, SEGMENTER_CHUNKS_PER_SECOND, SEGMENTER_SECONDS, dump_metrics
+    from .profiling import Profiler, profile_dir, run_name
+except ImportError:
+    from metrics import SEGMENTER_CHUNKS, SEGMENTER_CHUNKS_PER_SECOND, SEGMENTER_SECONDS, dump_metrics
+    from profiling import Profiler, profile_dir, run_name
 
 # =========================
 # CONFIGURATION
@@ -17,8 +24,11 @@ logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
 
 class SmartSegmenter:
-    def __init__(self):
+    def __init__(self, profiler: Optional[Profiler] = None):
+        self.profiler = profiler or Profiler.disabled()
+
         print("[*] Loading lightweight SpaCy sentencizer...")
+        import spacy  # Imported here so the CLI and API start without loading spaCy
         
         # We only need sentence boundaries → much faster than full model
         self.nlp = spacy.blank("en")
@@ -67,7 +77,8 @@ class SmartSegmenter:
         Returns:
             List of text chunks within MAX_CHARS limit.
         """
-        doc = self.nlp(text)
+        with self.profiler.phase("spacy"):
+            doc = self.nlp(text)
         sentences = [s.text.strip() for s in doc.sents if s.text.strip()]
 
         chunks = []
@@ -99,6 +110,31 @@ class SmartSegmenter:
 
     # --------------------------------------------------
 
+    def segment_chapter(self, raw_text: str) -> Tuple[str, List[str]]:
+        """
+        Split a scraped chapter file into its title and TTS chunks.
+        
+        Args:
+            raw_text: Chapter file contents (title, rule, blank line, body).
+            
+        Returns:
+            Tuple of (title, chunks).
+        """
+        # Title + body separation (scraper-aware)
+        parts = raw_text.split("\n\n", 1)
+        title = parts[0].strip()
+        body = parts[1] if len(parts) > 1 else ""
+
+        # Preserve paragraph boundaries
+        paragraphs = [p.strip() for p in body.split("\n") if p.strip()]
+
+        chunks = []
+        for para in paragraphs:
+            chunks.extend(self.chunk_text(para))
+        return title, chunks
+
+    # --------------------------------------------------
+
     def process_novel(self, novel_folder: str, output_base_dir: str = "Segmentor/output") -> Dict[str, int]:
         """
         Process all chapters in a novel folder.
@@ -125,57 +161,75 @@ class SmartSegmenter:
         
         total_chunks = 0
         processed = 0
+        segment_seconds = 0.0
 
         for filename in files:
+            chapter_id = filename.replace(".txt", "")
             try:
-                with open(os.path.join(chapters_dir, filename), "r", encoding="utf-8") as f:
-                    raw_text = f.read()
-
-                # Title + body separation (scraper-aware)
-                parts = raw_text.split("\n\n", 1)
-                title = parts[0].strip()
-                body = parts[1] if len(parts) > 1 else ""
-
-                # Preserve paragraph boundaries
-                paragraphs = [p.strip() for p in body.split("\n") if p.strip()]
-
-                chunks = []
-                for para in paragraphs:
-                    chunks.extend(self.chunk_text(para))
-
-                output_data = {
-                    "title": title,
-                    "chapter_id": filename.replace(".txt", ""),
-                    "chunks": chunks,
-                    "chunk_count": len(chunks)
-                }
-
-                json_filename = filename.replace(".txt", ".json")
-                with open(os.path.join(output_dir, json_filename), "w", encoding="utf-8") as f:
-                    json.dump(output_data, f, indent=2, ensure_ascii=False)
+                with self.profiler.chapter(f"{novel_name}/{chapter_id}"):
+                    with self.profiler.phase("read"):
+                        with open(os.path.join(chapters_dir, filename), "r", encoding="utf-8") as f:
+                            raw_text = f.read()
+
+                    started = time.perf_counter()
+                    with self.profiler.phase("segment"):
+                        title, chunks = self.segment_chapter(raw_text)
+                    elapsed = time.perf_counter() - started
+
+                    output_data = {
+                        "title": title,
+                        "chapter_id": chapter_id,
+                        "chunks": chunks,
+                        "chunk_count": len(chunks)
+                    }
+
+                    with self.profiler.phase("write"):
+                        json_filename = filename.replace(".txt", ".json")
+                        with open(os.path.join(output_dir, json_filename), "w", encoding="utf-8") as f:
+                            json.dump(output_data, f, indent=2, ensure_ascii=False)
                 
                 total_chunks += len(chunks)
                 processed += 1
+                segment_seconds += elapsed
+                SEGMENTER_CHUNKS.inc(len(chunks))
+                SEGMENTER_SECONDS.inc(elapsed)
                 logging.info(f"Processed {filename}: {len(chunks)} chunks")
                 
             except Exception as e:
                 logging.error(f"Failed to process {filename}: {e}")
 
-        logging.info(f"Finished processing {novel_folder}: {processed} chapters, {total_chunks} total chunks")
+        chunks_per_second = total_chunks / segment_seconds if segment_seconds else 0.0
+        SEGMENTER_CHUNKS_PER_SECOND.set(chunks_per_second)
+        logging.info(f"Finished processing {novel_folder}: {processed} chapters, {total_chunks} total chunks "
+                     f"({chunks_per_second:.0f} chunks/s)")
         return {"processed": processed, "total_chunks": total_chunks}
 
 
 if __name__ == "__main__":
-    segmenter = SmartSegmenter()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Segment scraped chapters into TTS chunks")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Profile the run and write the report to DIR (default: logs/profiles/segment-<time>)")
+    parser.add_argument("--input", default="data/output", help="Folder of scraped novels (default: data/output)")
+    parser.add_argument("--output", default="Segmentor/output", help="Folder for segment JSON (default: Segmentor/output)")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(output_dir=args.profile or profile_dir(run_name("segment")), label="segmenter")
+        profiler.start()
+
+    segmenter = SmartSegmenter(profiler=profiler)
 
     # Input: data/output (from scraper)
-    input_base_dir = "data/output"
+    input_base_dir = args.input
     if not os.path.exists(input_base_dir):
         logging.error(f"Input folder '{input_base_dir}' not found. Run the scraper first.")
         exit(1)
 
     # Output: Segmentor/output
-    output_base_dir = "Segmentor/output"
+    output_base_dir = args.output
     os.makedirs(output_base_dir, exist_ok=True)
 
     novels = [
@@ -185,7 +239,7 @@ if __name__ == "__main__":
     ]
     
     if not novels:
-        logging.error("No novels found in data/output directory.")
+        logging.error(f"No novels found in {input_base_dir} directory.")
         exit(1)
 
     logging.info(f"Found {len(novels)} novel(s) to process")
@@ -201,3 +255,12 @@ if __name__ == "__main__":
     logging.info(f"COMPLETE: {total_stats['processed']} chapters, {total_stats['total_chunks']} total chunks")
     logging.info(f"Saved to: {output_base_dir}")
     print("=" * 60)
+
+    metrics_file = dump_metrics()
+    if metrics_file:
+        logging.info(f"Metrics written to {metrics_file}")
+
+    if profiler is not None:
+        profiler.stop()
+        print(profiler.format_report())
+        logging.info(f"Profile written to {profiler.write()}")
@@ -0,0 +1,169 @@
+"""
+Inference backends for the Kokoro acoustic model
+Every backend returns an object KPipeline accepts as its shared model:
+
+  torch  the fp32 PyTorch KModel (CPU or CUDA)
+  int8   the same model with its Linear and LSTM layers dynamically
+         quantized to int8 (CPU only)
+  onnx   an exported model run by ONNX Runtime on the CPU; export one with
+         `python src/tts_backends.py export models/kokoro.onnx` or use the
+         onnx-community Kokoro-82M export, which has the same inputs
+
+spectral_distance() compares a backend's audio with the PyTorch output so a
+faster backend can be checked for audible drift (benchmarks/backends.py).
+
+torch, kokoro, numpy and onnxruntime are imported when a backend is built.
+"""
+
+import json
+import os
+from typing import Tuple
+
+try:
+    from .config import TTS_CONFIG
+except ImportError:
+    from config import TTS_CONFIG
+
+BACKENDS = ('torch', 'int8', 'onnx')
+
+# Input and output names of the exported graph (same as the onnx-community export)
+ONNX_INPUTS = ('input_ids', 'style', 'speed')
+ONNX_OUTPUTS = ('waveform', 'durations')
+
+
+def load_model(backend: str, device: str, repo_id: str):
+    """Acoustic model for backend, ready to pass to KPipeline(model=...); int8 and onnx ignore device"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{backend}', expected one of {', '.join(BACKENDS)}")
+
+    from kokoro import KModel
+
+    if backend == 'onnx':
+        return _onnx_model_class(KModel)(TTS_CONFIG['onnx_model'], repo_id, TTS_CONFIG['onnx_threads'])
+
+    if backend == 'int8':
+        import torch
+
+        model = KModel(repo_id=repo_id).eval()
+        torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8, inplace=True
+        )
+        return model
+
+    return KModel(repo_id=repo_id).to(device).eval()
+
+
+def _onnx_model_class(KModel):
+    """KModel subclass whose forward_with_tokens runs an ONNX Runtime session"""
+
+    import numpy as np
+    import onnxruntime as ort
+    import torch
+    from huggingface_hub import hf_hub_download
+
+    class OnnxKModel(KModel):
+        # KModel.forward maps phonemes to token ids and calls forward_with_tokens,
+        # so only the network itself is replaced; KPipeline sees a normal KModel
+        def __init__(self, path: str, repo_id: str, threads: int = 0):
+            torch.nn.Module.__init__(self)
+            self.repo_id = repo_id
+            with open(hf_hub_download(repo_id=repo_id, filename='config.json'), 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            self.vocab = config['vocab']
+            self.context_length = config['plbert']['max_position_embeddings']
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if threads:
+                options.intra_op_num_threads = threads
+            self.session = ort.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+            self._outputs = len(self.session.get_outputs())
+
+        @property
+        def device(self):
+            return torch.device('cpu')
+
+        @torch.no_grad()
+        def forward_with_tokens(self, input_ids, ref_s, speed: float = 1) -> Tuple:
+            outputs = self.session.run(None, {
+                'input_ids': input_ids.cpu().numpy().astype(np.int64),
+                'style': ref_s.cpu().numpy().astype(np.float32),
+                'speed': np.array([speed], dtype=np.float32)
+            })
+            audio = torch.from_numpy(outputs[0])
+            pred_dur = torch.from_numpy(outputs[1]) if self._outputs > 1 else None
+            return audio, pred_dur
+
+    return OnnxKModel
+
+
+def export_onnx(path: str, repo_id: str, opset: int = 17) -> str:
+    """Export the PyTorch model to path for the onnx backend"""
+    import torch
+    from kokoro import KModel
+
+    model = KModel(repo_id=repo_id, disable_complex=True).eval()
+
+    class Network(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, style, speed):
+            return self.model.forward_with_tokens(input_ids, style, speed)
+
+    input_ids = torch.randint(1, 100, (1, 48), dtype=torch.long)
+    style = torch.randn(1, 256)
+    speed = torch.tensor([1.0])
+    torch.onnx.export(
+        Network(), (input_ids, style, speed), str(path),
+        input_names=list(ONNX_INPUTS), output_names=list(ONNX_OUTPUTS),
+        dynamic_axes={'input_ids': {1: 'tokens'}, 'waveform': {0: 'samples'}, 'durations': {0: 'tokens'}},
+        opset_version=opset
+    )
+    return str(path)
+
+
+def spectral_distance(reference, candidate, sample_rate: int = 24000, frame_ms: float = 40.0) -> float:
+    """
+    Log-spectral distance in dB between two waveforms.
+
+    Frames are compared over the shorter of the two signals; below ~1 dB
+    the difference is inaudible, quantization typically lands at 1-3 dB.
+    """
+    import numpy as np
+
+    reference = np.asarray(reference, dtype=np.float32).reshape(-1)
+    candidate = np.asarray(candidate, dtype=np.float32).reshape(-1)
+    length = min(len(reference), len(candidate))
+    frame = max(16, int(sample_rate * frame_ms / 1000))
+    if length < frame:
+        raise ValueError("Audio is shorter than one analysis frame")
+
+    hop = frame // 2
+    window = np.hanning(frame).astype(np.float32)
+    starts = range(0, length - frame + 1, hop)
+
+    def power(signal):
+        frames = np.stack([signal[start:start + frame] * window for start in starts])
+        return np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+    reference_power, candidate_power = power(reference), power(candidate)
+    # Ignore detail 60 dB below the loudest bin so near-silent frames do not dominate
+    floor = max(float(reference_power.max()), 1e-12) * 1e-6
+    difference = 10 * np.log10(reference_power + floor) - 10 * np.log10(candidate_power + floor)
+    return float(np.mean(np.sqrt(np.mean(difference ** 2, axis=1))))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kokoro inference backend tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Export the model to ONNX for the onnx backend")
+    export.add_argument("path", nargs="?", default=str(TTS_CONFIG['onnx_model']))
+    export.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.path)), exist_ok=True)
+    print(f"Exported to {export_onnx(args.path, TTS_CONFIG['repo_id'], args.opset)}")
@@ -0,0 +1,41 @@
+"""Shared test helpers."""
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent.parent / "benchmarks"
+
+# Modules fake_kokoro installs; only these are restored, so torch and other
+# modules first imported inside the block stay loaded
+FAKE_MODULES = ("kokoro", "fake_tts")
+
+
+@contextmanager
+def fake_kokoro(**tunables):
+    """
+    Run with the benchmark's fake pipeline installed as the kokoro module.
+
+    Yields the fake_tts module. sys.path, the kokoro and fake_tts entries of
+    sys.modules and the FakeKPipeline settings are restored on exit, so later
+    tests see the real kokoro (or none) whatever order they run in.
+    """
+    saved_modules = {name: sys.modules.get(name) for name in FAKE_MODULES}
+    try:
+        with patch.object(sys, "path", [str(BENCHMARKS_DIR)] + sys.path):
+            import fake_tts
+
+            saved = {name: getattr(fake_tts.FakeKPipeline, name) for name in tunables}
+            fake_tts.install_fake_kokoro(**tunables)
+            try:
+                yield fake_tts
+            finally:
+                for name, value in saved.items():
+                    setattr(fake_tts.FakeKPipeline, name, value)
+    finally:
+        for name, module in saved_modules.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
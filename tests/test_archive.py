@@ -0,0 +1,75 @@
+"""Raw page archive and offline re-extraction tests."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.archive import RawPageStore, reextract_novel
+from tests.test_extractor import CHAPTER_PAGE, SELENIUM_CONTENT, SELENIUM_TITLE
+
+URL = "https://novelhi.com/s/Test-Novel/{}"
+
+
+class TestRawPageStore(unittest.TestCase):
+    """Test cases for the content-addressed page store."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_with_every_codec(self):
+        """Test that stored pages read back unchanged with gzip and zstd."""
+        for codec in ("gzip", "zstd"):
+            store = RawPageStore(self.tmp / codec, compression=codec)
+            store.put(1, URL.format(1), CHAPTER_PAGE)
+            entry = store.entries()[1]
+            self.assertEqual(entry['url'], URL.format(1))
+            self.assertEqual(store.read(entry), CHAPTER_PAGE)
+
+    def test_identical_pages_share_an_object(self):
+        """Test that refetching a page adds an index entry but no new object."""
+        store = RawPageStore(self.tmp, compression="gzip")
+        first = store.put(1, URL.format(1), CHAPTER_PAGE)
+        second = store.put(1, URL.format(1), CHAPTER_PAGE)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(list((self.tmp / "objects").rglob("*.html.gz"))), 1)
+        self.assertEqual(len(store.index_path.read_text().splitlines()), 2)
+
+    def test_latest_entry_wins(self):
+        """Test that a changed page replaces the chapter's entry."""
+        store = RawPageStore(self.tmp, compression="gzip")
+        store.put(1, URL.format(1), "<p>old</p>")
+        store.put(2, URL.format(2), CHAPTER_PAGE)
+        store.put(1, URL.format(1), "<p>new</p>")
+
+        entries = store.entries()
+        self.assertEqual(sorted(entries), [1, 2])
+        self.assertEqual(store.read(entries[1]), "<p>new</p>")
+
+    def test_unknown_compression_is_rejected(self):
+        """Test that a misspelt codec fails at construction."""
+        with self.assertRaises(ValueError):
+            RawPageStore(self.tmp, compression="lz4")
+
+    def test_reextract_rebuilds_chapter_files(self):
+        """Test that archived pages become the same chapter files a scrape writes."""
+        store = RawPageStore(self.tmp / "raw", compression="gzip")
+        for number in (1, 2, 3):
+            store.put(number, URL.format(number), CHAPTER_PAGE)
+        store.put(4, URL.format(4), "<html>Just a moment...</html>")
+
+        stats = reextract_novel(str(self.tmp / "raw"), str(self.tmp / "out"), workers=1, end=4,
+                                min_content_length=0)
+
+        self.assertEqual((stats['processed'], stats['failed']), (3, 1))
+        self.assertIn(4, stats['errors'])
+        text = (self.tmp / "out" / "Chapter_0002.txt").read_text(encoding="utf-8")
+        self.assertEqual(text, f"{SELENIUM_TITLE}\n{'=' * 60}\n\n{SELENIUM_CONTENT}")
+
+
+if __name__ == '__main__':
+    unittest.main()
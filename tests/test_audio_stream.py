@@ -0,0 +1,149 @@
+"""Range, If-Range and time seeking tests for the audio endpoints."""
+
+import io
+import shutil
+import struct
+import tempfile
+import unittest
+import wave
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from src.api import database
+from src.api.audio_stream import OggOpusSeekIndex, parse_range
+from src.api.database import get_db, init_db, close_connections
+from src.api.main import app
+
+SAMPLE_RATE = 24000
+URL = "/api/audio/novel/test/1"
+
+
+def ogg_page(granule, payload):
+    """An Ogg page holding one packet (the CRC is not checked by the index)"""
+    lacing = [255] * (len(payload) // 255) + [len(payload) % 255]
+    return (b"OggS" + struct.pack("<BBqIII", 0, 0, granule, 1, 0, 0)
+            + bytes([len(lacing)]) + bytes(lacing) + payload)
+
+
+class TestAudioStream(unittest.TestCase):
+    """Test cases for partial content and seeking."""
+
+    def setUp(self):
+        """Create a database with one chapter that has 3 seconds of audio."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db_patch = patch.object(database, "DB_PATH", self.tmp / "novels.db")
+        self.db_patch.start()
+        init_db()
+
+        self.samples = (np.arange(3 * SAMPLE_RATE) % 30000).astype("<i2")
+        self.audio_path = self.tmp / "Chapter_0001.wav"
+        with wave.open(str(self.audio_path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(self.samples.tobytes())
+        self.audio = self.audio_path.read_bytes()
+
+        with get_db() as conn:
+            conn.execute("INSERT INTO novels (slug, title) VALUES ('test', 'Test')")
+            conn.execute(
+                "INSERT INTO chapters (novel_id, chapter_number, audio_path) VALUES (1, 1, ?)",
+                (str(self.audio_path),)
+            )
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        close_connections()
+        self.db_patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_full_and_partial_content(self):
+        """Test whole-file, byte range and suffix range responses."""
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.audio)
+        self.assertEqual(response.headers["accept-ranges"], "bytes")
+
+        response = self.client.get(URL, headers={"Range": "bytes=100-199"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.audio[100:200])
+        self.assertEqual(response.headers["content-range"], f"bytes 100-199/{len(self.audio)}")
+
+        response = self.client.get(URL, headers={"Range": "bytes=-10"})
+        self.assertEqual(response.content, self.audio[-10:])
+
+        response = self.client.get(URL, headers={"Range": f"bytes={len(self.audio) - 5}-"})
+        self.assertEqual(response.content, self.audio[-5:])
+
+    def test_rejected_ranges(self):
+        """Test that out-of-file ranges get 416."""
+        for header in (f"bytes={len(self.audio)}-", "bytes=-0"):
+            response = self.client.get(URL, headers={"Range": header})
+            self.assertEqual(response.status_code, 416, header)
+            self.assertEqual(response.headers["content-range"], f"bytes */{len(self.audio)}")
+
+        # Ranges in another unit and multiple ranges are ignored
+        for header in ("items=0-1", "bytes=0-9,20-29"):
+            response = self.client.get(URL, headers={"Range": header})
+            self.assertEqual(response.status_code, 200, header)
+            self.assertEqual(response.content, self.audio)
+
+    def test_empty_file_ranges(self):
+        """Test that no range of an empty file is satisfiable."""
+        for header in ("bytes=-100", "bytes=0-", "bytes=0-0"):
+            with self.assertRaises(HTTPException) as raised:
+                parse_range(header, 0)
+            self.assertEqual(raised.exception.status_code, 416, header)
+            self.assertEqual(raised.exception.headers["Content-Range"], "bytes */0")
+
+    def test_if_range(self):
+        """Test that a stale If-Range returns the whole file."""
+        etag = self.client.get(URL).headers["etag"]
+
+        response = self.client.get(URL, headers={"Range": "bytes=0-9", "If-Range": etag})
+        self.assertEqual(response.status_code, 206)
+
+        response = self.client.get(URL, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.audio)
+
+    def test_time_seek(self):
+        """Test that ?t= returns a valid WAV starting at that time."""
+        response = self.client.get(URL, params={"t": 1.5})
+        self.assertEqual(response.status_code, 200)
+
+        with wave.open(io.BytesIO(response.content)) as f:
+            self.assertEqual(f.getframerate(), SAMPLE_RATE)
+            frames = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+        np.testing.assert_array_equal(frames, self.samples[int(1.5 * SAMPLE_RATE):])
+
+        self.assertEqual(self.client.get(URL, params={"t": 3.0}).status_code, 416)
+
+    def test_ogg_opus_seek_index(self):
+        """Test that Opus seeking starts at the page before the pre-roll point."""
+        head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+        pages = [ogg_page(0, head), ogg_page(0, b"OpusTags" + bytes(300))]
+        header_size = sum(map(len, pages))
+        # One page per second of audio
+        for second in range(1, 6):
+            pages.append(ogg_page(312 + second * 48000, bytes(100)))
+        path = self.tmp / "chapter.opus"
+        path.write_bytes(b"".join(pages))
+
+        index = OggOpusSeekIndex(path, path.stat().st_size)
+        self.assertEqual(index.duration, 5.0)
+
+        header, start, end = index.locate(2.5)
+        self.assertEqual(header, b"".join(pages[:2]))
+        # Audio from 2.5 s lives on the third audio page
+        self.assertEqual(start, header_size + sum(map(len, pages[2:4])))
+        self.assertEqual(end, path.stat().st_size - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Smoke tests for the benchmark suite and its local novelhi server."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from corpus import CorpusSpec, generate_chapter  # noqa: E402
+from novelhi_server import NovelhiServer  # noqa: E402
+
+from src.extractor import extract_chapter  # noqa: E402
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for the corpus, the fake site and the suite runner."""
+
+    def test_corpus_is_deterministic(self):
+        """Test that the same spec always generates the same chapter."""
+        spec = CorpusSpec(dialogue_ratio=1.0)
+        self.assertEqual(generate_chapter(spec, 0, 3), generate_chapter(spec, 0, 3))
+        self.assertNotEqual(generate_chapter(spec, 0, 3), generate_chapter(spec, 0, 4))
+        self.assertTrue(all(p.startswith('"') for p in generate_chapter(spec, 0, 3)[1]))
+
+    def test_server_pages_extract(self):
+        """Test that served chapter pages go through the real extractor."""
+        spec = CorpusSpec(chapters=2)
+        with NovelhiServer(spec) as server:
+            status, page = server.render(f"/s/{spec.novel_name(0)}/2")
+            self.assertEqual(server.render(f"/s/{spec.novel_name(0)}/3")[0], 404)
+        title, content = extract_chapter(page)
+        expected_title, paragraphs = generate_chapter(spec, 0, 2)
+        self.assertEqual(status, 200)
+        self.assertEqual(title, expected_title)
+        self.assertEqual(content, "\n\n".join(paragraphs))
+
+    def test_suite_writes_comparable_results(self):
+        """Test a small scraping and API run and a self-comparison."""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "results.json"
+            command = [sys.executable, str(ROOT / "benchmarks" / "suite.py"), "--only", "scraping", "api",
+                       "--chapters", "3", "--api-requests", "5", "--page-latency-ms", "0"]
+            subprocess.run(command + ["--output", str(output)], check=True, capture_output=True, timeout=300)
+            results = json.loads(output.read_text())
+
+            scraping = results["benchmarks"]["scraping"]["metrics"]
+            self.assertEqual(scraping["chapters_saved"]["value"], 3)
+            self.assertIn("chapter_content_p95_ms", results["benchmarks"]["api"]["metrics"])
+
+            rerun = subprocess.run(command + ["--compare", str(output), "--tolerance", "1000"],
+                                   capture_output=True, timeout=300)
+            self.assertEqual(rerun.returncode, 0, rerun.stderr.decode()[-2000:])
+            self.assertEqual(json.loads(rerun.stdout)["regressions"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
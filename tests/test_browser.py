@@ -0,0 +1,126 @@
+"""Browser recycling and crash recovery tests for DriverManager."""
+
+import unittest
+from unittest.mock import patch
+
+from src import browser
+from src.browser import DriverManager
+
+
+class FakeDriver:
+    """WebDriver stand-in that records cookies and can die"""
+
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quit_called = False
+        self.cookies = [{'name': 'cf_clearance', 'value': f'token-{number}', 'domain': 'novelhi.com'}]
+        self.cdp = []
+        self.page_source = ""
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return "https://novelhi.com/"
+
+    def get_cookies(self):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return list(self.cookies)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp.append((command, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeScraper:
+    """Starts FakeDrivers; load_page fails while fail_next is set"""
+
+    def __init__(self):
+        self.drivers = []
+        self.fail_next = None  # None, 'crash' or 'error'
+
+    def start_driver(self):
+        driver = FakeDriver(len(self.drivers) + 1)
+        self.drivers.append(driver)
+        return driver
+
+    def load_page(self, driver, url):
+        failure, self.fail_next = self.fail_next, None
+        if failure == 'crash':
+            driver.alive = False
+        if failure:
+            raise RuntimeError("page load failed")
+        driver.page_source = f"<html>{url} from driver {driver.number}</html>"
+
+
+class TestDriverManager(unittest.TestCase):
+    """Test cases for recycling and restarting the scraping browser."""
+
+    def setUp(self):
+        self.patch = patch.object(browser, "SETTLE_DELAY", 0)
+        self.patch.start()
+        self.scraper = FakeScraper()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_recycles_after_max_pages_and_keeps_cookies(self):
+        """Test that the browser is replaced every max_pages loads with its cookies carried over."""
+        with DriverManager(self.scraper, max_pages=2, max_rss_mb=0) as manager:
+            pages = [manager.fetch_page(f"/s/novel/{number}") for number in range(1, 6)]
+            metrics = manager.metrics()
+
+        self.assertEqual(pages[-1], "<html>/s/novel/5 from driver 3</html>")
+        self.assertEqual(manager.restarts, 2)
+        self.assertEqual([s['end_reason'] for s in metrics['sessions']], ["page_limit", "page_limit", None])
+        self.assertEqual([s['pages'] for s in metrics['sessions']], [2, 2, 1])
+        second = self.scraper.drivers[1]
+        self.assertIn(("Network.setCookie", {'name': 'cf_clearance', 'value': 'token-1', 'domain': 'novelhi.com'}),
+                      second.cdp)
+        self.assertTrue(all(driver.quit_called for driver in self.scraper.drivers))
+
+    def test_restarts_once_after_a_crash(self):
+        """Test that a dead browser is replaced and the page retried on the new one."""
+        manager = DriverManager(self.scraper, max_pages=0, max_rss_mb=0)
+        manager.fetch_page("/s/novel/1")
+        self.scraper.fail_next = 'crash'
+
+        page = manager.fetch_page("/s/novel/2")
+
+        self.assertEqual(page, "<html>/s/novel/2 from driver 2</html>")
+        self.assertEqual((manager.crashes, manager.restarts), (1, 1))
+        self.assertEqual(manager.metrics()['sessions'][0]['end_reason'], "crash")
+        manager.close()
+
+    def test_page_errors_on_a_live_browser_are_raised(self):
+        """Test that a failed load on a healthy browser is counted, not treated as a crash."""
+        manager = DriverManager(self.scraper, max_pages=0, max_rss_mb=0)
+        self.scraper.fail_next = 'error'
+
+        with self.assertRaises(RuntimeError):
+            manager.fetch_page("/s/novel/1")
+
+        self.assertEqual((manager.crashes, manager.restarts), (0, 0))
+        self.assertEqual(manager.metrics()['sessions'][0]['failed_pages'], 1)
+        manager.close()
+
+    def test_recycles_when_memory_grows(self):
+        """Test that a session past max_rss_mb is replaced before the next load."""
+        manager = DriverManager(self.scraper, max_pages=0, max_rss_mb=1500, rss_check_every=1)
+        with patch.object(manager, "_browser_rss_mb", return_value=2048.0):
+            manager.fetch_page("/s/novel/1")
+            manager.fetch_page("/s/novel/2")
+        metrics = manager.metrics()
+        manager.close()
+
+        self.assertEqual(metrics['sessions'][0]['end_reason'], "memory")
+        self.assertEqual(metrics['sessions'][0]['peak_rss_mb'], 2048.0)
+        self.assertEqual(metrics['sessions'][0]['load_seconds']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
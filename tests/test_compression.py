@@ -0,0 +1,81 @@
+"""Response compression and JSON rendering tests."""
+
+import gzip
+import json
+import unittest
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from src.api import compression
+from src.api.compression import CompressionMiddleware, choose_encoding
+from src.api.responses import FastJSONResponse
+
+BODY = "All the prose of a long chapter. " * 200
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/text")
+    async def text():
+        return PlainTextResponse(BODY)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("short")
+
+    @app.get("/audio")
+    async def audio():
+        return Response(b"\0" * 4096, media_type="audio/wav")
+
+    @app.get("/json")
+    async def json_body():
+        return FastJSONResponse({"title": "Chapitre un", "content": BODY, "next": None})
+
+    return app
+
+
+class TestCompression(unittest.TestCase):
+    """Test cases for CompressionMiddleware and FastJSONResponse."""
+
+    def setUp(self):
+        self.client = TestClient(make_app())
+
+    def get(self, url, encoding="gzip"):
+        return self.client.get(url, headers={"Accept-Encoding": encoding})
+
+    def test_large_responses_are_compressed(self):
+        """Test that bodies over the threshold are gzipped with Vary set."""
+        with self.client.stream("GET", "/text", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertEqual(int(response.headers["content-length"]), len(raw))
+        self.assertEqual(gzip.decompress(raw).decode(), BODY)
+
+    def test_small_and_excluded_responses_pass_through(self):
+        """Test the size threshold, media type exclusions and identity clients."""
+        self.assertNotIn("content-encoding", self.get("/small").headers)
+        self.assertNotIn("content-encoding", self.get("/audio").headers)
+        self.assertNotIn("content-encoding", self.get("/text", encoding="identity").headers)
+
+    def test_choose_encoding(self):
+        """Test Accept-Encoding negotiation."""
+        self.assertEqual(choose_encoding("gzip, deflate"), "gzip")
+        self.assertIsNone(choose_encoding("gzip;q=0"))
+        self.assertIsNone(choose_encoding(""))
+        self.assertEqual(choose_encoding("*"), "br" if compression.brotli else "gzip")
+
+    def test_fast_json_response(self):
+        """Test that FastJSONResponse renders compact, standard JSON."""
+        response = self.get("/json", encoding="identity")
+        self.assertEqual(response.headers["content-type"], "application/json")
+        self.assertNotIn(b": ", response.content[:40])
+        self.assertEqual(json.loads(response.content)["next"], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Chapter content cache tests."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.api import cache
+from src.api.cache import ContentCache
+
+
+class TestContentCache(unittest.TestCase):
+    """Test cases for reading chapter bodies through the cache."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.path = self.tmp / "Chapter_0001.txt"
+        self.path.write_text(f"Chapter 1\n{'=' * 60}\n\nBody of chapter 1.", encoding="utf-8")
+        self.cache = ContentCache(max_bytes=1 << 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_reads_once_per_file_version(self):
+        """Test that a body is read once and served from memory afterwards."""
+        self.assertEqual(self.cache.get(str(self.path)), "Body of chapter 1.")
+        self.assertEqual(self.cache.get(str(self.path)), "Body of chapter 1.")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.get(str(self.tmp / "missing.txt")), "")
+
+    def test_file_deleted_after_stat(self):
+        """Test that a file removed between the stat and the read counts as missing and is not cached."""
+        with patch.object(cache, "read_chapter_body", side_effect=FileNotFoundError):
+            self.assertEqual(self.cache.get(str(self.path)), "")
+        self.assertEqual(self.cache.stats()['entries'], 0)
+        self.assertEqual(self.cache.get(str(self.path)), "Body of chapter 1.")
+
+
+if __name__ == '__main__':
+    unittest.main()
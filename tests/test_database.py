@@ -0,0 +1,141 @@
+"""Query plan and migration tests for the API database."""
+
+import re
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.api import database
+from src.api.database import get_db, init_db, close_connections, MIGRATIONS
+from src.api.routes import chapters
+from src.api.routes.chapters import CHAPTER_BY_ID, CHAPTER_BY_NUMBER, CHAPTER_LIST_COLUMNS, load_chapter_list
+from src.api.routes.novels import GENRE_NOVELS_QUERY, NOVEL_TITLE_QUERY, query_novels
+
+TABLE_SCAN = re.compile(r"SCAN (novels|chapters|genres|novel_genres|c|n|g|ng)\b")
+
+
+class TestDatabase(unittest.TestCase):
+    """Test cases for the schema and the hot API queries."""
+
+    def setUp(self):
+        """Create a temporary database with a small library."""
+        self.tmp = tempfile.mkdtemp()
+        self.db_patch = patch.object(database, "DB_PATH", Path(self.tmp) / "novels.db")
+        self.db_patch.start()
+        init_db()
+
+        with get_db() as conn:
+            conn.execute(
+                "INSERT INTO novels (slug, title, genres, chapter_count) VALUES ('test', 'Test', 'Fantasy,Action', 4)"
+            )
+            conn.execute("INSERT INTO novels (slug, title) VALUES ('road', 'The Long Road Home')")
+            conn.executemany(
+                "INSERT INTO chapters (novel_id, chapter_number, title) VALUES (1, ?, ?)",
+                [(number, f"Chapter {number}") for number in (1, 2, 5, 9)]
+            )
+            database.sync_novel_genres(conn.cursor())
+            database.sync_novel_search(conn.cursor())
+
+    def tearDown(self):
+        close_connections()
+        self.db_patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def query_plan(self, query, params):
+        with get_db() as conn:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row['detail'] for row in rows]
+
+    def assertNoTableScan(self, query, params):
+        plan = self.query_plan(query, params)
+        # CTEs and subqueries are materialized rows and may be scanned
+        scans = [step for step in plan if TABLE_SCAN.match(step)]
+        self.assertEqual(scans, [], "\n".join(plan))
+
+    def test_migrations_applied(self):
+        """Test that init_db brings the schema to the latest version."""
+        with get_db() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, MIGRATIONS[-1][0])
+
+        # Running it again is a no-op
+        init_db()
+
+    def test_chapter_navigation(self):
+        """Test the single-query prev/next lookup."""
+        with get_db() as conn:
+            chapter = conn.execute(CHAPTER_BY_NUMBER, ("test", 5)).fetchone()
+            first = conn.execute(CHAPTER_BY_ID, (1,)).fetchone()
+            missing = conn.execute(CHAPTER_BY_NUMBER, ("test", 3)).fetchone()
+
+        self.assertEqual((chapter['prev_chapter'], chapter['next_chapter']), (2, 9))
+        self.assertEqual((first['prev_chapter'], first['next_chapter']), (None, 2))
+        self.assertIsNone(missing)
+
+    def test_chapter_pages(self):
+        """Test keyset pagination of the chapter list in both orders."""
+        novel = {"id": 1, "chapter_count": 4}
+
+        first = load_chapter_list(novel, "asc", None, None, 3)
+        self.assertEqual([c["chapter_number"] for c in first["chapters"]], [1, 2, 5])
+        self.assertEqual((first["total"], first["next_after"]), (4, 5))
+        last = load_chapter_list(novel, "asc", None, first["next_after"], 3)
+        self.assertEqual([c["chapter_number"] for c in last["chapters"]], [9])
+        self.assertIsNone(last["next_after"])
+
+        desc = load_chapter_list(novel, "desc", None, 5, 10)
+        self.assertEqual([c["chapter_number"] for c in desc["chapters"]], [2, 1])
+
+        found = load_chapter_list(novel, "asc", "9", None, 10)
+        self.assertEqual((found["total"], found["chapters"][0]["has_audio"]), (1, False))
+
+    def test_chapter_list_syncs_an_empty_novel_once(self):
+        """Test that a novel without chapter files is not rescanned on every list request."""
+        empty_dir = Path(self.tmp) / "Empty"
+        empty_dir.mkdir()
+        with get_db() as conn:
+            conn.execute("INSERT INTO novels (slug, title, data_path) VALUES ('empty', 'Empty', ?)", (str(empty_dir),))
+            conn.execute("INSERT INTO novels (slug, title, data_path) VALUES ('gone', 'Gone', ?)",
+                         (str(Path(self.tmp) / "Gone"),))
+
+        with patch.object(chapters, "sync_chapters_for_novel", wraps=chapters.sync_chapters_for_novel) as sync:
+            for slug in ("empty", "gone"):
+                for _ in range(3):
+                    novel = chapters.fetch_novel_for_chapter_list(slug)
+                self.assertEqual(novel['chapters_version'], 1, slug)
+        self.assertEqual(sync.call_count, 2)
+
+    def test_genre_filter(self):
+        """Test that genres are normalized and matched case-insensitively."""
+        with get_db() as conn:
+            ids = [row[0] for row in conn.execute(GENRE_NOVELS_QUERY, ("action",))]
+        self.assertEqual(ids, [1])
+
+    def test_title_search(self):
+        """Test that the library search matches word prefixes of titles in any case."""
+        for search, slugs in (("long ro", ["road"]), ("HOME", ["road"]), ("te", ["test"]),
+                              ("oad", []), ("Road, Home!", ["road"])):
+            novels = query_novels(search, None, 10, 0)
+            self.assertEqual([novel['slug'] for novel in novels['novels']], slugs, search)
+
+    def test_hot_queries_use_indexes(self):
+        """Test that the hot queries never scan the novels or chapters tables."""
+        self.assertNoTableScan(CHAPTER_BY_ID, (1,))
+        self.assertNoTableScan(CHAPTER_BY_NUMBER, ("test", 5))
+        self.assertNoTableScan(GENRE_NOVELS_QUERY, ("Fantasy",))
+        self.assertNoTableScan(f"SELECT id FROM novels WHERE id IN ({NOVEL_TITLE_QUERY})", ('"road"*',))
+        self.assertNoTableScan("SELECT * FROM novels WHERE slug = ?", ("test",))
+        self.assertNoTableScan("SELECT id FROM novels WHERE data_path = ?", ("/tmp",))
+        self.assertNoTableScan(
+            f"SELECT {CHAPTER_LIST_COLUMNS} FROM chapters WHERE novel_id = ? AND chapter_number > ? "
+            "ORDER BY chapter_number LIMIT ?", (1, 2, 100)
+        )
+        self.assertNoTableScan(
+            "SELECT audio_path FROM chapters WHERE novel_id = ? AND chapter_number = ?", (1, 2)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
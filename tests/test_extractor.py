@@ -0,0 +1,67 @@
+"""Chapter extraction tests against the text Selenium used to return."""
+
+import unittest
+
+from src.extractor import extract_chapter
+
+# A novelhi chapter page with the markup extraction has to cope with:
+# hidden ads and watermarks, <br> line breaks, entities and scripts
+CHAPTER_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Chapter 12 - Test Novel</title><style>p { margin: 0 }</style></head>
+<body>
+  <h1 class="chapter-title">
+    Chapter 12:   The
+    Long Road
+  </h1>
+  <div id="showReading">
+    <p>The caravan left before   dawn,
+       its wheels creaking in the cold.</p>
+    <p style="display: none">Read the latest chapters at another site.</p>
+    <p>"Hold the line,"&nbsp;she said.<br>"We are not done yet."</p>
+    <p>He nodded <span style="display:none">novelhi.com</span>and checked the map<!-- watermark --> again.</p>
+    <div hidden><p>Hidden inside a hidden block.</p></div>
+    <p>   </p>
+    <p>The road ran on<br/><br/>and on.<script>track("chapter")</script></p>
+  </div>
+</body>
+</html>
+"""
+
+# What WebElement.text gave for the same page (h1 and each <p>)
+SELENIUM_TITLE = "Chapter 12: The Long Road"
+SELENIUM_CONTENT = "\n\n".join([
+    "The caravan left before dawn, its wheels creaking in the cold.",
+    '"Hold the line," she said.\n"We are not done yet."',
+    "He nodded and checked the map again.",
+    "The road ran on\n\nand on."
+])
+
+
+class TestExtractChapter(unittest.TestCase):
+    """Test cases for extract_chapter matching the Selenium-era chapter files."""
+
+    def test_matches_selenium_text(self):
+        """Test that hidden text is dropped and <br> breaks lines as in a browser."""
+        title, content = extract_chapter(CHAPTER_PAGE, min_content_length=0)
+        self.assertEqual(title, SELENIUM_TITLE)
+        self.assertEqual(content, SELENIUM_CONTENT)
+
+    def test_container_without_paragraphs(self):
+        """Test that a container of bare text keeps its line structure."""
+        page = ('<h2>Chapter 3</h2><div id="showReading">First line<br>second line'
+                '<div>Own block</div><span style="visibility: hidden">ad</span>last</div>')
+        title, content = extract_chapter(page, min_content_length=0)
+        self.assertEqual(title, "Chapter 3")
+        self.assertEqual(content, "First line\nsecond line\nOwn block\nlast")
+
+    def test_missing_or_short_content(self):
+        """Test that pages that did not load are rejected."""
+        with self.assertRaises(ValueError):
+            extract_chapter("<h1>Chapter 1</h1><div>No container</div>")
+        with self.assertRaises(ValueError):
+            extract_chapter(CHAPTER_PAGE, min_content_length=1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
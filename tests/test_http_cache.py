@@ -0,0 +1,170 @@
+"""Conditional request tests for the chapter and library endpoints."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src.api import database
+from src.api.database import init_db, close_connections
+from src.api.indexer import LibraryIndexer
+from src.api.main import app
+from src.api.routes import chapters
+
+
+class TestHttpCache(unittest.TestCase):
+    """Test cases for ETag/Last-Modified validation and 304 responses."""
+
+    def setUp(self):
+        """Create a temporary database and a library with one novel."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.patches = [
+            patch.object(database, "DB_PATH", self.tmp / "novels.db"),
+            patch.object(chapters, "AUDIO_DIR", self.tmp / "audio"),
+        ]
+        for p in self.patches:
+            p.start()
+        init_db()
+
+        self.novel_dir = self.tmp / "output" / "Test-Novel"
+        self.novel_dir.mkdir(parents=True)
+        for number in (1, 2, 3):
+            (self.novel_dir / f"Chapter_{number:04d}.txt").write_text(
+                f"Chapter {number}\n{'=' * 60}\n\nBody of chapter {number}.", encoding="utf-8"
+            )
+        self.indexer = LibraryIndexer(self.tmp / "output", audio_dir=self.tmp / "audio")
+        self.indexer.refresh(force=True)
+
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        close_connections()
+        for p in reversed(self.patches):
+            p.stop()
+        shutil.rmtree(self.tmp)
+
+    def assertNotModifiedWithoutFilesystem(self, url, headers):
+        """Request url conditionally while any file access raises."""
+        def fail(*args, **kwargs):
+            raise AssertionError("filesystem touched on a 304 path")
+
+        with ExitStack() as stack:
+            for target in ("builtins.open", "os.stat", "os.scandir", "src.api.cache.read_chapter_body"):
+                stack.enter_context(patch(target, side_effect=fail))
+            response = self.client.get(url, headers=headers)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        return response
+
+    def test_chapter_not_modified(self):
+        """Test that both chapter endpoints answer 304 from the database row."""
+        first = self.client.get("/api/chapters/novel/test-novel/2")
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["cache-control"], "public, max-age=300")
+        etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+        response = self.assertNotModifiedWithoutFilesystem(
+            "/api/chapters/novel/test-novel/2", {"If-None-Match": etag}
+        )
+        self.assertEqual(response.headers["etag"], etag)
+        self.assertNotModifiedWithoutFilesystem(
+            f"/api/chapters/{first.json()['id']}", {"If-None-Match": f'"other", {etag}'}
+        )
+        self.assertNotModifiedWithoutFilesystem(
+            "/api/chapters/novel/test-novel/2", {"If-Modified-Since": last_modified}
+        )
+
+        # A different validator gets the full body
+        response = self.client.get("/api/chapters/novel/test-novel/2", headers={"If-None-Match": 'W/"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Body of chapter 2", response.json()["content"])
+
+    def test_chapter_rewritten_in_place(self):
+        """Test that a chapter file rewritten in place is not validated by its old ETag."""
+        path = self.novel_dir / "Chapter_0002.txt"
+        first = self.client.get("/api/chapters/novel/test-novel/2")
+        listing = self.client.get("/api/chapters/novel/test-novel")
+
+        # The folder mtime stays put; the indexer notices the file's own mtime
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("Chapter 2\n" + "=" * 60 + "\n\nA rewritten and much longer body of chapter 2.")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.indexer.refresh(), 1)
+
+        etag = first.headers["etag"]
+        response = self.client.get("/api/chapters/novel/test-novel/2", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("much longer body", response.json()["content"])
+        self.assertNotEqual(response.headers["etag"], etag)
+        self.assertNotModifiedWithoutFilesystem(
+            "/api/chapters/novel/test-novel/2", {"If-None-Match": response.headers["etag"]}
+        )
+
+        # The chapter list picks up the new word count
+        response = self.client.get("/api/chapters/novel/test-novel", headers={"If-None-Match": listing.headers["etag"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["chapters"][1]["word_count"], 12)
+
+    def test_chapter_modified_since_new_neighbour(self):
+        """Test that If-Modified-Since alone sees a new next chapter."""
+        first = self.client.get("/api/chapters/novel/test-novel/3")
+        self.assertIsNone(first.json()["next_chapter"])
+        last_modified = first.headers["last-modified"]
+
+        (self.novel_dir / "Chapter_0004.txt").write_text(
+            f"Chapter 4\n{'=' * 60}\n\nBody of chapter 4.", encoding="utf-8"
+        )
+        # Last-Modified has one-second resolution
+        with patch("time.time_ns", return_value=time.time_ns() + 2_000_000_000):
+            self.assertEqual(self.indexer.refresh(), 1)
+
+        response = self.client.get("/api/chapters/novel/test-novel/3", headers={"If-Modified-Since": last_modified})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["next_chapter"], 4)
+        self.assertNotModifiedWithoutFilesystem(
+            "/api/chapters/novel/test-novel/3", {"If-Modified-Since": response.headers["last-modified"]}
+        )
+
+    def test_chapter_list_not_modified(self):
+        """Test that the chapter list is revalidated against its version."""
+        first = self.client.get("/api/chapters/novel/test-novel")
+        self.assertEqual(first.json()["total"], 3)
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+        etag = first.headers["etag"]
+
+        self.assertNotModifiedWithoutFilesystem("/api/chapters/novel/test-novel", {"If-None-Match": etag})
+
+        # Another ordering is another representation
+        desc = self.client.get("/api/chapters/novel/test-novel?sort=desc", headers={"If-None-Match": etag})
+        self.assertEqual(desc.status_code, 200)
+
+        # A new chapter synced by the indexer changes the ETag
+        (self.novel_dir / "Chapter_0004.txt").write_text("Chapter 4\n===\n\nNew.", encoding="utf-8")
+        chapters.sync_chapters_for_path(str(self.novel_dir))
+        response = self.client.get("/api/chapters/novel/test-novel", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 4)
+
+    def test_novel_list_not_modified(self):
+        """Test that the library list answers 304 until a novel changes."""
+        first = self.client.get("/api/novels")
+        etag = first.headers["etag"]
+
+        self.assertNotModifiedWithoutFilesystem("/api/novels", {"If-None-Match": etag})
+
+        with database.get_db() as conn:
+            conn.execute("UPDATE novels SET views = views + 1")
+        response = self.client.get("/api/novels", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
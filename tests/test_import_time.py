@@ -0,0 +1,71 @@
+"""Startup tests: entry points must not load heavy dependencies on import."""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ('torch', 'kokoro', 'soundfile', 'numpy', 'spacy', 'selenium', 'undetected_chromedriver')
+
+# Generous ceilings that still catch an eager torch/spaCy/Chrome import
+IMPORT_BUDGETS_MS = {
+    'src.config': 300,
+    'src.main': 800,
+    'src.segmenter': 800,
+    'src.scraper': 1500,
+    'src.api.main': 5000,
+}
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{'ms': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe_import(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for lazy imports in the CLIs and the API."""
+
+    def test_entry_points_import_lazily(self):
+        """Test that importing an entry point loads no heavy dependency."""
+        for module, budget in IMPORT_BUDGETS_MS.items():
+            with self.subTest(module=module):
+                result = probe_import(module)
+                self.assertEqual(result['loaded'], [])
+                self.assertLess(result['ms'], budget)
+
+    def test_config_import_creates_no_folders(self):
+        """Test that importing the config has no filesystem side effects."""
+        result = subprocess.run(
+            [sys.executable, '-c', "import os; os.makedirs = None; import src.config; print('ok')"],
+            cwd=ROOT, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.stdout.strip(), 'ok', result.stderr)
+
+    def test_tts_cli_lists_voices_without_model(self):
+        """Test that --list-voices answers without loading the TTS stack."""
+        result = subprocess.run(
+            [sys.executable, '-m', 'src.main', '--list-voices'],
+            cwd=ROOT, capture_output=True, text=True, timeout=60
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('af_heart', result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Library indexer change detection tests."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.api import database
+from src.api.database import get_db, init_db, close_connections
+from src.api.indexer import LibraryIndexer
+
+
+class TestLibraryIndexer(unittest.TestCase):
+    """Test cases for which library changes a refresh picks up."""
+
+    def setUp(self):
+        """Create a temporary database and an indexed novel folder."""
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db_patch = patch.object(database, "DB_PATH", self.tmp / "novels.db")
+        self.db_patch.start()
+        init_db()
+
+        self.novel_dir = self.tmp / "output" / "Test-Novel"
+        self.novel_dir.mkdir(parents=True)
+        for number in (1, 2):
+            self.write_chapter(number, f"Body of chapter {number}.")
+        self.indexer = LibraryIndexer(self.tmp / "output", audio_dir=self.tmp / "audio")
+        self.indexer.refresh(force=True)
+
+    def tearDown(self):
+        close_connections()
+        self.db_patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def write_chapter(self, number, body):
+        path = self.novel_dir / f"Chapter_{number:04d}.txt"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Chapter {number}\n{'=' * 60}\n\n{body}")
+        return path
+
+    def rewrite_in_place(self):
+        """Rewrite chapter 2 without touching the folder mtime"""
+        folder_mtime = self.novel_dir.stat().st_mtime_ns
+        path = self.write_chapter(2, "A rewritten and much longer body.")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.novel_dir.stat().st_mtime_ns, folder_mtime)
+        return path
+
+    def stored_size(self, number):
+        with get_db() as conn:
+            row = conn.execute(
+                "SELECT file_size FROM chapters WHERE chapter_number = ?", (number,)
+            ).fetchone()
+        return row['file_size']
+
+    def test_unchanged_library_is_not_rescanned(self):
+        """Test that a refresh with nothing changed writes nothing."""
+        self.assertEqual(self.indexer.refresh(), 0)
+
+    def test_polling_detects_in_place_rewrite(self):
+        """Test that without watchdog a rewritten chapter file is resynced."""
+        path = self.rewrite_in_place()
+
+        self.assertEqual(self.indexer.refresh(), 1)
+        self.assertEqual(self.stored_size(2), path.stat().st_size)
+
+    def test_watched_rewrite_is_resynced_from_notify(self):
+        """Test that with watchdog running the reported file's folder is resynced."""
+        self.indexer._observer = object()  # Watching: file mtimes are not polled
+        self.indexer.refresh(force=True)
+        path = self.rewrite_in_place()
+        self.assertEqual(self.indexer.refresh(), 0)
+
+        self.indexer.notify(str(path))
+
+        self.assertEqual(self.indexer.refresh(), 1)
+        self.assertEqual(self.stored_size(2), path.stat().st_size)
+        self.assertEqual(self.indexer.refresh(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
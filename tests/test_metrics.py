@@ -0,0 +1,131 @@
+"""Metrics registry and /metrics endpoint tests."""
+
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src import metrics
+from src.api import database, executor
+from src.api.database import init_db, close_connections
+from src.api.main import app
+
+
+class TestRegistry(unittest.TestCase):
+    """Test cases for the counter, gauge and histogram types."""
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_render_text_format(self):
+        """Test the Prometheus exposition of counters and labelled gauges."""
+        counter = self.registry.counter("jobs", "Jobs run", ("result",))
+        gauge = self.registry.gauge("depth", "Queue depth")
+        counter.inc(result="ok")
+        counter.inc(2, result="ok")
+        gauge.set_function(lambda: 7)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE jobs counter\n", text)
+        self.assertIn('jobs_total{result="ok"} 3\n', text)
+        self.assertIn("depth 7\n", text)
+        with self.assertRaises(ValueError):
+            counter.inc(status="ok")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, +Inf, sum and count."""
+        histogram = self.registry.histogram("latency", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value)
+
+        text = self.registry.render()
+        self.assertIn('latency_bucket{le="0.1"} 1\n', text)
+        self.assertIn('latency_bucket{le="1"} 3\n', text)
+        self.assertIn('latency_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("latency_sum 4.05\n", text)
+        self.assertEqual(histogram.summary(), {"count": 4, "sum": 4.05})
+
+    def test_dump_json(self):
+        """Test that a .json dump file holds the snapshot."""
+        self.registry.counter("chunks", "Chunks").inc(5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.json"
+            self.registry.dump(str(path))
+            data = json.loads(path.read_text())
+        self.assertEqual(data["chunks"]["samples"][0]["value"], 5)
+
+
+class TestMetricsEndpoint(unittest.TestCase):
+    """Test cases for request and query instrumentation in the API."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.patch = patch.object(database, "DB_PATH", self.tmp / "novels.db")
+        self.patch.start()
+        init_db()
+        metrics.REGISTRY.clear()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        close_connections()
+        self.patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_route_templates_and_query_timings(self):
+        """Test that requests are labelled by full route template."""
+        self.client.get("/api/chapters/novel/missing-novel/1")
+        self.client.get("/api/novels")
+        self.client.get("/no/such/path")
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        text = response.text
+        self.assertIn(
+            'novellabs_http_request_duration_seconds_count{method="GET",'
+            'route="/api/chapters/novel/{slug}/{chapter_number}",status="404"} 1', text
+        )
+        self.assertIn('route="/api/novels",status="200"', text)
+        self.assertIn('route="unmatched",status="404"', text)
+        self.assertIn('novellabs_db_query_duration_seconds_count{operation="SELECT"}', text)
+
+
+class TestIOQueueDepth(unittest.TestCase):
+    """Test cases for counting calls waiting for an I/O pool thread."""
+
+    def test_counts_waiting_calls(self):
+        """Test that calls behind a busy pool are counted until a thread takes them."""
+        release = threading.Event()
+        depths = []
+
+        async def scenario():
+            blocking = asyncio.ensure_future(executor.run_blocking(release.wait, 5))
+            waiting = [asyncio.ensure_future(executor.run_blocking(time.sleep, 0)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            depths.append(metrics.IO_QUEUE_DEPTH.value())
+            waiting[0].cancel()
+            await asyncio.sleep(0.05)
+            depths.append(metrics.IO_QUEUE_DEPTH.value())
+            release.set()
+            await asyncio.gather(blocking, waiting[1])
+            depths.append(metrics.IO_QUEUE_DEPTH.value())
+
+        pool = ThreadPoolExecutor(max_workers=1)
+        metrics.IO_QUEUE_DEPTH.clear()
+        with patch.object(executor, "_executor", pool):
+            asyncio.run(scenario())
+        pool.shutdown()
+
+        self.assertEqual(depths, [2, 1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Profiler and profiled audio job tests."""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src.api import database
+from src.api.database import init_db, close_connections
+from src.api.tts_worker import tts_job_runner
+from src.api.main import app
+from src.api.routes import audio
+from src.profiling import Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for phase timing, ranking and reports."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_nested_phases_rank_by_self_time(self):
+        """Test that a parent phase's self time excludes its children."""
+        profiler = Profiler(sampler='off')
+        model = profiler.wrap(lambda: time.sleep(0.03), "model")
+        with profiler.chapter("Chapter_0001"):
+            with profiler.phase("synthesize"):
+                model()
+                time.sleep(0.005)
+            with profiler.phase("write"):
+                pass
+
+        phases = profiler.report()['chapters']['Chapter_0001']['phases']
+        self.assertEqual([row['phase'] for row in phases][0], "model")
+        synthesize = next(row for row in phases if row['phase'] == "synthesize")
+        self.assertGreaterEqual(synthesize['wall'], 0.035)
+        self.assertLess(synthesize['self_wall'], synthesize['wall'] - 0.025)
+        self.assertIn("Chapter_0001", profiler.format_report())
+
+    def test_chapters_are_per_thread(self):
+        """Test that concurrent chapters do not mix their phases."""
+        profiler = Profiler(sampler='off')
+
+        def work(name):
+            with profiler.chapter(name), profiler.phase(name):
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=work, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        chapters = profiler.report()['chapters']
+        self.assertEqual([row['phase'] for row in chapters['a']['phases']], ["a"])
+        self.assertEqual([row['phase'] for row in chapters['b']['phases']], ["b"])
+
+    def test_disabled_profiler_records_nothing(self):
+        """Test that a disabled profiler hands back functions and no-op contexts."""
+        profiler = Profiler.disabled()
+        function = len
+        self.assertIs(profiler.wrap(function, "x"), function)
+        self.assertIs(profiler.phase("x"), profiler.phase("y"))
+        with profiler.chapter("c"), profiler.phase("x"):
+            pass
+        self.assertEqual(profiler.report()['chapters'], {})
+        self.assertIsNone(profiler.write())
+
+    def test_sampler_and_summary_files(self):
+        """Test the cProfile fallback output and summary.json."""
+        profiler = Profiler(output_dir=self.tmp / "run", sampler='cprofile')
+        profiler.start()
+        with profiler.phase("segment"):
+            sorted(range(10000), key=lambda n: -n)
+        profiler.stop()
+        summary = json.loads(Path(profiler.write()).read_text())
+
+        self.assertEqual(summary['sampler'], 'cprofile')
+        self.assertEqual(summary['totals'][0]['phase'], "segment")
+        self.assertTrue((self.tmp / "run" / "profile.txt").exists())
+
+
+class TestAudioJobProfileFlag(unittest.TestCase):
+    """Test cases for the profile flag of the audio generation endpoint."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.patch = patch.object(database, "DB_PATH", self.tmp / "novels.db")
+        self.patch.start()
+        init_db()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        close_connections()
+        self.patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_profile_flag_reaches_the_job(self):
+        """Test that profile=true is passed to the worker and shown on the job."""
+        calls = []
+        done = threading.Event()
+
+        def fake_generation(job_id, chapter_id, voice, profile):
+            calls.append((chapter_id, voice, profile))
+            tts_job_runner.update(job_id, profile={'top_phases': []})
+            done.set()
+
+        with patch.object(audio, "run_audio_generation", fake_generation):
+            response = self.client.post("/api/audio/generate/42?voice=bf_emma&profile=true")
+            self.assertTrue(done.wait(5))
+
+        body = response.json()
+        self.assertTrue(body["profile"])
+        self.assertEqual(calls, [(42, "bf_emma", True)])
+        for _ in range(50):
+            job = self.client.get(f"/api/audio/jobs/{body['job_id']}").json()
+            if job["status"] == "completed":
+                break
+            time.sleep(0.02)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["profile"], {'top_phases': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+"""Update scheduler timing tests."""
+
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.api.scheduler import UpdateScheduler
+from src.config import UPDATE_CONFIG
+
+
+class TestUpdateScheduler(unittest.TestCase):
+    """Test cases for when library update checks run."""
+
+    def test_disabled_by_default(self):
+        """Test that the browser-driven update checks are opt-in."""
+        self.assertFalse(UPDATE_CONFIG['enabled'])
+
+    def test_first_check_runs_after_the_initial_delay(self):
+        """Test that the first check does not wait a full interval."""
+        scheduler = UpdateScheduler(interval_hours=6, max_concurrent=1, initial_delay_seconds=0.01)
+        checked = threading.Event()
+
+        with patch.object(scheduler, "run_once", side_effect=checked.set):
+            scheduler.start()
+            try:
+                self.assertTrue(checked.wait(5))
+            finally:
+                scheduler.stop()
+
+        # Later checks are an interval apart
+        next_run = scheduler.get_summary()['next_run']
+        self.assertGreater(next_run, datetime.now() + timedelta(hours=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@
 
 import unittest
 from unittest.mock import Mock, patch
-from src.scraper import NovelScraper
+from src.scraper import NovelScraper, compress_chapter_ranges, merge_chapter_ranges
 
 
 class TestNovelScraper(unittest.TestCase):
@@ -32,5 +32,21 @@ class TestNovelScraper(unittest.TestCase):
             self.scraper.generate_chapter_urls("invalid-url", 1, 3)
 
 
+    def test_iter_chapter_urls_sparse(self):
+        """Test that sparse chapter ranges only yield the requested chapters."""
+        toc_url = "https://novelhi.com/s/index/Test-Novel"
+        urls = list(self.scraper.iter_chapter_urls(toc_url, [(5, 5), (2000, 2001)]))
+
+        self.assertEqual([num for num, _ in urls], [5, 2000, 2001])
+        self.assertEqual(urls[1][1], "https://novelhi.com/s/Test-Novel/2000")
+
+    def test_chapter_ranges(self):
+        """Test compacting chapter numbers and merging ranges."""
+        self.assertEqual(compress_chapter_ranges([7, 1, 2, 3, 9, 8]), [(1, 3), (7, 9)])
+        self.assertEqual(merge_chapter_ranges([(5, 9), (1, 4), (20, 20)]), [(1, 9), (20, 20)])
+        with self.assertRaises(ValueError):
+            merge_chapter_ranges([(5, 1)])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,53 @@
+"""Inference backend selection and audio equivalence tests."""
+
+import unittest
+
+import numpy as np
+
+from src.tts_backends import load_model, spectral_distance
+
+SAMPLE_RATE = 24000
+
+
+def tone(frequency: float, seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(SAMPLE_RATE * seconds), dtype=np.float32) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+class TestSpectralDistance(unittest.TestCase):
+    """Test cases for the audio-equivalence measure."""
+
+    def test_identical_audio_has_no_distance(self):
+        """Test that a signal is at zero distance from itself."""
+        self.assertAlmostEqual(spectral_distance(tone(220), tone(220)), 0.0, places=6)
+
+    def test_small_noise_stays_below_a_different_sound(self):
+        """Test that quantization-like noise scores far below a different pitch."""
+        rng = np.random.default_rng(0)
+        noisy = tone(220) + rng.normal(0, 1e-3, SAMPLE_RATE).astype(np.float32)
+        near = spectral_distance(tone(220), noisy)
+        far = spectral_distance(tone(220), tone(330))
+        self.assertLess(near, 5.0)
+        self.assertGreater(far, near * 3)
+
+    def test_compares_the_common_length(self):
+        """Test that a trailing extra sample range does not count."""
+        self.assertAlmostEqual(spectral_distance(tone(220, 1.0), tone(220, 1.5)), 0.0, places=6)
+
+    def test_too_short_audio_is_rejected(self):
+        """Test that audio shorter than one frame raises ValueError."""
+        with self.assertRaises(ValueError):
+            spectral_distance(tone(220, 0.01), tone(220, 0.01))
+
+
+class TestBackendSelection(unittest.TestCase):
+    """Test cases for choosing a backend."""
+
+    def test_unknown_backend_is_rejected(self):
+        """Test that a misspelt backend fails before anything is loaded."""
+        with self.assertRaises(ValueError):
+            load_model("tensorrt", "cpu", "hexgrad/Kokoro-82M")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""Per-language pipeline and mixed-voice batch tests."""
+
+import importlib.util
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import src.main
+from src.api import database
+from src.api.database import init_db, close_connections
+from src.api.main import app
+from src.api.routes import audio
+from src.main import lang_code_for
+from tests.helpers import fake_kokoro
+
+
+class TestLanguageCodes(unittest.TestCase):
+    """Test cases for mapping voices to Kokoro language codes."""
+
+    def test_every_listed_voice_has_a_language(self):
+        """Test that all voices in VOICES map to a known language code."""
+        for language, voices in src.main.VOICES.items():
+            for voice in voices:
+                self.assertEqual(src.main.LANG_CODES[lang_code_for(voice)], language)
+
+    def test_unknown_language_is_rejected(self):
+        """Test that a voice with an unknown prefix raises ValueError."""
+        with self.assertRaises(ValueError):
+            lang_code_for("xf_nobody")
+
+
+class TestBatchEndpoint(unittest.TestCase):
+    """Test cases for queueing mixed-voice batches."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.patch = patch.object(database, "DB_PATH", self.tmp / "novels.db")
+        self.patch.start()
+        init_db()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        close_connections()
+        self.patch.stop()
+        shutil.rmtree(self.tmp)
+
+    def test_batch_passes_each_voice(self):
+        """Test that every item keeps its own voice and defaults are filled in."""
+        calls = []
+        done = threading.Event()
+
+        def fake_batch(job_id, items):
+            calls.append(items)
+            done.set()
+
+        with patch.object(audio, "run_batch_generation", fake_batch):
+            response = self.client.post("/api/audio/generate-batch", json={"items": [
+                {"chapter_id": 1, "voice": "jf_alpha"},
+                {"chapter_id": 2, "voice": "bf_emma"},
+                {"chapter_id": 3}
+            ]})
+            self.assertTrue(done.wait(5))
+
+        self.assertEqual(response.json()["chapters"], 3)
+        self.assertEqual(calls, [[(1, "jf_alpha"), (2, "bf_emma"), (3, "af_heart")]])
+
+    def test_unknown_voice_language_is_rejected(self):
+        """Test that single and batch generation refuse voices of unknown languages."""
+        self.assertEqual(self.client.post("/api/audio/generate/1?voice=xf_nobody").status_code, 400)
+        response = self.client.post("/api/audio/generate-batch", json={"items": [{"chapter_id": 1, "voice": "xm_x"}]})
+        self.assertEqual(response.status_code, 400)
+
+
+@unittest.skipUnless(importlib.util.find_spec("torch") and importlib.util.find_spec("soundfile"),
+                     "torch and soundfile are required")
+class TestSharedModel(unittest.TestCase):
+    """Test cases for one model shared by per-language pipelines."""
+
+    def test_mixed_batch_builds_one_model(self):
+        """Test that a batch in three languages loads one model and three G2P pipelines."""
+        with fake_kokoro() as fake_tts, tempfile.TemporaryDirectory() as tmp:
+            items = []
+            for number, voice in enumerate(["af_heart", "jf_alpha", "zf_xiaobei"], 1):
+                path = Path(tmp) / f"Chapter_{number:04d}.json"
+                path.write_text(json.dumps({'chapter_id': path.stem, 'chunks': ["Hello there."]}))
+                items.append({'path': str(path), 'voice': voice, 'name': "Mixed"})
+
+            models_before = fake_tts.FakeKModel.instances
+            generator = src.main.AudioBookGenerator(output_dir=str(Path(tmp) / "audio"), use_gpu=False)
+            stats = generator.process_batch(items)
+
+        self.assertEqual(stats['processed'], 3)
+        self.assertEqual(fake_tts.FakeKModel.instances - models_before, 1)
+        self.assertEqual(sorted(generator.pipelines), ['a', 'j', 'z'])
+        self.assertTrue(all(p.model is generator.model for p in generator.pipelines.values()))
+        self.assertEqual(generator.voice, "af_heart")
+
+
+if __name__ == '__main__':
+    unittest.main()
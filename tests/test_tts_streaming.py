@@ -0,0 +1,73 @@
+"""Audio buffer and streaming synthesis tests."""
+
+import importlib.util
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import src.main
+from src.main import AudioBuffer
+from tests.helpers import fake_kokoro
+
+
+class TestAudioBuffer(unittest.TestCase):
+    """Test cases for the preallocated chapter buffer."""
+
+    def test_writes_skips_and_grows(self):
+        """Test that audio lands in order with silence gaps, past the initial capacity."""
+        buffer = AudioBuffer(4)
+        buffer.write(np.ones(3, dtype=np.float32))
+        buffer.skip(2)
+        buffer.write(np.full(5, 2.0, dtype=np.float32))
+
+        self.assertEqual(buffer.length, 10)
+        np.testing.assert_array_equal(buffer.audio(), [1, 1, 1, 0, 0, 2, 2, 2, 2, 2])
+
+    def test_truncate_clears_a_dropped_chunk(self):
+        """Test that truncated audio does not reappear as noise inside later silence."""
+        buffer = AudioBuffer(10)
+        buffer.write(np.ones(2, dtype=np.float32))
+        buffer.write(np.full(4, 3.0, dtype=np.float32))
+        buffer.truncate(2)
+        buffer.skip(4)
+
+        np.testing.assert_array_equal(buffer.audio(), [1, 1, 0, 0, 0, 0])
+
+    def test_audio_is_a_view(self):
+        """Test that reading the result does not copy it."""
+        buffer = AudioBuffer.for_text("Some text.")
+        buffer.write(np.ones(8, dtype=np.float32))
+        self.assertTrue(np.shares_memory(buffer.audio(), buffer._data))
+
+
+@unittest.skipUnless(importlib.util.find_spec("torch") and importlib.util.find_spec("soundfile"),
+                     "torch and soundfile are required")
+class TestStreamingSynthesis(unittest.TestCase):
+    """Test cases for keeping every sub-segment Kokoro yields."""
+
+    def test_split_chunks_keep_all_audio(self):
+        """Test that a chunk split into several segments is written in full."""
+        import soundfile as sf
+
+        with fake_kokoro(max_segment_chars=40) as fake_tts:
+            generator = src.main.AudioBookGenerator(use_gpu=False)
+            chunks = ["A first sentence that is long enough to be split into more than one segment.",
+                      "Short one."]
+            expected = [fake_tts.FakeKPipeline.render(segment) for chunk in chunks
+                        for segment in generator.pipeline._segments(chunk, r'\n+')]
+            segments = list(generator.stream(chunks[0]))
+            with tempfile.TemporaryDirectory() as tmp:
+                result = generator.synthesize_chapter("Chapter_0001", chunks, str(Path(tmp) / "c.wav"))
+                written, _ = sf.read(str(Path(tmp) / "c.wav"), dtype='float32')
+
+        gap = int(src.main.TTS_CONFIG['sample_rate'] * src.main.TTS_CONFIG['silence_duration'])
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(seconds >= 0 for _, seconds in segments))
+        self.assertEqual(result['segments'], len(expected))
+        self.assertEqual(len(written), sum(len(audio) for audio in expected) + gap)
+
+
+if __name__ == '__main__':
+    unittest.main()
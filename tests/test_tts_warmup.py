@@ -0,0 +1,173 @@
+"""Warm TTS worker and generator warmup tests."""
+
+import importlib.util
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+import src.main
+from src.api import database
+from src.api.database import init_db, close_connections
+from src.api.main import app
+from src.api.routes import audio
+from src.api.jobs import job_runner
+from src.api.tts_worker import TTSWorker, tts_job_runner
+from tests.helpers import fake_kokoro
+
+
+class FakeGenerator:
+    """Records how the worker builds and drives its generator"""
+
+    built = 0
+
+    def __init__(self, voice, output_dir, use_gpu, profiler=None):
+        FakeGenerator.built += 1
+        self.voice = voice
+        self.voice_packs = {}
+        self.warmed = False
+        self.warmup_report = None
+        self.profilers = []
+
+    def set_voice(self, voice):
+        self.voice_packs.setdefault(voice, object())
+        self.voice = voice
+
+    def set_profiler(self, profiler):
+        self.profilers.append(profiler)
+
+    def warmup(self, voices=None):
+        for voice in voices or ['af_heart']:
+            self.set_voice(voice)
+        self.warmed = True
+        self.warmup_report = {'voices': voices, 'cold_ms': 100.0, 'warm_ms': 10.0}
+        return self.warmup_report
+
+
+class TestTTSWorker(unittest.TestCase):
+    """Test cases for sharing one warm generator between jobs."""
+
+    def setUp(self):
+        FakeGenerator.built = 0
+        self.patch = patch.object(src.main, "AudioBookGenerator", FakeGenerator)
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+
+    def test_generator_is_built_once_and_switches_voices(self):
+        """Test that jobs reuse the generator and keep earlier voices loaded."""
+        worker = TTSWorker("audio", use_gpu=False)
+        self.assertFalse(worker.status()['loaded'])
+        with worker.generator("af_heart") as first:
+            pass
+        with worker.generator("bf_emma", profiler="profiler") as second:
+            self.assertEqual(second.voice, "bf_emma")
+
+        self.assertIs(first, second)
+        self.assertEqual(FakeGenerator.built, 1)
+        self.assertEqual(second.profilers, ["profiler", None])
+        self.assertEqual(worker.status()['voices'], ["af_heart", "bf_emma"])
+
+    def test_warmup_endpoint_reports_cold_and_warm(self):
+        """Test that POST /warmup preloads voices and GET /worker shows the result."""
+        tmp = Path(tempfile.mkdtemp())
+        worker = TTSWorker("audio", use_gpu=False)
+        with patch.object(database, "DB_PATH", tmp / "novels.db"), patch.object(audio, "tts_worker", worker):
+            init_db()
+            client = TestClient(app)
+            response = client.post("/api/audio/warmup?voices=af_heart,bm_george")
+            job_id = response.json()["job_id"]
+            for _ in range(100):
+                if client.get(f"/api/audio/jobs/{job_id}").json()["status"] == "completed":
+                    break
+                time.sleep(0.02)
+            status = client.get("/api/audio/worker").json()
+            close_connections()
+        shutil.rmtree(tmp)
+
+        self.assertTrue(status['warmed'])
+        self.assertEqual(status['voices'], ["af_heart", "bm_george"])
+        self.assertEqual(status['warmup']['cold_ms'], 100.0)
+
+    def test_session_reuses_the_segmenter(self):
+        """Test that jobs share one segmenter and only profiled jobs time it."""
+        built = []
+
+        class FakeSegmenter:
+            def __init__(self):
+                built.append(self)
+                self.profiler = None
+
+        worker = TTSWorker("audio", use_gpu=False)
+        with patch("src.segmenter.SmartSegmenter", FakeSegmenter):
+            with worker.session("af_heart", profiler="profiler") as (_, first):
+                self.assertEqual(first.profiler, "profiler")
+            with worker.session("bf_emma") as (generator, second):
+                self.assertEqual(generator.voice, "bf_emma")
+
+        self.assertEqual(built, [first])
+        self.assertIs(first, second)
+        self.assertFalse(second.profiler.enabled)
+        self.assertTrue(worker.status()['segmenter_loaded'])
+
+    def test_audio_jobs_leave_the_scrape_runner_free(self):
+        """Test that audio jobs are queued on the TTS runner, not the scrape runner."""
+        tmp = Path(tempfile.mkdtemp())
+        done = threading.Event()
+        with patch.object(database, "DB_PATH", tmp / "novels.db"), \
+                patch.object(audio, "run_audio_generation", lambda *args: done.set()):
+            init_db()
+            job_id = TestClient(app).post("/api/audio/generate/7").json()["job_id"]
+            self.assertTrue(done.wait(5))
+            close_connections()
+        shutil.rmtree(tmp)
+
+        self.assertIsNotNone(tts_job_runner.get(job_id))
+        self.assertIsNone(job_runner.get(job_id))
+
+    def test_jobs_wait_for_the_generator(self):
+        """Test that concurrent jobs use the generator one at a time."""
+        worker = TTSWorker("audio", use_gpu=False)
+        active, peak = [0], [0]
+
+        def job(voice):
+            with worker.generator(voice):
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+                time.sleep(0.01)
+                active[0] -= 1
+
+        threads = [threading.Thread(target=job, args=(voice,)) for voice in ("af_heart", "bf_emma", "am_adam")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(peak[0], 1)
+
+
+@unittest.skipUnless(importlib.util.find_spec("torch") and importlib.util.find_spec("soundfile"),
+                     "torch and soundfile are required")
+class TestGeneratorWarmup(unittest.TestCase):
+    """Test cases for AudioBookGenerator.warmup with the benchmark's fake pipeline."""
+
+    def test_warmup_preloads_voices_and_splits_cold_from_warm(self):
+        """Test that the first call is reported cold and later chapters start warm."""
+        with fake_kokoro(first_call_latency=0.05, voice_load_latency=0.01):
+            generator = src.main.AudioBookGenerator(use_gpu=False)
+            report = generator.warmup(voices=["bf_emma"], texts=["One.", "Two.", "Three."])
+
+        self.assertEqual(report['voices'], ["af_heart", "bf_emma"])
+        self.assertGreater(report['cold_ms'], report['warm_ms'])
+        self.assertEqual(set(generator.voice_packs), {"af_heart", "bf_emma"})
+        generator.set_voice("bf_emma")
+        self.assertTrue(generator.warmed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
-import { createContext, useContext, useState, useEffect, useCallback, useRef } from 'react';
-import { listScrapeJobs, getScrapeStatus, cancelScrapeJob, removeScrapeJob } from '../services/api';
+import { createContext, useContext, useState, useEffect, useCallback } from 'react';
+import { subscribeScrapeEvents, cancelScrapeJob, removeScrapeJob } from '../services/api';
 
 const ScrapingContext = createContext();
 
@@ -14,7 +14,6 @@ export function useScrapingJobs() {
 export function ScrapingProvider({ children }) {
     const [jobs, setJobs] = useState({});
     const [isOpen, setIsOpen] = useState(false);
-    const pollIntervalRef = useRef(null);
 
     // Add a new job to track
     const addJob = useCallback((jobId, initialData) => {
@@ -60,54 +59,26 @@ export function ScrapingProvider({ children }) {
         setIsOpen(false);
     }, []);
 
-    // Fetch initial jobs on mount
+    // Receive the job list and every change from the server push channel
     useEffect(() => {
-        const fetchJobs = async () => {
-            try {
-                const serverJobs = await listScrapeJobs();
-                setJobs(serverJobs);
-            } catch (err) {
-                console.error('Failed to fetch jobs:', err);
-            }
-        };
-        fetchJobs();
+        return subscribeScrapeEvents({
+            onSnapshot: (serverJobs) => setJobs(serverJobs),
+            onJob: ({ job_id: jobId, removed, ...job }) => {
+                setJobs(prev => {
+                    const newJobs = { ...prev };
+                    if (removed) {
+                        delete newJobs[jobId];
+                    } else {
+                        newJobs[jobId] = job;
+                    }
+                    return newJobs;
+                });
+            },
+            // EventSource reconnects on its own and receives a fresh snapshot
+            onError: (err) => console.error('Job event stream error:', err),
+        });
     }, []);
 
-    // Poll for updates on active jobs
-    useEffect(() => {
-        const activeJobs = Object.entries(jobs).filter(
-            ([, job]) => job.status === 'pending' || job.status === 'running' || job.status === 'detecting'
-        );
-
-        if (activeJobs.length === 0) {
-            if (pollIntervalRef.current) {
-                clearInterval(pollIntervalRef.current);
-                pollIntervalRef.current = null;
-            }
-            return;
-        }
-
-        pollIntervalRef.current = setInterval(async () => {
-            for (const [jobId] of activeJobs) {
-                try {
-                    const status = await getScrapeStatus(jobId);
-                    setJobs(prev => ({
-                        ...prev,
-                        [jobId]: status
-                    }));
-                } catch (err) {
-                    console.error(`Failed to get status for job ${jobId}:`, err);
-                }
-            }
-        }, 3000);
-
-        return () => {
-            if (pollIntervalRef.current) {
-                clearInterval(pollIntervalRef.current);
-            }
-        };
-    }, [jobs]);
-
     // Count active jobs
     const activeJobCount = Object.values(jobs).filter(
         job => job.status === 'pending' || job.status === 'running' || job.status === 'detecting'
@@ -10,6 +10,8 @@ function NovelDetail() {
     const { addJob } = useScrapingJobs();
     const [novel, setNovel] = useState(null);
     const [chapters, setChapters] = useState([]);
+    const [nextAfter, setNextAfter] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [searchQuery, setSearchQuery] = useState('');
@@ -36,6 +38,7 @@ function NovelDetail() {
 
             const chaptersData = await getChapters(slug, { sort: sortOrder });
             setChapters(chaptersData.chapters || []);
+            setNextAfter(chaptersData.next_after ?? null);
             setError(null);
         } catch (err) {
             setError(err.message);
@@ -51,11 +54,29 @@ function NovelDetail() {
                 search: searchQuery || undefined
             });
             setChapters(chaptersData.chapters || []);
+            setNextAfter(chaptersData.next_after ?? null);
         } catch (err) {
             console.error('Failed to fetch chapters:', err);
         }
     };
 
+    const loadMoreChapters = async () => {
+        setLoadingMore(true);
+        try {
+            const chaptersData = await getChapters(slug, {
+                sort: sortOrder,
+                search: searchQuery || undefined,
+                after: nextAfter
+            });
+            setChapters(prev => [...prev, ...(chaptersData.chapters || [])]);
+            setNextAfter(chaptersData.next_after ?? null);
+        } catch (err) {
+            console.error('Failed to fetch chapters:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleUpdate = async () => {
         setUpdating(true);
         setUpdateMessage(null);
@@ -68,11 +89,11 @@ function NovelDetail() {
                 addJob(result.job_id, {
                     status: 'pending',
                     current_chapter: 0,
-                    total_chapters: result.missing_chapters?.length || 0,
+                    total_chapters: result.missing_count || 0,
                     novel_title: novel?.title,
                     error: null
                 });
-                setUpdateMessage(`Scraping ${result.missing_chapters?.length || 0} missing chapters...`);
+                setUpdateMessage(`Scraping ${result.missing_count || 0} missing chapters...`);
             } else {
                 setUpdateMessage(result.message);
             }
@@ -244,6 +265,12 @@ function NovelDetail() {
                         </div>
                     )}
                 </div>
+
+                {nextAfter !== null && (
+                    <button className="btn btn-outline" onClick={loadMoreChapters} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load more chapters'}
+                    </button>
+                )}
             </div>
         </div>
     );
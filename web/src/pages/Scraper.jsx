@@ -1,13 +1,13 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Sparkles, Play, Loader, CheckCircle, XCircle, RefreshCw } from 'lucide-react';
-import { startScraping, getScrapeStatus } from '../services/api';
+import { startScraping } from '../services/api';
 import { useScrapingJobs } from '../context/ScrapingContext';
 import './Scraper.css';
 
 function Scraper() {
     const navigate = useNavigate();
-    const { addJob } = useScrapingJobs();
+    const { addJob, jobs } = useScrapingJobs();
     const [url, setUrl] = useState('');
     const [startChapter, setStartChapter] = useState(1);
     const [endChapter, setEndChapter] = useState('');
@@ -15,28 +15,17 @@ function Scraper() {
     const [jobId, setJobId] = useState(null);
     const [progress, setProgress] = useState(null);
     const [error, setError] = useState(null);
-    const pollIntervalRef = useRef(null);
 
-    // Poll for progress updates
+    // Follow progress through the job updates pushed to the scraping context
     useEffect(() => {
-        if (jobId && progress?.status !== 'completed' && progress?.status !== 'failed') {
-            pollIntervalRef.current = setInterval(async () => {
-                try {
-                    const status = await getScrapeStatus(jobId);
-                    setProgress(status);
-
-                    if (status.status === 'completed' || status.status === 'failed') {
-                        clearInterval(pollIntervalRef.current);
-                        setIsLoading(false);
-                    }
-                } catch (err) {
-                    console.error('Failed to get status:', err);
-                }
-            }, 2000);
-
-            return () => clearInterval(pollIntervalRef.current);
+        const job = jobId && jobs[jobId];
+        if (!job) return;
+
+        setProgress(job);
+        if (job.status === 'completed' || job.status === 'failed' || job.status === 'cancelled') {
+            setIsLoading(false);
         }
-    }, [jobId, progress?.status]);
+    }, [jobId, jobs]);
 
     const handleScrape = async (e) => {
         e.preventDefault();
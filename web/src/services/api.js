@@ -57,6 +57,8 @@ export async function getChapters(slug, params = {}) {
     const queryParams = new URLSearchParams();
     if (params.sort) queryParams.set('sort', params.sort);
     if (params.search) queryParams.set('search', params.search);
+    if (params.after != null) queryParams.set('after', params.after);
+    if (params.limit) queryParams.set('limit', params.limit);
 
     const query = queryParams.toString();
     return fetchAPI(`/chapters/novel/${slug}${query ? `?${query}` : ''}`);
@@ -93,6 +95,22 @@ export async function listScrapeJobs() {
     return fetchAPI('/scraper/jobs');
 }
 
+/**
+ * Subscribe to scrape job changes pushed by the server (server-sent events).
+ * Returns a function that closes the stream.
+ */
+export function subscribeScrapeEvents({ onSnapshot, onJob, onError }) {
+    const source = new EventSource(`${API_BASE_URL}/scraper/events`);
+
+    source.addEventListener('snapshot', (event) => onSnapshot(JSON.parse(event.data)));
+    source.addEventListener('job', (event) => onJob(JSON.parse(event.data)));
+    if (onError) {
+        source.onerror = onError;
+    }
+
+    return () => source.close();
+}
+
 export async function cancelScrapeJob(jobId) {
     return fetchAPI(`/scraper/cancel/${jobId}`, { method: 'POST' });
 }